@@ -1,5 +1,5 @@
 from langchain_core.messages import HumanMessage
-from src.agents.state import AgentState, show_agent_reasoning, show_workflow_status
+from src.agents.state import AgentState, get_agent_message, show_agent_reasoning, show_workflow_status
 import json
 import ast
 
@@ -10,10 +10,8 @@ def debate_room_agent(state: AgentState):
     show_reasoning = state["metadata"]["show_reasoning"]
 
     # Fetch messages from researchers
-    bull_message = next(
-        msg for msg in state["messages"] if msg.name == "researcher_bull_agent")
-    bear_message = next(
-        msg for msg in state["messages"] if msg.name == "researcher_bear_agent")
+    bull_message = get_agent_message(state, "researcher_bull_agent")
+    bear_message = get_agent_message(state, "researcher_bear_agent")
 
     try:
         bull_thesis = json.loads(bull_message.content)
@@ -70,7 +68,7 @@ def debate_room_agent(state: AgentState):
 
     show_workflow_status("Debate Room", "completed")
     return {
-        "messages": state["messages"] + [message],
+        "messages": [message],
         "data": {
             **state["data"],
             "debate_analysis": message_content
@@ -1,7 +1,8 @@
 from langchain_core.messages import HumanMessage
 from src.tools.openrouter_config import get_chat_completion
 from src.agents.state import AgentState, show_agent_reasoning, show_workflow_status
-from src.tools.api import get_financial_metrics, get_financial_statements, get_market_data, get_price_history
+from src.tools.api import get_financial_metrics, get_financial_statements, get_market_data, get_price_history, prices_to_columns
+from src.tools.concurrency import run_concurrently
 from src.utils.logging_config import setup_logger
 
 from datetime import datetime, timedelta
@@ -16,7 +17,6 @@ def market_data_agent(state: AgentState):
     show_workflow_status("Market Data Agent")
     show_reasoning = state["metadata"]["show_reasoning"]
 
-    messages = state["messages"]
     data = state["data"]
 
     # Set default dates
@@ -40,47 +40,61 @@ def market_data_agent(state: AgentState):
     # Get all required data
     ticker = data["ticker"]
 
-    # 获取价格数据并验证
-    prices_df = get_price_history(ticker, start_date, end_date)
+    # 各数据源相互独立，并发获取（各数据源的并发上限见 src/tools/concurrency.py）
+    def fetch_prices():
+        return get_price_history(ticker, start_date, end_date)
+
+    def fetch_financial_metrics():
+        try:
+            return get_financial_metrics(ticker)
+        except Exception as e:
+            logger.error(f"获取财务指标失败: {str(e)}")
+            return {}
+
+    def fetch_financial_statements():
+        try:
+            return get_financial_statements(ticker)
+        except Exception as e:
+            logger.error(f"获取财务报表失败: {str(e)}")
+            return {}
+
+    def fetch_market_data():
+        try:
+            return get_market_data(ticker)
+        except Exception as e:
+            logger.error(f"获取市场数据失败: {str(e)}")
+            return {"market_cap": 0}
+
+    fetched = run_concurrently({
+        "prices": fetch_prices,
+        "financial_metrics": fetch_financial_metrics,
+        "financial_line_items": fetch_financial_statements,
+        "market_data": fetch_market_data,
+    })
+    financial_metrics = fetched["financial_metrics"]
+    financial_line_items = fetched["financial_line_items"]
+    market_data = fetched["market_data"]
+
+    # 验证价格数据
+    prices_df = fetched["prices"]
     if prices_df is None or prices_df.empty:
         logger.warning(f"警告：无法获取{ticker}的价格数据，将使用空数据继续")
         prices_df = pd.DataFrame(
             columns=['close', 'open', 'high', 'low', 'volume'])
 
-    # 获取财务指标
-    try:
-        financial_metrics = get_financial_metrics(ticker)
-    except Exception as e:
-        logger.error(f"获取财务指标失败: {str(e)}")
-        financial_metrics = {}
-
-    # 获取财务报表
-    try:
-        financial_line_items = get_financial_statements(ticker)
-    except Exception as e:
-        logger.error(f"获取财务报表失败: {str(e)}")
-        financial_line_items = {}
-
-    # 获取市场数据
-    try:
-        market_data = get_market_data(ticker)
-    except Exception as e:
-        logger.error(f"获取市场数据失败: {str(e)}")
-        market_data = {"market_cap": 0}
-
     # 确保数据格式正确
     if not isinstance(prices_df, pd.DataFrame):
         prices_df = pd.DataFrame(
             columns=['close', 'open', 'high', 'low', 'volume'])
 
-    # 转换价格数据为字典格式
-    prices_dict = prices_df.to_dict('records')
+    # 转换价格数据为按列存储的数组，下游无需逐行解析
+    prices_columns = prices_to_columns(prices_df)
 
     return {
-        "messages": messages,
+        "messages": [],
         "data": {
             **data,
-            "prices": prices_dict,
+            "prices": prices_columns,
             "start_date": start_date,
             "end_date": end_date,
             "financial_metrics": financial_metrics,
@@ -3,7 +3,7 @@ from langchain_core.prompts import ChatPromptTemplate
 from src.tools.openrouter_config import get_chat_completion
 import json
 
-from src.agents.state import AgentState, show_agent_reasoning, show_workflow_status
+from src.agents.state import AgentState, get_agent_message, show_agent_reasoning, show_workflow_status
 
 
 ##### Portfolio Management Agent #####
@@ -14,16 +14,11 @@ def portfolio_management_agent(state: AgentState):
     portfolio = state["data"]["portfolio"]
 
     # Get the technical analyst, fundamentals agent, and risk management agent messages
-    technical_message = next(
-        msg for msg in state["messages"] if msg.name == "technical_analyst_agent")
-    fundamentals_message = next(
-        msg for msg in state["messages"] if msg.name == "fundamentals_agent")
-    sentiment_message = next(
-        msg for msg in state["messages"] if msg.name == "sentiment_agent")
-    valuation_message = next(
-        msg for msg in state["messages"] if msg.name == "valuation_agent")
-    risk_message = next(
-        msg for msg in state["messages"] if msg.name == "risk_management_agent")
+    technical_message = get_agent_message(state, "technical_analyst_agent")
+    fundamentals_message = get_agent_message(state, "fundamentals_agent")
+    sentiment_message = get_agent_message(state, "sentiment_agent")
+    valuation_message = get_agent_message(state, "valuation_agent")
+    risk_message = get_agent_message(state, "risk_management_agent")
 
     # Create the system message
     system_message = {
@@ -150,7 +145,7 @@ def portfolio_management_agent(state: AgentState):
 
     show_workflow_status("Portfolio Manager", "completed")
     return {
-        "messages": state["messages"] + [message],
+        "messages": [message],
         "data": state["data"],
     }
 
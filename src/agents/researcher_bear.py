@@ -1,5 +1,5 @@
 from langchain_core.messages import HumanMessage
-from src.agents.state import AgentState, show_agent_reasoning, show_workflow_status
+from src.agents.state import AgentState, get_agent_message, show_agent_reasoning, show_workflow_status
 import json
 import ast
 
@@ -10,14 +10,10 @@ def researcher_bear_agent(state: AgentState):
     show_reasoning = state["metadata"]["show_reasoning"]
 
     # Fetch messages from analysts
-    technical_message = next(
-        msg for msg in state["messages"] if msg.name == "technical_analyst_agent")
-    fundamentals_message = next(
-        msg for msg in state["messages"] if msg.name == "fundamentals_agent")
-    sentiment_message = next(
-        msg for msg in state["messages"] if msg.name == "sentiment_agent")
-    valuation_message = next(
-        msg for msg in state["messages"] if msg.name == "valuation_agent")
+    technical_message = get_agent_message(state, "technical_analyst_agent")
+    fundamentals_message = get_agent_message(state, "fundamentals_agent")
+    sentiment_message = get_agent_message(state, "sentiment_agent")
+    valuation_message = get_agent_message(state, "valuation_agent")
 
     try:
         fundamental_signals = json.loads(fundamentals_message.content)
@@ -98,6 +94,6 @@ def researcher_bear_agent(state: AgentState):
 
     show_workflow_status("Bearish Researcher", "completed")
     return {
-        "messages": state["messages"] + [message],
+        "messages": [message],
         "data": state["data"],
     }
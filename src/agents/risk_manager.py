@@ -2,11 +2,12 @@ import math
 
 from langchain_core.messages import HumanMessage
 
-from src.agents.state import AgentState, show_agent_reasoning, show_workflow_status
-from src.tools.api import prices_to_df
+from src.agents.state import AgentState, get_agent_message, show_agent_reasoning, show_workflow_status
+from src.tools.api import get_price_column
 
 import json
 import ast
+import pandas as pd
 
 ##### Risk Management Agent #####
 
@@ -18,11 +19,11 @@ def risk_management_agent(state: AgentState):
     portfolio = state["data"]["portfolio"]
     data = state["data"]
 
-    prices_df = prices_to_df(data["prices"])
+    # 直接读取按列存储的收盘价数组，无需重建整个价格 DataFrame
+    close = pd.Series(get_price_column(data["prices"], 'close'), dtype=float)
 
     # Fetch debate room message instead of individual analyst messages
-    debate_message = next(
-        msg for msg in state["messages"] if msg.name == "debate_room_agent")
+    debate_message = get_agent_message(state, "debate_room_agent")
 
     try:
         debate_results = json.loads(debate_message.content)
@@ -30,22 +31,11 @@ def risk_management_agent(state: AgentState):
         debate_results = ast.literal_eval(debate_message.content)
 
     # 1. Calculate Risk Metrics
-    returns = prices_df['close'].pct_change().dropna()
-    daily_vol = returns.std()
-    # Annualized volatility approximation
-    volatility = daily_vol * (252 ** 0.5)
-
-    # 计算波动率的历史分布
-    rolling_std = returns.rolling(window=120).std() * (252 ** 0.5)
-    volatility_mean = rolling_std.mean()
-    volatility_std = rolling_std.std()
-    volatility_percentile = (volatility - volatility_mean) / volatility_std
-
-    # Simple historical VaR at 95% confidence
-    var_95 = returns.quantile(0.05)
-    # 使用60天窗口计算最大回撤
-    max_drawdown = (
-        prices_df['close'] / prices_df['close'].rolling(window=60).max() - 1).min()
+    risk_metrics = calculate_risk_metrics(close)
+    volatility = risk_metrics["volatility"]
+    volatility_percentile = risk_metrics["volatility_percentile"]
+    var_95 = risk_metrics["var_95"]
+    max_drawdown = risk_metrics["max_drawdown"]
 
     # 2. Market Risk Assessment
     market_risk_score = 0
@@ -71,7 +61,7 @@ def risk_management_agent(state: AgentState):
 
     # 3. Position Size Limits
     # Consider total portfolio value, not just cash
-    current_stock_value = portfolio['stock'] * prices_df['close'].iloc[-1]
+    current_stock_value = portfolio['stock'] * close.iloc[-1]
     total_portfolio_value = portfolio['cash'] + current_stock_value
 
     # Start with 25% max position of total portfolio
@@ -171,9 +161,42 @@ def risk_management_agent(state: AgentState):
 
     show_workflow_status("Risk Manager", "completed")
     return {
-        "messages": state["messages"] + [message],
+        "messages": [message],
         "data": {
             **data,
             "risk_analysis": message_content
         }
     }
+
+
+def calculate_risk_metrics(close: pd.Series) -> dict:
+    """
+    Market risk metrics from a close price series
+
+    Returns:
+        dict with annualized volatility, its z-score against the 120-day rolling
+        volatility history, 95% historical VaR and the 60-day max drawdown
+    """
+    returns = close.pct_change().dropna()
+    daily_vol = returns.std()
+    # Annualized volatility approximation
+    volatility = daily_vol * (252 ** 0.5)
+
+    # 计算波动率的历史分布
+    rolling_std = returns.rolling(window=120).std() * (252 ** 0.5)
+    volatility_mean = rolling_std.mean()
+    volatility_std = rolling_std.std()
+    volatility_percentile = (volatility - volatility_mean) / volatility_std
+
+    # Simple historical VaR at 95% confidence
+    var_95 = returns.quantile(0.05)
+    # 使用60天窗口计算最大回撤
+    max_drawdown = (
+        close / close.rolling(window=60).max() - 1).min()
+
+    return {
+        "volatility": volatility,
+        "volatility_percentile": volatility_percentile,
+        "var_95": var_95,
+        "max_drawdown": max_drawdown,
+    }
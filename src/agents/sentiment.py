@@ -1,6 +1,7 @@
 from langchain_core.messages import HumanMessage
 from src.agents.state import AgentState, show_agent_reasoning, show_workflow_status
 from src.tools.news_crawler import get_stock_news, get_news_sentiment
+from src.tools.point_in_time import current_time
 from src.utils.logging_config import setup_logger
 import json
 from datetime import datetime, timedelta
@@ -9,6 +10,13 @@ from datetime import datetime, timedelta
 logger = setup_logger('sentiment_agent')
 
 
+def select_recent_news(symbol: str, news_list: list, days: int = 7) -> list:
+    """筛选最近 days 天内发布的新闻（回测中以当前时点为准）"""
+    cutoff_date = current_time(symbol) - timedelta(days=days)
+    return [news for news in news_list
+            if datetime.strptime(news['publish_time'], '%Y-%m-%d %H:%M:%S') > cutoff_date]
+
+
 def sentiment_agent(state: AgentState):
     """Responsible for sentiment analysis"""
     show_workflow_status("Sentiment Analyst")
@@ -22,10 +30,8 @@ def sentiment_agent(state: AgentState):
     # 获取新闻数据并分析情感
     news_list = get_stock_news(symbol, max_news=num_of_news)  # 确保获取足够的新闻
 
-    # 过滤7天内的新闻
-    cutoff_date = datetime.now() - timedelta(days=7)
-    recent_news = [news for news in news_list
-                   if datetime.strptime(news['publish_time'], '%Y-%m-%d %H:%M:%S') > cutoff_date]
+    # 过滤7天内的新闻（回测中以当前时点为准）
+    recent_news = select_recent_news(symbol, news_list)
 
     sentiment_score = get_news_sentiment(recent_news, num_of_news=num_of_news)
 
@@ -1,6 +1,5 @@
-from typing import Annotated, Any, Dict, Sequence, TypedDict
+from typing import Annotated, Any, Dict, Iterable, Optional, Sequence, TypedDict
 
-import operator
 from langchain_core.messages import BaseMessage
 import json
 from src.utils.logging_config import setup_logger
@@ -12,11 +11,49 @@ logger = setup_logger('agent_state')
 def merge_dicts(a: Dict[str, Any], b: Dict[str, Any]) -> Dict[str, Any]:
     return {**a, **b}
 
+
+class MessageLog(list):
+    """Message list with an index from agent name to its latest message."""
+
+    def __init__(self, messages: Iterable[BaseMessage] = ()):
+        super().__init__(messages)
+        self._by_name: Dict[str, BaseMessage] = {}
+        for message in self:
+            self._index(message)
+
+    def _index(self, message: BaseMessage) -> None:
+        name = getattr(message, "name", None)
+        if name:
+            self._by_name[name] = message
+
+    def get_by_name(self, name: str) -> Optional[BaseMessage]:
+        return self._by_name.get(name)
+
+
+def append_messages(left: Sequence[BaseMessage], right: Sequence[BaseMessage]) -> MessageLog:
+    """Reducer for AgentState.messages: agents return only their own new messages."""
+    log = MessageLog(left)
+    for message in right:
+        log.append(message)
+        log._index(message)
+    return log
+
+
+def get_agent_message(state: Dict[str, Any], agent_name: str) -> Optional[BaseMessage]:
+    """Get the latest message produced by an agent.
+
+    Uses the name index of MessageLog, falling back to a scan for plain lists.
+    """
+    messages = state["messages"]
+    if isinstance(messages, MessageLog):
+        return messages.get_by_name(agent_name)
+    return next((msg for msg in reversed(messages) if msg.name == agent_name), None)
+
 # Define agent state
 
 
 class AgentState(TypedDict):
-    messages: Annotated[Sequence[BaseMessage], operator.add]
+    messages: Annotated[Sequence[BaseMessage], append_messages]
     data: Annotated[Dict[str, Any], merge_dicts]
     metadata: Annotated[Dict[str, Any], merge_dicts]
 
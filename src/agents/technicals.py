@@ -10,6 +10,8 @@ import pandas as pd
 import numpy as np
 
 from src.tools.api import prices_to_df
+from src.tools.indicator_engine import indicator_store
+from src.tools.price_features import PriceFeatures
 
 
 ##### Technical Analyst #####
@@ -21,6 +23,9 @@ def technical_analyst_agent(state: AgentState):
     3. Momentum
     4. Volatility Analysis
     5. Statistical Arbitrage Signals
+
+    Indicators are maintained incrementally per ticker by the indicator engine,
+    so only the bars added since the previous invocation are processed.
     """
     show_workflow_status("Technical Analyst")
     show_reasoning = state["metadata"]["show_reasoning"]
@@ -28,52 +33,43 @@ def technical_analyst_agent(state: AgentState):
     prices = data["prices"]
     prices_df = prices_to_df(prices)
 
+    # Update the incremental indicator state with new bars only
+    metrics = indicator_store.snapshot(data["ticker"], prices_df)
+
     # Initialize confidence variable
     confidence = 0.0
 
-    # Calculate indicators
-    # 1. MACD (Moving Average Convergence Divergence)
-    macd_line, signal_line = calculate_macd(prices_df)
-
-    # 2. RSI (Relative Strength Index)
-    rsi = calculate_rsi(prices_df)
-
-    # 3. Bollinger Bands (Bollinger Bands)
-    upper_band, lower_band = calculate_bollinger_bands(prices_df)
-
-    # 4. OBV (On-Balance Volume)
-    obv = calculate_obv(prices_df)
-
     # Generate individual signals
     signals = []
 
     # MACD signal
-    if macd_line.iloc[-2] < signal_line.iloc[-2] and macd_line.iloc[-1] > signal_line.iloc[-1]:
+    if metrics['prev_macd'] < metrics['prev_macd_signal'] and metrics['macd'] > metrics['macd_signal']:
         signals.append('bullish')
-    elif macd_line.iloc[-2] > signal_line.iloc[-2] and macd_line.iloc[-1] < signal_line.iloc[-1]:
+    elif metrics['prev_macd'] > metrics['prev_macd_signal'] and metrics['macd'] < metrics['macd_signal']:
         signals.append('bearish')
     else:
         signals.append('neutral')
 
     # RSI signal
-    if rsi.iloc[-1] < 30:
+    rsi = metrics['rsi_14']
+    if rsi < 30:
         signals.append('bullish')
-    elif rsi.iloc[-1] > 70:
+    elif rsi > 70:
         signals.append('bearish')
     else:
         signals.append('neutral')
 
     # Bollinger Bands signal
-    current_price = prices_df['close'].iloc[-1]
-    if current_price < lower_band.iloc[-1]:
+    current_price = metrics['close']
+    if current_price < metrics['bb_lower']:
         signals.append('bullish')
-    elif current_price > upper_band.iloc[-1]:
+    elif current_price > metrics['bb_upper']:
         signals.append('bearish')
     else:
         signals.append('neutral')
 
     # OBV signal
-    obv_slope = obv.diff().iloc[-5:].mean()
+    obv_slope = metrics['obv_slope']
     if obv_slope > 0:
         signals.append('bullish')
     elif obv_slope < 0:
@@ -82,14 +78,13 @@ def technical_analyst_agent(state: AgentState):
         signals.append('neutral')
 
     # Calculate price drop
-    price_drop = (prices_df['close'].iloc[-1] -
-                  prices_df['close'].iloc[-5]) / prices_df['close'].iloc[-5]
+    price_drop = (current_price - metrics['close_5']) / metrics['close_5']
 
     # Add price drop signal
-    if price_drop < -0.05 and rsi.iloc[-1] < 40:  # 5% drop and RSI below 40
+    if price_drop < -0.05 and rsi < 40:  # 5% drop and RSI below 40
         signals.append('bullish')
         confidence += 0.2  # Increase confidence for oversold conditions
-    elif price_drop < -0.03 and rsi.iloc[-1] < 45:  # 3% drop and RSI below 45
+    elif price_drop < -0.03 and rsi < 45:  # 3% drop and RSI below 45
         signals.append('bullish')
         confidence += 0.1
 
@@ -101,7 +96,7 @@ def technical_analyst_agent(state: AgentState):
         },
         "RSI": {
             "signal": signals[1],
-            "details": f"RSI is {rsi.iloc[-1]:.2f} ({'oversold' if signals[1] == 'bullish' else 'overbought' if signals[1] == 'bearish' else 'neutral'})"
+            "details": f"RSI is {rsi:.2f} ({'oversold' if signals[1] == 'bullish' else 'overbought' if signals[1] == 'bearish' else 'neutral'})"
         },
         "Bollinger": {
             "signal": signals[2],
@@ -141,19 +136,28 @@ def technical_analyst_agent(state: AgentState):
     }
 
     # 1. Trend Following Strategy
-    trend_signals = calculate_trend_signals(prices_df)
+    trend_signals = trend_signal_from_metrics(
+        metrics['ema_8'], metrics['ema_21'], metrics['ema_55'], metrics['adx'])
 
     # 2. Mean Reversion Strategy
-    mean_reversion_signals = calculate_mean_reversion_signals(prices_df)
+    mean_reversion_signals = mean_reversion_signal_from_metrics(
+        current_price, metrics['z_score'], metrics['bb_upper'], metrics['bb_lower'],
+        metrics['rsi_14'], metrics['rsi_28'])
 
     # 3. Momentum Strategy
-    momentum_signals = calculate_momentum_signals(prices_df)
+    momentum_signals = momentum_signal_from_metrics(
+        metrics['momentum_1m'], metrics['momentum_3m'], metrics['momentum_6m'],
+        metrics['volume_momentum'])
 
     # 4. Volatility Strategy
-    volatility_signals = calculate_volatility_signals(prices_df)
+    volatility_signals = volatility_signal_from_metrics(
+        metrics['historical_volatility'], metrics['volatility_regime'],
+        metrics['volatility_z_score'], metrics['atr_ratio'])
 
     # 5. Statistical Arbitrage Signals
-    stat_arb_signals = calculate_stat_arb_signals(prices_df)
+    hurst = calculate_hurst_exponent(metrics['recent_closes'], max_lag=10)
+    stat_arb_signals = stat_arb_signal_from_metrics(
+        hurst, metrics['skewness'], metrics['kurtosis'])
 
     # Combine all signals using a weighted ensemble approach
     strategy_weights = {
@@ -224,29 +228,42 @@ def technical_analyst_agent(state: AgentState):
 def calculate_trend_signals(prices_df):
     """
     Advanced trend following strategy using multiple timeframes and indicators
+
+    Args:
+        prices_df: price DataFrame, or a PriceFeatures shared with the other strategies
     """
+    features = PriceFeatures.of(prices_df)
+
     # Calculate EMAs for multiple timeframes
-    ema_8 = calculate_ema(prices_df, 8)
-    ema_21 = calculate_ema(prices_df, 21)
-    ema_55 = calculate_ema(prices_df, 55)
+    ema_8 = calculate_ema(features, 8)
+    ema_21 = calculate_ema(features, 21)
+    ema_55 = calculate_ema(features, 55)
 
     # Calculate ADX for trend strength
-    adx = calculate_adx(prices_df, 14)
+    adx = calculate_adx(features, 14)
 
     # Calculate Ichimoku Cloud
-    ichimoku = calculate_ichimoku(prices_df)
+    ichimoku = calculate_ichimoku(features)
+
+    return trend_signal_from_metrics(
+        ema_8.iloc[-1], ema_21.iloc[-1], ema_55.iloc[-1], adx['adx'].iloc[-1])
+
 
+def trend_signal_from_metrics(ema_8, ema_21, ema_55, adx):
+    """
+    Trend following decision from the latest EMA and ADX values
+    """
     # Determine trend direction and strength
     short_trend = ema_8 > ema_21
     medium_trend = ema_21 > ema_55
 
     # Combine signals with confidence weighting
-    trend_strength = adx['adx'].iloc[-1] / 100.0
+    trend_strength = adx / 100.0
 
-    if short_trend.iloc[-1] and medium_trend.iloc[-1]:
+    if short_trend and medium_trend:
         signal = 'bullish'
         confidence = trend_strength
-    elif not short_trend.iloc[-1] and not medium_trend.iloc[-1]:
+    elif not short_trend and not medium_trend:
         signal = 'bearish'
         confidence = trend_strength
     else:
@@ -257,7 +274,7 @@ def calculate_trend_signals(prices_df):
         'signal': signal,
         'confidence': confidence,
         'metrics': {
-            'adx': float(adx['adx'].iloc[-1]),
+            'adx': float(adx),
             'trend_strength': float(trend_strength),
             # 'ichimoku': ichimoku
         }
@@ -267,31 +284,44 @@ def calculate_trend_signals(prices_df):
 def calculate_mean_reversion_signals(prices_df):
     """
     Mean reversion strategy using statistical measures and Bollinger Bands
+
+    Args:
+        prices_df: price DataFrame, or a PriceFeatures shared with the other strategies
     """
+    features = PriceFeatures.of(prices_df)
+
     # Calculate z-score of price relative to moving average
-    ma_50 = prices_df['close'].rolling(window=50).mean()
-    std_50 = prices_df['close'].rolling(window=50).std()
-    z_score = (prices_df['close'] - ma_50) / std_50
+    ma_50 = features.rolling_mean('close', 50)
+    std_50 = features.rolling_std('close', 50)
+    z_score = (features.close - ma_50) / std_50
 
     # Calculate Bollinger Bands
-    bb_upper, bb_lower = calculate_bollinger_bands(prices_df)
+    bb_upper, bb_lower = calculate_bollinger_bands(features)
 
     # Calculate RSI with multiple timeframes
-    rsi_14 = calculate_rsi(prices_df, 14)
-    rsi_28 = calculate_rsi(prices_df, 28)
+    rsi_14 = calculate_rsi(features, 14)
+    rsi_28 = calculate_rsi(features, 28)
+
+    return mean_reversion_signal_from_metrics(
+        features.close.iloc[-1], z_score.iloc[-1], bb_upper.iloc[-1],
+        bb_lower.iloc[-1], rsi_14.iloc[-1], rsi_28.iloc[-1])
+
 
+def mean_reversion_signal_from_metrics(close, z_score, bb_upper, bb_lower, rsi_14, rsi_28):
+    """
+    Mean reversion decision from the latest z-score, Bollinger Bands and RSI values
+    """
     # Mean reversion signals
-    extreme_z_score = abs(z_score.iloc[-1]) > 2
-    price_vs_bb = (prices_df['close'].iloc[-1] - bb_lower.iloc[-1]
-                   ) / (bb_upper.iloc[-1] - bb_lower.iloc[-1])
+    extreme_z_score = abs(z_score) > 2
+    price_vs_bb = np.float64(close - bb_lower) / (bb_upper - bb_lower)
 
     # Combine signals
-    if z_score.iloc[-1] < -2 and price_vs_bb < 0.2:
+    if z_score < -2 and price_vs_bb < 0.2:
         signal = 'bullish'
-        confidence = min(abs(z_score.iloc[-1]) / 4, 1.0)
-    elif z_score.iloc[-1] > 2 and price_vs_bb > 0.8:
+        confidence = min(abs(z_score) / 4, 1.0)
+    elif z_score > 2 and price_vs_bb > 0.8:
         signal = 'bearish'
-        confidence = min(abs(z_score.iloc[-1]) / 4, 1.0)
+        confidence = min(abs(z_score) / 4, 1.0)
     else:
         signal = 'neutral'
         confidence = 0.5
@@ -300,10 +330,10 @@ def calculate_mean_reversion_signals(prices_df):
         'signal': signal,
         'confidence': confidence,
         'metrics': {
-            'z_score': float(z_score.iloc[-1]),
+            'z_score': float(z_score),
             'price_vs_bb': float(price_vs_bb),
-            'rsi_14': float(rsi_14.iloc[-1]),
-            'rsi_28': float(rsi_28.iloc[-1])
+            'rsi_14': float(rsi_14),
+            'rsi_28': float(rsi_28)
         }
     }
 
@@ -311,31 +341,46 @@ def calculate_mean_reversion_signals(prices_df):
 def calculate_momentum_signals(prices_df):
     """
     Multi-factor momentum strategy with conservative settings
+
+    Args:
+        prices_df: price DataFrame, or a PriceFeatures shared with the other strategies
     """
+    features = PriceFeatures.of(prices_df)
+
     # Price momentum with adjusted min_periods
-    returns = prices_df['close'].pct_change()
-    mom_1m = returns.rolling(21, min_periods=5).sum()  # 短期动量允许较少数据点
-    mom_3m = returns.rolling(63, min_periods=42).sum()  # 中期动量要求更多数据点
-    mom_6m = returns.rolling(126, min_periods=63).sum()  # 长期动量保持严格要求
+    mom_1m = features.rolling_stat('returns', 'sum', 21, 5)  # 短期动量允许较少数据点
+    mom_3m = features.rolling_stat('returns', 'sum', 63, 42)  # 中期动量要求更多数据点
+    mom_6m = features.rolling_stat('returns', 'sum', 126, 63)  # 长期动量保持严格要求
 
     # Volume momentum
-    volume_ma = prices_df['volume'].rolling(21, min_periods=10).mean()
-    volume_momentum = prices_df['volume'] / volume_ma
+    volume_ma = features.rolling_mean('volume', 21, 10)
+    volume_momentum = features.volume / volume_ma
+
+    return momentum_signal_from_metrics(
+        mom_1m.iloc[-1], mom_3m.iloc[-1], mom_6m.iloc[-1], volume_momentum.iloc[-1])
+
 
+def momentum_signal_from_metrics(mom_1m, mom_3m, mom_6m, volume_momentum):
+    """
+    Momentum decision from the latest momentum values (NaN when data is insufficient)
+    """
     # 处理NaN值
-    mom_1m = mom_1m.fillna(0)  # 短期动量可以用0填充
-    mom_3m = mom_3m.fillna(mom_1m)  # 中期动量可以用短期动量填充
-    mom_6m = mom_6m.fillna(mom_3m)  # 长期动量可以用中期动量填充
+    if pd.isna(mom_1m):
+        mom_1m = 0.0  # 短期动量可以用0填充
+    if pd.isna(mom_3m):
+        mom_3m = mom_1m  # 中期动量可以用短期动量填充
+    if pd.isna(mom_6m):
+        mom_6m = mom_3m  # 长期动量可以用中期动量填充
 
     # Calculate momentum score with more weight on longer timeframes
     momentum_score = (
         0.2 * mom_1m +  # 降低短期权重
         0.3 * mom_3m +
         0.5 * mom_6m    # 增加长期权重
-    ).iloc[-1]
+    )
 
     # Volume confirmation
-    volume_confirmation = volume_momentum.iloc[-1] > 1.0
+    volume_confirmation = volume_momentum > 1.0
 
     if momentum_score > 0.05 and volume_confirmation:
         signal = 'bullish'
@@ -351,10 +396,10 @@ def calculate_momentum_signals(prices_df):
         'signal': signal,
         'confidence': confidence,
         'metrics': {
-            'momentum_1m': float(mom_1m.iloc[-1]),
-            'momentum_3m': float(mom_3m.iloc[-1]),
-            'momentum_6m': float(mom_6m.iloc[-1]),
-            'volume_momentum': float(volume_momentum.iloc[-1])
+            'momentum_1m': float(mom_1m),
+            'momentum_3m': float(mom_3m),
+            'momentum_6m': float(mom_6m),
+            'volume_momentum': float(volume_momentum)
         }
     }
 
@@ -362,11 +407,14 @@ def calculate_momentum_signals(prices_df):
 def calculate_volatility_signals(prices_df):
     """
     Optimized volatility calculation with shorter lookback periods
+
+    Args:
+        prices_df: price DataFrame, or a PriceFeatures shared with the other strategies
     """
-    returns = prices_df['close'].pct_change()
+    features = PriceFeatures.of(prices_df)
 
     # 使用更短的周期和最小周期要求计算历史波动率
-    hist_vol = returns.rolling(21, min_periods=10).std() * math.sqrt(252)
+    hist_vol = features.rolling_std('returns', 21, 10) * math.sqrt(252)
 
     # 使用更短的周期计算波动率均值，并允许更少的数据点
     vol_ma = hist_vol.rolling(42, min_periods=21).mean()
@@ -377,23 +425,28 @@ def calculate_volatility_signals(prices_df):
     vol_z_score = (hist_vol - vol_ma) / vol_std.replace(0, np.nan)
 
     # ATR计算优化
-    atr = calculate_atr(prices_df, period=14, min_periods=7)
-    atr_ratio = atr / prices_df['close']
+    atr = calculate_atr(features, period=14, min_periods=7)
+    atr_ratio = atr / features.close
+
+    return volatility_signal_from_metrics(
+        hist_vol.iloc[-1], vol_regime.iloc[-1], vol_z_score.iloc[-1], atr_ratio.iloc[-1])
+
 
+def volatility_signal_from_metrics(hist_vol, vol_regime, vol_z, atr_ratio):
+    """
+    Volatility decision from the latest volatility regime and z-score
+    """
     # 如果关键指标为NaN，使用替代值而不是直接返回中性信号
-    if pd.isna(vol_regime.iloc[-1]):
-        vol_regime.iloc[-1] = 1.0  # 假设处于正常波动率区间
-    if pd.isna(vol_z_score.iloc[-1]):
-        vol_z_score.iloc[-1] = 0.0  # 假设处于均值位置
+    if pd.isna(vol_regime):
+        vol_regime = 1.0  # 假设处于正常波动率区间
+    if pd.isna(vol_z):
+        vol_z = 0.0  # 假设处于均值位置
 
     # Generate signal based on volatility regime
-    current_vol_regime = vol_regime.iloc[-1]
-    vol_z = vol_z_score.iloc[-1]
-
-    if current_vol_regime < 0.8 and vol_z < -1:
+    if vol_regime < 0.8 and vol_z < -1:
         signal = 'bullish'  # Low vol regime, potential for expansion
         confidence = min(abs(vol_z) / 3, 1.0)
-    elif current_vol_regime > 1.2 and vol_z > 1:
+    elif vol_regime > 1.2 and vol_z > 1:
         signal = 'bearish'  # High vol regime, potential for contraction
         confidence = min(abs(vol_z) / 3, 1.0)
     else:
@@ -404,10 +457,10 @@ def calculate_volatility_signals(prices_df):
         'signal': signal,
         'confidence': confidence,
         'metrics': {
-            'historical_volatility': float(hist_vol.iloc[-1]),
-            'volatility_regime': float(current_vol_regime),
+            'historical_volatility': float(hist_vol),
+            'volatility_regime': float(vol_regime),
             'volatility_z_score': float(vol_z),
-            'atr_ratio': float(atr_ratio.iloc[-1])
+            'atr_ratio': float(atr_ratio)
         }
     }
 
@@ -415,28 +468,37 @@ def calculate_volatility_signals(prices_df):
 def calculate_stat_arb_signals(prices_df):
     """
     Optimized statistical arbitrage signals with shorter lookback periods
+
+    Args:
+        prices_df: price DataFrame, or a PriceFeatures shared with the other strategies
     """
-    # Calculate price distribution statistics
-    returns = prices_df['close'].pct_change()
+    features = PriceFeatures.of(prices_df)
 
     # 使用更短的周期计算偏度和峰度
-    skew = returns.rolling(42, min_periods=21).skew()
-    kurt = returns.rolling(42, min_periods=21).kurt()
+    skew = features.rolling_stat('returns', 'skew', 42, 21)
+    kurt = features.rolling_stat('returns', 'kurt', 42, 21)
 
     # 优化Hurst指数计算
-    hurst = calculate_hurst_exponent(prices_df['close'], max_lag=10)
+    hurst = calculate_hurst_exponent(features.close, max_lag=10)
+
+    return stat_arb_signal_from_metrics(hurst, skew.iloc[-1], kurt.iloc[-1])
+
 
+def stat_arb_signal_from_metrics(hurst, skew, kurt):
+    """
+    Statistical arbitrage decision from the Hurst exponent and return distribution
+    """
     # 处理NaN值
-    if pd.isna(skew.iloc[-1]):
-        skew.iloc[-1] = 0.0  # 假设正态分布
-    if pd.isna(kurt.iloc[-1]):
-        kurt.iloc[-1] = 3.0  # 假设正态分布
+    if pd.isna(skew):
+        skew = 0.0  # 假设正态分布
+    if pd.isna(kurt):
+        kurt = 3.0  # 假设正态分布
 
     # Generate signal based on statistical properties
-    if hurst < 0.4 and skew.iloc[-1] > 1:
+    if hurst < 0.4 and skew > 1:
         signal = 'bullish'
         confidence = (0.5 - hurst) * 2
-    elif hurst < 0.4 and skew.iloc[-1] < -1:
+    elif hurst < 0.4 and skew < -1:
         signal = 'bearish'
         confidence = (0.5 - hurst) * 2
     else:
@@ -448,8 +510,8 @@ def calculate_stat_arb_signals(prices_df):
         'confidence': confidence,
         'metrics': {
             'hurst_exponent': float(hurst),
-            'skewness': float(skew.iloc[-1]),
-            'kurtosis': float(kurt.iloc[-1])
+            'skewness': float(skew),
+            'kurtosis': float(kurt)
         }
     }
 
@@ -510,33 +572,18 @@ def normalize_pandas(obj):
 
 
 def calculate_macd(prices_df: pd.DataFrame) -> tuple[pd.Series, pd.Series]:
-    ema_12 = prices_df['close'].ewm(span=12, adjust=False).mean()
-    ema_26 = prices_df['close'].ewm(span=26, adjust=False).mean()
-    macd_line = ema_12 - ema_26
-    signal_line = macd_line.ewm(span=9, adjust=False).mean()
-    return macd_line, signal_line
+    return PriceFeatures.of(prices_df).macd()
 
 
 def calculate_rsi(prices_df: pd.DataFrame, period: int = 14) -> pd.Series:
-    delta = prices_df['close'].diff()
-    gain = (delta.where(delta > 0, 0)).fillna(0)
-    loss = (-delta.where(delta < 0, 0)).fillna(0)
-    avg_gain = gain.rolling(window=period).mean()
-    avg_loss = loss.rolling(window=period).mean()
-    rs = avg_gain / avg_loss
-    rsi = 100 - (100 / (1 + rs))
-    return rsi
+    return PriceFeatures.of(prices_df).rsi(period)
 
 
 def calculate_bollinger_bands(
     prices_df: pd.DataFrame,
     window: int = 20
 ) -> tuple[pd.Series, pd.Series]:
-    sma = prices_df['close'].rolling(window).mean()
-    std_dev = prices_df['close'].rolling(window).std()
-    upper_band = sma + (std_dev * 2)
-    lower_band = sma - (std_dev * 2)
-    return upper_band, lower_band
+    return PriceFeatures.of(prices_df).bollinger_bands(window)
 
 
 def calculate_ema(df: pd.DataFrame, window: int) -> pd.Series:
@@ -544,56 +591,27 @@ def calculate_ema(df: pd.DataFrame, window: int) -> pd.Series:
     Calculate Exponential Moving Average
 
     Args:
-        df: DataFrame with price data
+        df: DataFrame with price data (or PriceFeatures)
         window: EMA period
 
     Returns:
         pd.Series: EMA values
     """
-    return df['close'].ewm(span=window, adjust=False).mean()
+    return PriceFeatures.of(df).ema(window)
 
 
 def calculate_adx(df: pd.DataFrame, period: int = 14) -> pd.DataFrame:
     """
-    Calculate Average Directional Index (ADX)
+    Calculate Average Directional Index (ADX) without modifying the input
 
     Args:
-        df: DataFrame with OHLC data
+        df: DataFrame with OHLC data (or PriceFeatures)
         period: Period for calculations
 
     Returns:
         DataFrame with ADX values
     """
-    # Calculate True Range
-    df['high_low'] = df['high'] - df['low']
-    df['high_close'] = abs(df['high'] - df['close'].shift())
-    df['low_close'] = abs(df['low'] - df['close'].shift())
-    df['tr'] = df[['high_low', 'high_close', 'low_close']].max(axis=1)
-
-    # Calculate Directional Movement
-    df['up_move'] = df['high'] - df['high'].shift()
-    df['down_move'] = df['low'].shift() - df['low']
-
-    df['plus_dm'] = np.where(
-        (df['up_move'] > df['down_move']) & (df['up_move'] > 0),
-        df['up_move'],
-        0
-    )
-    df['minus_dm'] = np.where(
-        (df['down_move'] > df['up_move']) & (df['down_move'] > 0),
-        df['down_move'],
-        0
-    )
-
-    # Calculate ADX
-    df['+di'] = 100 * (df['plus_dm'].ewm(span=period).mean() /
-                       df['tr'].ewm(span=period).mean())
-    df['-di'] = 100 * (df['minus_dm'].ewm(span=period).mean() /
-                       df['tr'].ewm(span=period).mean())
-    df['dx'] = 100 * abs(df['+di'] - df['-di']) / (df['+di'] + df['-di'])
-    df['adx'] = df['dx'].ewm(span=period).mean()
-
-    return df[['adx', '+di', '-di']]
+    return PriceFeatures.of(df).adx(period)
 
 
 def calculate_ichimoku(df: pd.DataFrame) -> Dict[str, pd.Series]:
@@ -601,31 +619,33 @@ def calculate_ichimoku(df: pd.DataFrame) -> Dict[str, pd.Series]:
     Calculate Ichimoku Cloud indicators
 
     Args:
-        df: DataFrame with OHLC data
+        df: DataFrame with OHLC data (or PriceFeatures)
 
     Returns:
         Dictionary containing Ichimoku components
     """
+    features = PriceFeatures.of(df)
+
     # Tenkan-sen (Conversion Line): (9-period high + 9-period low)/2
-    period9_high = df['high'].rolling(window=9).max()
-    period9_low = df['low'].rolling(window=9).min()
+    period9_high = features.rolling_stat('high', 'max', 9)
+    period9_low = features.rolling_stat('low', 'min', 9)
     tenkan_sen = (period9_high + period9_low) / 2
 
     # Kijun-sen (Base Line): (26-period high + 26-period low)/2
-    period26_high = df['high'].rolling(window=26).max()
-    period26_low = df['low'].rolling(window=26).min()
+    period26_high = features.rolling_stat('high', 'max', 26)
+    period26_low = features.rolling_stat('low', 'min', 26)
     kijun_sen = (period26_high + period26_low) / 2
 
     # Senkou Span A (Leading Span A): (Conversion Line + Base Line)/2
     senkou_span_a = ((tenkan_sen + kijun_sen) / 2).shift(26)
 
     # Senkou Span B (Leading Span B): (52-period high + 52-period low)/2
-    period52_high = df['high'].rolling(window=52).max()
-    period52_low = df['low'].rolling(window=52).min()
+    period52_high = features.rolling_stat('high', 'max', 52)
+    period52_low = features.rolling_stat('low', 'min', 52)
     senkou_span_b = ((period52_high + period52_low) / 2).shift(26)
 
     # Chikou Span (Lagging Span): Close shifted back 26 periods
-    chikou_span = df['close'].shift(-26)
+    chikou_span = features.close.shift(-26)
 
     return {
         'tenkan_sen': tenkan_sen,
@@ -641,21 +661,14 @@ def calculate_atr(df: pd.DataFrame, period: int = 14, min_periods: int = 7) -> p
     Optimized ATR calculation with minimum periods parameter
 
     Args:
-        df: DataFrame with OHLC data
+        df: DataFrame with OHLC data (or PriceFeatures)
         period: Period for ATR calculation
         min_periods: Minimum number of periods required
 
     Returns:
         pd.Series: ATR values
     """
-    high_low = df['high'] - df['low']
-    high_close = abs(df['high'] - df['close'].shift())
-    low_close = abs(df['low'] - df['close'].shift())
-
-    ranges = pd.concat([high_low, high_close, low_close], axis=1)
-    true_range = ranges.max(axis=1)
-
-    return true_range.rolling(period, min_periods=min_periods).mean()
+    return PriceFeatures.of(df).atr(period, min_periods)
 
 
 def calculate_hurst_exponent(price_series: pd.Series, max_lag: int = 10) -> float:
@@ -698,13 +711,17 @@ def calculate_hurst_exponent(price_series: pd.Series, max_lag: int = 10) -> floa
 
 
 def calculate_obv(prices_df: pd.DataFrame) -> pd.Series:
-    obv = [0]
-    for i in range(1, len(prices_df)):
-        if prices_df['close'].iloc[i] > prices_df['close'].iloc[i - 1]:
-            obv.append(obv[-1] + prices_df['volume'].iloc[i])
-        elif prices_df['close'].iloc[i] < prices_df['close'].iloc[i - 1]:
-            obv.append(obv[-1] - prices_df['volume'].iloc[i])
-        else:
-            obv.append(obv[-1])
-    prices_df['OBV'] = obv
-    return prices_df['OBV']
+    """
+    Calculate On-Balance Volume without modifying the input DataFrame
+
+    Args:
+        prices_df: DataFrame with close and volume columns
+
+    Returns:
+        pd.Series: OBV values named 'OBV', starting from 0
+    """
+    # 收盘价上涨计入成交量，下跌扣除成交量，持平不变
+    direction = np.sign(prices_df['close'].diff()).fillna(0)
+    obv = (direction * prices_df['volume']).cumsum()
+    obv.name = 'OBV'
+    return obv
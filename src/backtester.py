@@ -2,27 +2,40 @@ from datetime import datetime, timedelta
 import json
 import time
 import logging
-import matplotlib.pyplot as plt
 import pandas as pd
-from src.tools.api import get_price_data
+from src.tools.price_store import asof_price_lookup
+from src.tools.point_in_time import PointInTimeProvider, use_point_in_time
 from src.main import run_hedge_fund
 import sys
-import matplotlib
 import os
 
-# 根据操作系统配置中文字体
-if sys.platform.startswith('win'):
-    # Windows系统
-    matplotlib.rc('font', family='Microsoft YaHei')
-elif sys.platform.startswith('linux'):
-    # Linux系统
-    matplotlib.rc('font', family='WenQuanYi Micro Hei')
-else:
-    # macOS系统
-    matplotlib.rc('font', family='PingFang SC')
 
-# 用来正常显示负号
-matplotlib.rcParams['axes.unicode_minus'] = False
+def configure_matplotlib():
+    """导入 matplotlib 并配置中文字体，只在绘图时调用，避免拖慢启动
+
+    Returns:
+        matplotlib.pyplot 模块
+    """
+    import matplotlib
+    import matplotlib.pyplot as plt
+
+    # 根据操作系统配置中文字体
+    if sys.platform.startswith('win'):
+        # Windows系统
+        matplotlib.rc('font', family='Microsoft YaHei')
+    elif sys.platform.startswith('linux'):
+        # Linux系统
+        matplotlib.rc('font', family='WenQuanYi Micro Hei')
+    else:
+        # macOS系统
+        matplotlib.rc('font', family='PingFang SC')
+
+    # 用来正常显示负号
+    matplotlib.rcParams['axes.unicode_minus'] = False
+    return plt
+
+# 每个交易日智能体分析使用的回看天数，成交价最多沿用这么多天前的开盘价
+LOOKBACK_DAYS = 30
 
 
 class Backtester:
@@ -35,15 +48,13 @@ class Backtester:
         self.portfolio = {"cash": initial_capital, "stock": 0}
         self.portfolio_values = []
         self.num_of_news = num_of_news
+        # 回测数据的时点视图与每个营业日的成交价（开盘价），由 preload_prices 一次性加载
+        self.data_provider = None
+        self.open_prices = None
         # 设置回测日志
         self.setup_backtest_logging()
         self.logger = self.setup_logging()
 
-        # 初始化 API 调用管理
-        self._api_call_count = 0
-        self._api_window_start = time.time()
-        self._last_api_call = 0
-
         # 验证输入参数
         self.validate_inputs()
 
@@ -76,44 +87,23 @@ class Backtester:
             raise
 
     def get_agent_decision(self, current_date, lookback_start, portfolio):
-        """获取智能体决策，包含 API 限制处理"""
+        """获取智能体决策（API 限速由 rate_limiter 统一处理）"""
         max_retries = 3
 
-        # 检查并重置 API 时间窗口
-        current_time = time.time()
-        if current_time - self._api_window_start >= 60:
-            self._api_call_count = 0
-            self._api_window_start = current_time
-
-        # 如果达到 API 限制，等待新的时间窗口
-        if self._api_call_count >= 8:  # 预留余量
-            wait_time = 60 - (current_time - self._api_window_start)
-            if wait_time > 0:
-                time.sleep(wait_time)
-                self._api_call_count = 0
-                self._api_window_start = time.time()
-
         for attempt in range(max_retries):
             try:
-                # 确保调用间隔至少 6 秒
-                if self._last_api_call:
-                    time_since_last_call = time.time() - self._last_api_call
-                    if time_since_last_call < 6:
-                        sleep_time = 6 - time_since_last_call
-                        time.sleep(sleep_time)
-
-                # 更新调用时间和计数
-                self._last_api_call = time.time()
-                self._api_call_count += 1
-
-                # 调用智能体并解析结果
-                result = self.agent(
-                    ticker=self.ticker,
-                    start_date=lookback_start,
-                    end_date=current_date,
-                    portfolio=portfolio,
-                    num_of_news=self.num_of_news
-                )
+                # 调用智能体并解析结果，智能体只能看到截至当日的数据
+                if self.data_provider is None:
+                    self.preload_prices()
+                with use_point_in_time(self.data_provider):
+                    self.data_provider.set_as_of(current_date)
+                    result = self.agent(
+                        ticker=self.ticker,
+                        start_date=lookback_start,
+                        end_date=current_date,
+                        portfolio=portfolio,
+                        num_of_news=self.num_of_news
+                    )
 
                 try:
                     # 尝试解析返回的字符串为 JSON
@@ -154,19 +144,28 @@ class Backtester:
                     }
 
             except Exception as e:
-                if "AFC is enabled" in str(e):
-                    self.logger.warning(f"触发 AFC 限制，等待 60 秒后重试...")
-                    time.sleep(60)
-                    self._api_call_count = 0
-                    self._api_window_start = time.time()
-                    continue
-
                 self.logger.warning(
                     f"获取智能体决策失败 (尝试 {attempt + 1}/{max_retries}): {str(e)}")
                 if attempt == max_retries - 1:
                     return {"decision": {"action": "hold", "quantity": 0}, "analyst_signals": {}}
                 time.sleep(2 ** attempt)
 
+    def preload_prices(self):
+        """一次性加载回测所需的行情、财务和新闻数据，建立按日期查询的开盘价表"""
+        self.data_provider = PointInTimeProvider(
+            self.ticker, self.start_date, self.end_date).load()
+        bars = self.data_provider.bars
+        dates = pd.date_range(self.start_date, self.end_date, freq="B")
+        self.open_prices = asof_price_lookup(
+            bars, dates, column="open", tolerance_days=LOOKBACK_DAYS)
+        self.logger.info(f"已加载 {len(bars)} 条行情数据，{len(self.open_prices)} 个交易日可成交")
+
+    def get_execution_price(self, current_date):
+        """获取当日成交价（当日或之前最近一个交易日的开盘价），无数据时返回 None"""
+        if self.open_prices is None:
+            self.preload_prices()
+        return self.open_prices.get(pd.Timestamp(current_date))
+
     def parse_decision_from_text(self, text):
         """从文本中解析交易决策"""
         text = text.lower()
@@ -250,13 +249,14 @@ class Backtester:
     def run_backtest(self):
         """运行回测"""
         dates = pd.date_range(self.start_date, self.end_date, freq="B")
+        self.preload_prices()
 
         self.logger.info("\n开始回测...")
         print(f"{'日期':<12} {'代码':<6} {'操作':<6} {'数量':>8} {'价格':>8} {'现金':>12} {'持仓':>8} {'总值':>12} {'看多':>8} {'看空':>8} {'中性':>8}")
         print("-" * 110)
 
         for current_date in dates:
-            lookback_start = (current_date - timedelta(days=30)
+            lookback_start = (current_date - timedelta(days=LOOKBACK_DAYS)
                               ).strftime("%Y-%m-%d")
             current_date_str = current_date.strftime("%Y-%m-%d")
 
@@ -319,11 +319,10 @@ class Backtester:
                 self.backtest_logger.info(f"决策理由: {agent_decision['reason']}")
 
             # 获取当前价格并执行交易
-            df = get_price_data(self.ticker, lookback_start, current_date_str)
-            if df is None or df.empty:
+            current_price = self.get_execution_price(current_date)
+            if current_price is None:
                 continue
 
-            current_price = df.iloc[-1]['open']
             executed_quantity = self.execute_trade(
                 action, quantity, current_price)
 
@@ -358,6 +357,7 @@ class Backtester:
         performance_df["Portfolio Value (K)"] = performance_df["Portfolio Value"] / 1000
 
         # 创建两个子图
+        plt = configure_matplotlib()
         fig, (ax1, ax2) = plt.subplots(
             2, 1, figsize=(12, 10), height_ratios=[1, 1])
         fig.suptitle("回测结果分析", fontsize=12)
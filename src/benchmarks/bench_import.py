@@ -0,0 +1,128 @@
+"""导入耗时基准测试
+
+在独立的解释器中用 python -X importtime 导入各入口模块，统计累计导入耗时，并与
+import_budget.json 中的预算比较，超出预算时以非零状态退出，便于每次发布前跟踪启动开销。
+
+用法：
+    poetry run python -m src.benchmarks.bench_import            # 测量并与预算比较
+    poetry run python -m src.benchmarks.bench_import --update   # 按当前测量值（含余量）更新预算
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(
+    os.path.dirname(os.path.abspath(__file__))))
+BUDGET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "import_budget.json")
+
+# 更新预算时至少预留的余量（毫秒），避免轻量模块的预算被测量噪声击穿
+MIN_HEADROOM_MS = 20.0
+
+# 需要跟踪导入耗时的入口模块
+MODULES = [
+    "src.main",
+    "src.backtester",
+    "src.server",
+    "src.tools.api",
+    "src.tools.openrouter_config",
+]
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int, int]]:
+    """解析 -X importtime 的输出
+
+    Returns:
+        [(模块名, 自身耗时us, 累计耗时us, 嵌套深度)]，按输出顺序
+    """
+    records = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        head, cumulative_us, name = line.split("|", 2)
+        self_us = int(head.split(":")[1])
+        depth = (len(name) - len(name.lstrip())) // 2
+        records.append((name.strip(), self_us, int(cumulative_us), depth))
+    return records
+
+
+def measure(module: str, repeat: int = 3) -> Dict[str, object]:
+    """在新的解释器中导入模块，返回多次测量中最快一次的累计耗时（毫秒）与最重的依赖"""
+    env = dict(os.environ)
+    # main.py 通过 utils.output_logger 导入，需要 src 目录也在路径中
+    env["PYTHONPATH"] = os.pathsep.join([PROJECT_ROOT, os.path.join(PROJECT_ROOT, "src")])
+    best = None
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=PROJECT_ROOT, env=env, capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise RuntimeError(f"Failed to import {module}:\n{proc.stderr[-2000:]}")
+        records = parse_importtime(proc.stderr)
+        total_us = next(cum for name, _, cum, _ in reversed(records) if name == module)
+        if best is None or total_us < best[0]:
+            best = (total_us, records)
+
+    total_us, records = best
+    # 由项目模块直接导入的外部依赖中累计耗时最多的几个。输出中子模块先于父模块，
+    # 倒序遍历时可以按深度维护当前的祖先链
+    ancestors: Dict[int, str] = {}
+    direct = []
+    for name, _, cum, depth in reversed(records):
+        ancestors[depth] = name
+        parent = ancestors.get(depth - 1, "")
+        if parent.startswith("src") and not name.startswith("src"):
+            direct.append((name, cum))
+    heaviest = sorted(direct, key=lambda item: item[1], reverse=True)[:5]
+    return {
+        "module": module,
+        "ms": total_us / 1000,
+        "heaviest": [(name, cum / 1000) for name, cum in heaviest],
+    }
+
+
+def load_budget() -> Dict[str, float]:
+    if not os.path.exists(BUDGET_PATH):
+        return {}
+    with open(BUDGET_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='导入耗时基准测试')
+    parser.add_argument('--modules', nargs='+', default=MODULES,
+                        help='要测量的模块 (默认: 各入口模块)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='每个模块测量次数，取最快一次 (默认: 3)')
+    parser.add_argument('--update', action='store_true',
+                        help='按当前测量值更新预算文件')
+    parser.add_argument('--headroom', type=float, default=1.5,
+                        help='更新预算时在测量值上乘的余量系数 (默认: 1.5)')
+    args = parser.parse_args()
+
+    budget = load_budget()
+    over_budget = []
+    for module in args.modules:
+        result = measure(module, args.repeat)
+        limit = budget.get(module)
+        status = "" if limit is None else (
+            f"budget {limit:7.1f} ms {'OVER' if result['ms'] > limit else 'ok'}")
+        print(f"{module:<32} {result['ms']:8.1f} ms  {status}")
+        for name, ms in result["heaviest"]:
+            print(f"    {name:<36} {ms:8.1f} ms")
+        if limit is not None and result["ms"] > limit:
+            over_budget.append(module)
+        if args.update:
+            budget[module] = round(max(result["ms"] * args.headroom,
+                                       result["ms"] + MIN_HEADROOM_MS), 1)
+
+    if args.update:
+        with open(BUDGET_PATH, "w", encoding="utf-8") as f:
+            json.dump(budget, f, indent=2)
+            f.write("\n")
+        print(f"Budget written to {BUDGET_PATH}")
+    elif over_budget:
+        print(f"Over budget: {', '.join(over_budget)}")
+        sys.exit(1)
@@ -0,0 +1,75 @@
+"""OBV 基准测试
+
+对比原先逐行循环实现的 calculate_obv 与向量化实现的耗时，并校验两者结果一致。
+
+用法：
+    poetry run python -m src.benchmarks.bench_obv --bars 5000 50000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.agents.technicals import calculate_obv
+
+
+def make_prices(n_bars: int, seed: int = 42) -> pd.DataFrame:
+    """生成模拟行情，包含少量收盘价持平的交易日"""
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0.0003, 0.02, n_bars)
+    returns[rng.random(n_bars) < 0.02] = 0.0
+    return pd.DataFrame({
+        "close": 100 * np.exp(np.cumsum(returns)),
+        "volume": rng.integers(1_000, 1_000_000, n_bars).astype(float),
+    })
+
+
+def legacy_calculate_obv(prices_df: pd.DataFrame) -> pd.Series:
+    """原 calculate_obv 的逐行循环实现，作为正确性与性能基准（会修改传入的 DataFrame）"""
+    obv = [0]
+    for i in range(1, len(prices_df)):
+        if prices_df['close'].iloc[i] > prices_df['close'].iloc[i - 1]:
+            obv.append(obv[-1] + prices_df['volume'].iloc[i])
+        elif prices_df['close'].iloc[i] < prices_df['close'].iloc[i - 1]:
+            obv.append(obv[-1] - prices_df['volume'].iloc[i])
+        else:
+            obv.append(obv[-1])
+    prices_df['OBV'] = obv
+    return prices_df['OBV']
+
+
+def run_benchmark(n_bars: int, repeat: int = 5) -> dict:
+    """分别计时两种实现并返回结果摘要"""
+    prices_df = make_prices(n_bars)
+
+    start = time.perf_counter()
+    expected = legacy_calculate_obv(prices_df.copy())
+    legacy_seconds = time.perf_counter() - start
+
+    vectorized_seconds = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        actual = calculate_obv(prices_df)
+        vectorized_seconds = min(vectorized_seconds, time.perf_counter() - start)
+
+    return {
+        "bars": n_bars,
+        "legacy_seconds": legacy_seconds,
+        "vectorized_seconds": vectorized_seconds,
+        "speedup": legacy_seconds / vectorized_seconds,
+        "max_abs_diff": float(np.max(np.abs(expected.to_numpy() - actual.to_numpy()))),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='OBV 基准测试')
+    parser.add_argument('--bars', type=int, nargs='+', default=[5000, 50000],
+                        help='K线数量，可指定多个 (默认: 5000 50000)')
+    args = parser.parse_args()
+
+    for n_bars in args.bars:
+        result = run_benchmark(n_bars)
+        print(f"{result['bars']:>7} bars: legacy {result['legacy_seconds'] * 1000:9.1f} ms, "
+              f"vectorized {result['vectorized_seconds'] * 1000:7.2f} ms, "
+              f"speedup {result['speedup']:7.1f}x, max diff: {result['max_abs_diff']:.2e}")
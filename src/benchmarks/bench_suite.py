@@ -0,0 +1,391 @@
+"""技术指标与风险指标基准测试套件
+
+在离线的合成行情（默认 1k/10k/100k 根K线）和 fixtures 目录中录制的行情文件上，计时 technicals.py 中的
+各个指标与策略函数、get_price_history 的指标计算（add_price_indicators）、风险管理代理的
+指标计算（calculate_risk_metrics）以及估值函数，报告每秒执行次数与 tracemalloc 统计的
+峰值内存。
+
+结果可保存为基线（bench_baseline.json），之后每次运行都与基线比较：任一用例的吞吐量
+下降或峰值内存增长超过容差时以非零状态退出。每个用例之前先计时一个固定的校准负载，比较时
+按校准负载的速度比换算基线，以抵消机器差异和运行期间机器负载变化带来的整体快慢。
+
+用法：
+    poetry run python -m src.benchmarks.bench_suite                     # 测量并与基线比较
+    poetry run python -m src.benchmarks.bench_suite --update            # 按当前测量值更新基线
+    poetry run python -m src.benchmarks.bench_suite --bars 1000 --filter trend
+    poetry run python -m src.benchmarks.bench_suite --fixture src/data/price_store/qfq/600519
+    poetry run python -m src.benchmarks.bench_suite --record 600519 --start 2016-01-01 --end 2024-06-30
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.agents import technicals
+from src.agents.risk_manager import calculate_risk_metrics
+from src.agents.valuation import (calculate_intrinsic_value, calculate_owner_earnings_value,
+                                  calculate_working_capital_change)
+from src.tools.api import add_price_indicators
+from src.tools.indicator_engine import IndicatorEngine
+from src.tools.price_features import PriceFeatures
+from src.utils.storage import read_frame
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+BASELINE_PATH = os.path.join(BENCH_DIR, "bench_baseline.json")
+
+# 录制的行情文件（CSV），默认运行时与合成行情一起计时
+FIXTURE_DIR = os.path.join(BENCH_DIR, "fixtures")
+
+# 录制行情时保留的列
+FIXTURE_COLUMNS = ["date", "open", "high", "low", "close", "volume", "amount"]
+
+# 默认的合成行情规模
+DEFAULT_BARS = [1000, 10000, 100000]
+
+# 每个计时样本的最短时长（秒），过快的用例会在一个样本内重复调用多次
+MIN_SAMPLE_SECONDS = 0.05
+
+# 默认容差：吞吐量下降超过 50% 或峰值内存增长超过 50% 视为退化；计时噪声较大的共享机器上
+# 小于该幅度的变化难以与抖动区分
+DEFAULT_TOLERANCE = 0.5
+
+
+class Case(NamedTuple):
+    """一个基准用例
+
+    setup 在计时之外根据行情数据准备参数，func 为被计时的调用。
+    per_bars 为 False 的用例与K线数量无关，只运行一次。
+    """
+    name: str
+    func: Callable[..., Any]
+    setup: Callable[[pd.DataFrame], Tuple]
+    per_bars: bool = True
+
+
+def make_ohlcv(n_bars: int, seed: int = 42) -> pd.DataFrame:
+    """生成模拟日线行情，包含少量收盘价持平（停牌）的交易日"""
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0.0003, 0.02, n_bars)
+    returns[rng.random(n_bars) < 0.02] = 0.0
+    close = 100 * np.exp(np.cumsum(returns))
+    open_ = close * (1 + rng.normal(0, 0.005, n_bars))
+    spread = np.abs(rng.normal(0, 0.01, n_bars)) * close
+    volume = rng.integers(1_000, 1_000_000, n_bars).astype(float)
+    return pd.DataFrame({
+        # 100k 根K线约 400 年，从 1800 年开始以保持在 Timestamp 的表示范围内
+        "date": pd.bdate_range("1800-01-01", periods=n_bars),
+        "open": open_,
+        "high": np.maximum(open_, close) + spread,
+        "low": np.minimum(open_, close) - spread,
+        "close": close,
+        "volume": volume,
+        "amount": volume * close,
+    })
+
+
+def load_fixture(path: str) -> pd.DataFrame:
+    """读取录制的行情：CSV 文件，或行情存储的分区（不带扩展名的路径）"""
+    if path.endswith(".csv"):
+        frame = pd.read_csv(path)
+    else:
+        frame = read_frame(path)
+        if frame is None:
+            raise FileNotFoundError(f"No price fixture found at {path}")
+    frame["date"] = pd.to_datetime(frame["date"])
+    return frame.sort_values("date").reset_index(drop=True)
+
+
+def recorded_fixtures(fixture_dir: str = FIXTURE_DIR) -> Dict[str, pd.DataFrame]:
+    """读取 fixture_dir 中的全部 CSV 行情，标签为去掉扩展名的文件名"""
+    if not os.path.isdir(fixture_dir):
+        return {}
+    return {os.path.splitext(name)[0]: load_fixture(os.path.join(fixture_dir, name))
+            for name in sorted(os.listdir(fixture_dir)) if name.endswith(".csv")}
+
+
+def record_fixture(symbol: str, start_date: str, end_date: str,
+                   fixture_dir: str = FIXTURE_DIR) -> str:
+    """从 akshare 下载一段前复权日线行情，保存为 fixture_dir/{symbol}.csv，返回文件路径"""
+    from datetime import datetime
+
+    from src.tools.price_store import fetch_price_bars
+
+    frame = fetch_price_bars(symbol, datetime.strptime(start_date, "%Y-%m-%d"),
+                             datetime.strptime(end_date, "%Y-%m-%d"))
+    if frame.empty:
+        raise ValueError(f"No price data for {symbol} between {start_date} and {end_date}")
+    os.makedirs(fixture_dir, exist_ok=True)
+    path = os.path.join(fixture_dir, f"{symbol}.csv")
+    frame[FIXTURE_COLUMNS].to_csv(path, index=False, date_format="%Y-%m-%d")
+    return path
+
+
+def _prices(df: pd.DataFrame) -> Tuple:
+    return (df,)
+
+
+def _prices_copy(df: pd.DataFrame) -> Tuple:
+    # add_price_indicators 会原地追加列，每次调用使用新的副本
+    return (df.copy(),)
+
+
+def _close(df: pd.DataFrame) -> Tuple:
+    return (df["close"].astype(float),)
+
+
+def _no_args(df: pd.DataFrame) -> Tuple:
+    return ()
+
+
+def _all_signals(df: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
+    """技术分析代理的完整策略组合：五个策略共享一个特征帧"""
+    features = PriceFeatures(df)
+    signals = {
+        "trend": technicals.calculate_trend_signals(features),
+        "mean_reversion": technicals.calculate_mean_reversion_signals(features),
+        "momentum": technicals.calculate_momentum_signals(features),
+        "volatility": technicals.calculate_volatility_signals(features),
+        "stat_arb": technicals.calculate_stat_arb_signals(features),
+    }
+    return technicals.weighted_signal_combination(signals, {
+        "trend": 0.25, "mean_reversion": 0.20, "momentum": 0.25,
+        "volatility": 0.15, "stat_arb": 0.15,
+    })
+
+
+def _indicator_engine_replay(df: pd.DataFrame) -> Dict[str, float]:
+    """技术分析代理的增量指标引擎：从空状态同步全部K线并取快照"""
+    engine = IndicatorEngine()
+    engine.sync(df)
+    return engine.snapshot()
+
+
+def _valuation() -> Tuple[float, float]:
+    """估值代理对一组财务数据的两种估值"""
+    working_capital_change = calculate_working_capital_change(5.2e8, 4.8e8)
+    owner_earnings = calculate_owner_earnings_value(
+        net_income=1.2e9, depreciation=3.5e8, capex=4.0e8,
+        working_capital_change=working_capital_change, growth_rate=0.12,
+        required_return=0.15, margin_of_safety=0.25)
+    dcf = calculate_intrinsic_value(
+        free_cash_flow=9.0e8, growth_rate=0.12, discount_rate=0.10,
+        terminal_growth_rate=0.03, num_years=5)
+    return owner_earnings, dcf
+
+
+CASES: List[Case] = [
+    # technicals.py 中的指标函数
+    Case("technicals.calculate_macd", technicals.calculate_macd, _prices),
+    Case("technicals.calculate_rsi", technicals.calculate_rsi, _prices),
+    Case("technicals.calculate_bollinger_bands", technicals.calculate_bollinger_bands, _prices),
+    Case("technicals.calculate_ema", lambda df: technicals.calculate_ema(df, 21), _prices),
+    Case("technicals.calculate_adx", technicals.calculate_adx, _prices),
+    Case("technicals.calculate_ichimoku", technicals.calculate_ichimoku, _prices),
+    Case("technicals.calculate_atr", technicals.calculate_atr, _prices),
+    Case("technicals.calculate_hurst_exponent", technicals.calculate_hurst_exponent, _close),
+    Case("technicals.calculate_obv", technicals.calculate_obv, _prices),
+    # technicals.py 中的策略函数（包含对应的 *_signal_from_metrics）
+    Case("technicals.calculate_trend_signals", technicals.calculate_trend_signals, _prices),
+    Case("technicals.calculate_mean_reversion_signals",
+         technicals.calculate_mean_reversion_signals, _prices),
+    Case("technicals.calculate_momentum_signals", technicals.calculate_momentum_signals, _prices),
+    Case("technicals.calculate_volatility_signals", technicals.calculate_volatility_signals, _prices),
+    Case("technicals.calculate_stat_arb_signals", technicals.calculate_stat_arb_signals, _prices),
+    Case("technicals.all_signals", _all_signals, _prices),
+    Case("indicator_engine.replay", _indicator_engine_replay, _prices),
+    # get_price_history 的指标计算
+    Case("api.add_price_indicators", add_price_indicators, _prices_copy),
+    # 风险管理代理的指标计算
+    Case("risk_manager.calculate_risk_metrics", calculate_risk_metrics, _close),
+    # 估值函数，与K线数量无关
+    Case("valuation.owner_earnings_and_dcf", _valuation, _no_args, per_bars=False),
+]
+
+
+def time_case(case: Case, prices_df: pd.DataFrame, repeat: int = 5) -> Dict[str, float]:
+    """计时一个用例，返回最快样本的每秒执行次数与单独一次调用的峰值内存（KB）"""
+    # 先找出一个样本内需要调用的次数，使样本时长不短于 MIN_SAMPLE_SECONDS
+    number = 1
+    while True:
+        args = [case.setup(prices_df) for _ in range(number)]
+        start = time.perf_counter()
+        for call_args in args:
+            case.func(*call_args)
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_SAMPLE_SECONDS:
+            break
+        number = max(number * 2, int(number * MIN_SAMPLE_SECONDS / max(elapsed, 1e-9)) + 1)
+
+    best = elapsed / number
+    for _ in range(repeat - 1):
+        args = [case.setup(prices_df) for _ in range(number)]
+        start = time.perf_counter()
+        for call_args in args:
+            case.func(*call_args)
+        best = min(best, (time.perf_counter() - start) / number)
+
+    # tracemalloc 会显著拖慢执行，峰值内存单独测量一次
+    call_args = case.setup(prices_df)
+    tracemalloc.start()
+    try:
+        case.func(*call_args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {"ops_per_sec": 1.0 / best, "peak_kb": peak / 1024}
+
+
+def _calibration_workload() -> float:
+    """固定的校准负载：与被测代码相近的 pandas 滚动计算加一段纯 Python 循环"""
+    series = pd.Series(np.arange(20000, dtype=float) % 97)
+    total = float(series.rolling(20).std().sum() + series.ewm(span=12).mean().sum())
+    for x in range(20000):
+        total += x % 7
+    return total
+
+
+def calibrate(repeat: int = 3) -> float:
+    """计时校准负载，返回其每秒执行次数，用于衡量当前的机器速度"""
+    case = Case("calibration", _calibration_workload, _no_args, per_bars=False)
+    return time_case(case, None, repeat)["ops_per_sec"]
+
+
+def run_suite(fixtures: Dict[str, pd.DataFrame], name_filter: Optional[str] = None,
+              repeat: int = 5, report: Callable[[str, Dict[str, float]], None] = None
+              ) -> Dict[str, Dict[str, float]]:
+    """在每个行情数据集上运行所有用例
+
+    Args:
+        fixtures: 数据集标签（如 "1000"）到行情数据的映射
+        name_filter: 只运行名称包含该字符串的用例
+        repeat: 每个用例的计时样本数
+        report: 每个用例完成后的回调，参数为结果键与结果
+
+    Returns:
+        "用例名@数据集标签" 到结果的映射，结果包含 ops_per_sec、peak_kb 以及紧邻该用例
+        测得的校准负载速度 machine_speed
+    """
+    results = {}
+    cases = [case for case in CASES if not name_filter or name_filter in case.name]
+    # 与K线数量无关的用例只在第一个数据集上运行
+    for index, (label, prices_df) in enumerate(fixtures.items()):
+        for case in cases:
+            if not case.per_bars and index > 0:
+                continue
+            key = f"{case.name}@{label}" if case.per_bars else case.name
+            speed = calibrate()
+            results[key] = time_case(case, prices_df, repeat)
+            results[key]["machine_speed"] = speed
+            if report is not None:
+                report(key, results[key])
+    return results
+
+
+def expected_ops(result: Dict[str, float], expected: Dict[str, float]) -> float:
+    """将基线吞吐量按校准负载的速度比换算到本次运行的机器速度"""
+    if result.get("machine_speed") and expected.get("machine_speed"):
+        return expected["ops_per_sec"] * result["machine_speed"] / expected["machine_speed"]
+    return expected["ops_per_sec"]
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    """与基线比较，返回退化描述列表；基线中没有的用例不参与比较
+
+    基线吞吐量先按校准负载的速度比换算到本次运行的机器速度，再与本次结果比较。
+    """
+    regressions = []
+    for key, result in results.items():
+        expected = baseline.get(key)
+        if expected is None:
+            continue
+        target = expected_ops(result, expected)
+        if result["ops_per_sec"] < target / (1 + tolerance):
+            regressions.append(
+                f"{key}: {result['ops_per_sec']:.1f} ops/s vs baseline "
+                f"{target:.1f} ops/s ({target / result['ops_per_sec']:.2f}x slower)")
+        if result["peak_kb"] > expected["peak_kb"] * (1 + tolerance) + 64:
+            regressions.append(
+                f"{key}: peak {result['peak_kb']:.0f} KB vs baseline {expected['peak_kb']:.0f} KB")
+    return regressions
+
+
+def load_baseline(path: str = BASELINE_PATH) -> Dict[str, Dict[str, float]]:
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baseline(results: Dict[str, Dict[str, float]], path: str = BASELINE_PATH) -> None:
+    baseline = load_baseline(path)
+    baseline.update({key: {name: round(number, 3) for name, number in value.items()}
+                     for key, value in results.items()})
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(dict(sorted(baseline.items())), f, indent=2)
+        f.write("\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='技术指标与风险指标基准测试套件')
+    parser.add_argument('--bars', type=int, nargs='+', default=DEFAULT_BARS,
+                        help='合成行情的K线数量，可指定多个 (默认: 1000 10000 100000)')
+    parser.add_argument('--fixture', nargs='+', default=[],
+                        help='录制的行情文件（CSV 或行情存储分区），指定后只使用这些行情')
+    parser.add_argument('--record', type=str, default=None,
+                        help='下载该股票的日线行情保存到 fixtures 目录后退出')
+    parser.add_argument('--start', type=str, default='2016-01-01',
+                        help='--record 的开始日期 (默认: 2016-01-01)')
+    parser.add_argument('--end', type=str, default=None,
+                        help='--record 的结束日期 (默认: 今天)')
+    parser.add_argument('--filter', type=str, default=None,
+                        help='只运行名称包含该字符串的用例')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='每个用例的计时样本数，取最快一次 (默认: 5)')
+    parser.add_argument('--baseline', type=str, default=BASELINE_PATH,
+                        help='基线文件路径 (默认: src/benchmarks/bench_baseline.json)')
+    parser.add_argument('--update', action='store_true',
+                        help='按当前测量值更新基线文件')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='允许的吞吐量下降与内存增长比例 (默认: 0.5)')
+    args = parser.parse_args()
+
+    if args.record:
+        end = args.end or time.strftime("%Y-%m-%d")
+        print(f"Fixture written to {record_fixture(args.record, args.start, end)}")
+        sys.exit(0)
+
+    if args.fixture:
+        fixtures = {os.path.basename(path): load_fixture(path) for path in args.fixture}
+    else:
+        fixtures = {str(n_bars): make_ohlcv(n_bars) for n_bars in args.bars}
+        fixtures.update(recorded_fixtures())
+
+    baseline = load_baseline(args.baseline)
+
+    def report(key: str, result: Dict[str, float]) -> None:
+        expected = baseline.get(key)
+        change = "" if expected is None else \
+            f"{result['ops_per_sec'] / expected_ops(result, expected) - 1:+7.1%} vs baseline"
+        print(f"{key:<58} {result['ops_per_sec']:12.1f} ops/s {result['peak_kb']:10.0f} KB  {change}")
+
+    results = run_suite(fixtures, args.filter, args.repeat, report)
+
+    if args.update:
+        save_baseline(results, args.baseline)
+        print(f"Baseline written to {args.baseline}")
+    else:
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\nRegressions beyond {args.tolerance:.0%} tolerance:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
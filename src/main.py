@@ -1,20 +1,15 @@
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import argparse
-from src.agents.valuation import valuation_agent
-from src.agents.state import AgentState
-from src.agents.sentiment import sentiment_agent
-from src.agents.risk_manager import risk_management_agent
-from src.agents.technicals import technical_analyst_agent
-from src.agents.portfolio_manager import portfolio_management_agent
-from src.agents.market_data import market_data_agent
-from src.agents.fundamentals import fundamentals_agent
-from src.agents.researcher_bull import researcher_bull_agent
-from src.agents.researcher_bear import researcher_bear_agent
-from src.agents.debate_room import debate_room_agent
-from langgraph.graph import END, StateGraph
-from langchain_core.messages import HumanMessage
-import akshare as ak
-import pandas as pd
+import contextlib
+import json
+import threading
+import time
+from src.tools.concurrency import submit_in_context
+from src.utils.decision import parse_decision
+from src.utils.lazy_import import lazy_import
+from src.utils.tickers import load_tickers
+from src.utils.tracing import span, trace_run, traced
 
 from utils.output_logger import OutputLogger
 import sys
@@ -23,11 +18,18 @@ import sys
 # This will create a timestamped log file in the logs directory
 sys.stdout = OutputLogger()
 
+# Heavy dependencies are imported on first use so that `--help` and
+# cache-only runs don't pay for them
+ak = lazy_import("akshare")
+pd = lazy_import("pandas")
+
 
 ##### Run the Hedge Fund #####
 def run_hedge_fund(ticker: str, start_date: str, end_date: str, portfolio: dict, show_reasoning: bool = False, num_of_news: int = 5):
-    final_state = app.invoke(
-        {
+    from langchain_core.messages import HumanMessage
+
+    with span("run_hedge_fund", kind="run", ticker=ticker):
+        final_state = get_app().invoke({
             "messages": [
                 HumanMessage(
                     content="Make a trading decision based on the provided data.",
@@ -43,65 +45,191 @@ def run_hedge_fund(ticker: str, start_date: str, end_date: str, portfolio: dict,
             "metadata": {
                 "show_reasoning": show_reasoning,
             }
-        },
-    )
+        })
     return final_state["messages"][-1].content
 
 
-# Define the new workflow
-workflow = StateGraph(AgentState)
+def prefetch_sentiment(tickers: list, num_of_news: int = 5, workers: int = 4) -> None:
+    """Score the recent news of every ticker in as few LLM requests as possible.
+
+    News is fetched on a worker pool, then all articles are packed into
+    batched scoring prompts. The per-ticker aggregates land in the sentiment
+    store, so each sentiment agent in the batch finds its score cached.
+    Failures are logged and left for the agents to retry.
+    """
+    from src.agents.sentiment import select_recent_news
+    from src.tools.news_crawler import get_news_sentiment_batch, get_stock_news
+
+    def recent_news(ticker):
+        return select_recent_news(ticker, get_stock_news(ticker, max_news=num_of_news))
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            futures = [submit_in_context(executor, recent_news, ticker) for ticker in tickers]
+            news_by_ticker = {ticker: future.result() for ticker, future in zip(tickers, futures)}
+        get_news_sentiment_batch(news_by_ticker, num_of_news=num_of_news)
+    except Exception as e:
+        print(f"Sentiment prefetch failed, agents will score news individually: {e}")
+
+
+def run_batch(tickers: list, start_date: str, end_date: str, portfolio: dict, output: str,
+              workers: int = 4, show_reasoning: bool = False, num_of_news: int = 5,
+              runner=None) -> list:
+    """Run the hedge fund for many tickers on a bounded worker pool.
+
+    All tickers share the compiled graph and the process-wide data and LLM
+    caches, so throughput is bounded by the Gemini rate limiter rather than
+    by interpreter startup. Each result is appended to `output` as one JSON
+    line as soon as it completes; a failing ticker is recorded with its
+    error and does not stop the batch. With the default runner, news
+    sentiment for all tickers is prefetched in batched LLM requests first.
+
+    Returns:
+        The result records in completion order.
+    """
+    if runner is None:
+        runner = run_hedge_fund
+        prefetch_sentiment(tickers, num_of_news, workers)
+    write_lock = threading.Lock()
+    records = []
+
+    def run_one(ticker):
+        started = time.perf_counter()
+        record = {"ticker": ticker, "start_date": start_date, "end_date": end_date}
+        try:
+            result = runner(ticker=ticker, start_date=start_date, end_date=end_date,
+                            portfolio=dict(portfolio), show_reasoning=show_reasoning,
+                            num_of_news=num_of_news)
+            record["decision"] = parse_decision(result)
+        except Exception as e:
+            record["error"] = str(e)
+        record["elapsed"] = round(time.perf_counter() - started, 3)
+        return record
+
+    with open(output, "a", encoding="utf-8") as f, \
+            ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = [submit_in_context(executor, run_one, ticker) for ticker in tickers]
+        for future in as_completed(futures):
+            record = future.result()
+            with write_lock:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                f.flush()
+            records.append(record)
+            status = "failed" if "error" in record else "done"
+            print(f"[{len(records)}/{len(tickers)}] {record['ticker']} {status} "
+                  f"in {record['elapsed']:.1f}s")
+    return records
+
+
+def build_workflow():
+    """Build the agent graph. Importing the agents pulls in langgraph, pandas
+    and the data tools, so this only happens on first use."""
+    from langgraph.graph import END, StateGraph
+    from src.agents.valuation import valuation_agent
+    from src.agents.state import AgentState
+    from src.agents.sentiment import sentiment_agent
+    from src.agents.risk_manager import risk_management_agent
+    from src.agents.technicals import technical_analyst_agent
+    from src.agents.portfolio_manager import portfolio_management_agent
+    from src.agents.market_data import market_data_agent
+    from src.agents.fundamentals import fundamentals_agent
+    from src.agents.researcher_bull import researcher_bull_agent
+    from src.agents.researcher_bear import researcher_bear_agent
+    from src.agents.debate_room import debate_room_agent
+
+    # Define the new workflow
+    workflow = StateGraph(AgentState)
+
+    # Add nodes, each traced as a span when tracing is enabled
+    nodes = {
+        "market_data_agent": market_data_agent,
+        "technical_analyst_agent": technical_analyst_agent,
+        "fundamentals_agent": fundamentals_agent,
+        "sentiment_agent": sentiment_agent,
+        "valuation_agent": valuation_agent,
+        "researcher_bull_agent": researcher_bull_agent,
+        "researcher_bear_agent": researcher_bear_agent,
+        "debate_room_agent": debate_room_agent,
+        "risk_management_agent": risk_management_agent,
+        "portfolio_management_agent": portfolio_management_agent,
+    }
+    for name, node in nodes.items():
+        workflow.add_node(name, traced(name, kind="agent")(node))
+
+    # Define the workflow
+    workflow.set_entry_point("market_data_agent")
+
+    # Market Data to Analysts
+    workflow.add_edge("market_data_agent", "technical_analyst_agent")
+    workflow.add_edge("market_data_agent", "fundamentals_agent")
+    workflow.add_edge("market_data_agent", "sentiment_agent")
+    workflow.add_edge("market_data_agent", "valuation_agent")
+
+    # Analysts to Researchers
+    workflow.add_edge("technical_analyst_agent", "researcher_bull_agent")
+    workflow.add_edge("fundamentals_agent", "researcher_bull_agent")
+    workflow.add_edge("sentiment_agent", "researcher_bull_agent")
+    workflow.add_edge("valuation_agent", "researcher_bull_agent")
+
+    workflow.add_edge("technical_analyst_agent", "researcher_bear_agent")
+    workflow.add_edge("fundamentals_agent", "researcher_bear_agent")
+    workflow.add_edge("sentiment_agent", "researcher_bear_agent")
+    workflow.add_edge("valuation_agent", "researcher_bear_agent")
 
-# Add nodes
-workflow.add_node("market_data_agent", market_data_agent)
-workflow.add_node("technical_analyst_agent", technical_analyst_agent)
-workflow.add_node("fundamentals_agent", fundamentals_agent)
-workflow.add_node("sentiment_agent", sentiment_agent)
-workflow.add_node("valuation_agent", valuation_agent)
-workflow.add_node("researcher_bull_agent", researcher_bull_agent)
-workflow.add_node("researcher_bear_agent", researcher_bear_agent)
-workflow.add_node("debate_room_agent", debate_room_agent)
-workflow.add_node("risk_management_agent", risk_management_agent)
-workflow.add_node("portfolio_management_agent", portfolio_management_agent)
+    # Researchers to Debate Room
+    workflow.add_edge("researcher_bull_agent", "debate_room_agent")
+    workflow.add_edge("researcher_bear_agent", "debate_room_agent")
 
-# Define the workflow
-workflow.set_entry_point("market_data_agent")
+    # Debate Room to Risk Management
+    workflow.add_edge("debate_room_agent", "risk_management_agent")
 
-# Market Data to Analysts
-workflow.add_edge("market_data_agent", "technical_analyst_agent")
-workflow.add_edge("market_data_agent", "fundamentals_agent")
-workflow.add_edge("market_data_agent", "sentiment_agent")
-workflow.add_edge("market_data_agent", "valuation_agent")
+    # Risk Management to Portfolio Management
+    workflow.add_edge("risk_management_agent", "portfolio_management_agent")
+    workflow.add_edge("portfolio_management_agent", END)
+    return workflow
 
-# Analysts to Researchers
-workflow.add_edge("technical_analyst_agent", "researcher_bull_agent")
-workflow.add_edge("fundamentals_agent", "researcher_bull_agent")
-workflow.add_edge("sentiment_agent", "researcher_bull_agent")
-workflow.add_edge("valuation_agent", "researcher_bull_agent")
 
-workflow.add_edge("technical_analyst_agent", "researcher_bear_agent")
-workflow.add_edge("fundamentals_agent", "researcher_bear_agent")
-workflow.add_edge("sentiment_agent", "researcher_bear_agent")
-workflow.add_edge("valuation_agent", "researcher_bear_agent")
+_app = None
+_app_lock = threading.Lock()
 
-# Researchers to Debate Room
-workflow.add_edge("researcher_bull_agent", "debate_room_agent")
-workflow.add_edge("researcher_bear_agent", "debate_room_agent")
 
-# Debate Room to Risk Management
-workflow.add_edge("debate_room_agent", "risk_management_agent")
+def get_app():
+    """Return the compiled graph, compiling it once per process."""
+    global _app
+    if _app is None:
+        with _app_lock:
+            if _app is None:
+                _app = build_workflow().compile()
+    return _app
 
-# Risk Management to Portfolio Management
-workflow.add_edge("risk_management_agent", "portfolio_management_agent")
-workflow.add_edge("portfolio_management_agent", END)
 
-app = workflow.compile()
+def __getattr__(name):
+    # `from src.main import app` keeps working, compiled on first access
+    if name == "app":
+        return get_app()
+    if name == "workflow":
+        return build_workflow()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 # Add this at the bottom of the file
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(
         description='Run the hedge fund trading system')
-    parser.add_argument('--ticker', type=str, required=True,
-                        help='Stock ticker symbol')
+    ticker_group = parser.add_mutually_exclusive_group(required=True)
+    ticker_group.add_argument('--ticker', type=str,
+                              help='Stock ticker symbol')
+    ticker_group.add_argument('--tickers', type=str,
+                              help='Comma-separated ticker symbols to run as a batch')
+    ticker_group.add_argument('--tickers-file', type=str,
+                              help='File with ticker symbols (one per line) to run as a batch')
+    parser.add_argument('--workers', type=int, default=4,
+                        help='Number of tickers analyzed concurrently in batch mode (default: 4)')
+    parser.add_argument('--output', type=str,
+                        help='JSONL file for batch results (default: logs/batch_<timestamp>.jsonl)')
+    parser.add_argument('--trace', type=str, nargs='?', const='',
+                        help='Record per-agent, akshare and Gemini timing spans to a JSONL file '
+                             '(default: logs/trace_<timestamp>.jsonl) and print a summary')
     parser.add_argument('--start-date', type=str,
                         help='Start date (YYYY-MM-DD). Defaults to 1 year before end date')
     parser.add_argument('--end-date', type=str,
@@ -145,19 +273,49 @@ if __name__ == "__main__":
         "stock": args.initial_position
     }
 
-    result = run_hedge_fund(
-        ticker=args.ticker,
-        start_date=start_date.strftime('%Y-%m-%d'),
-        end_date=end_date.strftime('%Y-%m-%d'),
-        portfolio=portfolio,
-        show_reasoning=args.show_reasoning,
-        num_of_news=args.num_of_news
-    )
-    print("\nFinal Result:")
-    print(result)
-
-
-def get_historical_data(symbol: str) -> pd.DataFrame:
+    # Optionally trace where the time goes: agents, akshare and Gemini calls
+    if args.trace is not None:
+        trace_path = args.trace or \
+            f"logs/trace_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+        tracing = trace_run(trace_path)
+    else:
+        tracing = contextlib.nullcontext()
+
+    with tracing:
+        if args.ticker:
+            result = run_hedge_fund(
+                ticker=args.ticker,
+                start_date=start_date.strftime('%Y-%m-%d'),
+                end_date=end_date.strftime('%Y-%m-%d'),
+                portfolio=portfolio,
+                show_reasoning=args.show_reasoning,
+                num_of_news=args.num_of_news
+            )
+            print("\nFinal Result:")
+            print(result)
+        else:
+            tickers = load_tickers(args.tickers, args.tickers_file)
+            if not tickers:
+                raise ValueError("No tickers to run")
+            output = args.output or \
+                f"logs/batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+            print(f"Running {len(tickers)} tickers with {args.workers} workers, "
+                  f"writing results to {output}")
+            records = run_batch(
+                tickers,
+                start_date=start_date.strftime('%Y-%m-%d'),
+                end_date=end_date.strftime('%Y-%m-%d'),
+                portfolio=portfolio,
+                output=output,
+                workers=args.workers,
+                show_reasoning=args.show_reasoning,
+                num_of_news=args.num_of_news
+            )
+            failed = sum(1 for record in records if "error" in record)
+            print(f"\nBatch finished: {len(records) - failed} succeeded, {failed} failed")
+
+
+def get_historical_data(symbol: str) -> "pd.DataFrame":
     """Get historical market data for a given stock symbol.
     If we can't get the full year of data, use whatever is available."""
     # Calculate date range
@@ -0,0 +1,188 @@
+import json
+import time
+import argparse
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Optional
+
+from src.tools.llm_cache import llm_cache
+from src.utils.decision import parse_decision
+from src.utils.logging_config import setup_logger
+
+# 设置日志记录
+logger = setup_logger('server')
+
+
+class ServiceStats:
+    """请求计数与耗时统计（线程安全）"""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.requests = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, elapsed: float, error: bool = False) -> None:
+        with self._lock:
+            self.requests += 1
+            self.errors += int(error)
+            self.total_seconds += elapsed
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "uptime": round(time.time() - self.started_at, 3),
+                "requests": self.requests,
+                "errors": self.errors,
+                "avg_latency": round(self.total_seconds / self.requests, 3) if self.requests else 0.0,
+            }
+
+
+def parse_run_request(body: Dict[str, Any]) -> Dict[str, Any]:
+    """校验 /run 请求并补全默认参数（与 main.py 命令行的默认值一致）
+
+    Raises:
+        ValueError: 参数无效
+    """
+    ticker = str(body.get("ticker", "")).strip()
+    if len(ticker) != 6:
+        raise ValueError("ticker must be a 6-digit stock code")
+
+    yesterday = datetime.now() - timedelta(days=1)
+    end_date = min(datetime.strptime(body["end_date"], "%Y-%m-%d"), yesterday) \
+        if body.get("end_date") else yesterday
+    start_date = datetime.strptime(body["start_date"], "%Y-%m-%d") \
+        if body.get("start_date") else end_date - timedelta(days=365)
+    if start_date > end_date:
+        raise ValueError("start_date cannot be after end_date")
+
+    num_of_news = int(body.get("num_of_news", 5))
+    if not 1 <= num_of_news <= 100:
+        raise ValueError("num_of_news must be between 1 and 100")
+
+    portfolio = body.get("portfolio") or {}
+    return {
+        "ticker": ticker,
+        "start_date": start_date.strftime("%Y-%m-%d"),
+        "end_date": end_date.strftime("%Y-%m-%d"),
+        "portfolio": {
+            "cash": float(portfolio.get("cash", 100000.0)),
+            "stock": int(portfolio.get("stock", 0)),
+        },
+        "show_reasoning": bool(body.get("show_reasoning", False)),
+        "num_of_news": num_of_news,
+    }
+
+
+class DecisionRequestHandler(BaseHTTPRequestHandler):
+    """处理 /run、/health、/stats 请求，服务实例挂在 self.server 上"""
+
+    def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok"})
+        elif self.path == "/stats":
+            self._send_json(200, self.server.stats_payload())
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path != "/run":
+            self._send_json(404, {"error": "not found"})
+            return
+
+        started = time.perf_counter()
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            params = parse_run_request(body)
+        except (ValueError, TypeError, KeyError) as e:
+            self.server.stats.record(time.perf_counter() - started, error=True)
+            self._send_json(400, {"error": str(e)})
+            return
+
+        try:
+            result = self.server.runner(**params)
+            elapsed = time.perf_counter() - started
+            self.server.stats.record(elapsed)
+            self._send_json(200, {
+                "ticker": params["ticker"],
+                "start_date": params["start_date"],
+                "end_date": params["end_date"],
+                "decision": parse_decision(result),
+                "elapsed": round(elapsed, 3),
+            })
+        except Exception as e:
+            logger.error(f"Failed to run {params['ticker']}: {e}")
+            self.server.stats.record(time.perf_counter() - started, error=True)
+            self._send_json(500, {"error": str(e)})
+
+    def log_message(self, format, *args):
+        logger.info(f"{self.address_string()} - {format % args}")
+
+
+class DecisionServer(ThreadingHTTPServer):
+    """常驻的决策服务
+
+    进程内只编译一次工作流，行情存储、财报缓存、实时行情快照、LLM 响应缓存和限速器
+    在请求之间保持热状态，每个请求只需付出增量的数据获取与模型调用时间。
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, runner: Optional[Callable[..., str]] = None):
+        """
+        Args:
+            address: (host, port)，端口为 0 时自动分配
+            runner: 处理单个请求的函数，签名同 run_hedge_fund，默认为 run_hedge_fund
+        """
+        if runner is None:
+            # 服务启动时导入依赖并编译工作流，之后的请求直接复用
+            from src.main import get_app, run_hedge_fund
+            get_app()
+            runner = run_hedge_fund
+        self.runner = runner
+        self.stats = ServiceStats()
+        super().__init__(address, DecisionRequestHandler)
+
+    def stats_payload(self) -> Dict[str, Any]:
+        payload = self.stats.to_dict()
+        payload["llm_cache"] = llm_cache.stats()
+        return payload
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the hedge fund as a local HTTP service')
+    parser.add_argument('--host', type=str, default='127.0.0.1',
+                        help='Host to bind (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8000,
+                        help='Port to listen on (default: 8000)')
+    parser.add_argument('--stub-llm', action='store_true',
+                        help='Answer LLM calls with a local stub instead of Gemini')
+    args = parser.parse_args()
+
+    if args.stub_llm:
+        from src.tools.stub_llm import install_stub_llm
+        install_stub_llm()
+
+    server = DecisionServer((args.host, args.port))
+    logger.info(f"Decision service listening on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
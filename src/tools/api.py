@@ -1,39 +1,50 @@
 from typing import Dict, Any, List
 import pandas as pd
-import akshare as ak
 from datetime import datetime, timedelta
 import json
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from concurrent.futures import ThreadPoolExecutor
+from src.utils.lazy_import import lazy_import
+from src.utils.tracing import traced_module
 from src.utils.logging_config import setup_logger
+from src.tools.concurrency import source_slot, submit_in_context
+from src.tools.price_store import price_store
+from src.tools.spot_snapshot import spot_snapshot
+from src.tools.statement_cache import statement_cache
+from src.tools.point_in_time import get_active_provider
 
 # 设置日志记录
 logger = setup_logger('api')
 
+# akshare 导入较慢，首次调用时才导入；每次调用记录为追踪 span
+ak = traced_module(lazy_import("akshare"), "akshare")
+
 
 def get_financial_metrics(symbol: str) -> Dict[str, Any]:
     """获取财务指标数据"""
     logger.info(f"Getting financial indicators for {symbol}...")
+    # 回测中使用时点数据视图，只能看到截至当前时点的数据
+    provider = get_active_provider(symbol)
     try:
         # 获取实时行情数据（用于市值和估值比率）
         logger.info("Fetching real-time quotes...")
-        realtime_data = ak.stock_zh_a_spot_em()
-        if realtime_data is None or realtime_data.empty:
-            logger.warning("No real-time quotes data available")
-            return [{}]
-
-        stock_data = realtime_data[realtime_data['代码'] == symbol]
-        if stock_data.empty:
+        stock_data = provider.get_quote() if provider else spot_snapshot.get_quote(symbol)
+        if stock_data is None:
             logger.warning(f"No real-time quotes found for {symbol}")
             return [{}]
 
-        stock_data = stock_data.iloc[0]
         logger.info("✓ Real-time quotes fetched")
 
         # 获取新浪财务指标
         logger.info("Fetching Sina financial indicators...")
-        current_year = datetime.now().year
-        financial_data = ak.stock_financial_analysis_indicator(
-            symbol=symbol, start_year=str(current_year-1))
+        if provider:
+            financial_data = provider.get_financial_indicators()
+        else:
+            current_year = datetime.now().year
+            with source_slot("sina"):
+                financial_data = ak.stock_financial_analysis_indicator(
+                    symbol=symbol, start_year=str(current_year-1))
         if financial_data is None or financial_data.empty:
             logger.warning("No financial indicator data available")
             return [{}]
@@ -50,8 +61,8 @@ def get_financial_metrics(symbol: str) -> Dict[str, Any]:
         # 获取利润表数据（用于计算 price_to_sales）
         logger.info("Fetching income statement...")
         try:
-            income_statement = ak.stock_financial_report_sina(
-                stock=f"sh{symbol}", symbol="利润表")
+            income_statement = provider.get_statement("利润表") if provider \
+                else statement_cache.get(symbol, "利润表")
             if not income_statement.empty:
                 latest_income = income_statement.iloc[0]
                 logger.info("✓ Income statement fetched")
@@ -152,12 +163,21 @@ def get_financial_metrics(symbol: str) -> Dict[str, Any]:
 def get_financial_statements(symbol: str) -> Dict[str, Any]:
     """获取财务报表数据"""
     logger.info(f"Getting financial statements for {symbol}...")
+    provider = get_active_provider(symbol)
+    get_statement = (lambda _, statement: provider.get_statement(statement)) \
+        if provider else statement_cache.get
     try:
+        # 三张报表相互独立，并发获取；单张报表的失败在下面各自的分支中处理
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            statement_futures = {
+                statement: submit_in_context(executor, get_statement, symbol, statement)
+                for statement in ("资产负债表", "利润表", "现金流量表")
+            }
+
         # 获取资产负债表数据
         logger.info("Fetching balance sheet...")
         try:
-            balance_sheet = ak.stock_financial_report_sina(
-                stock=f"sh{symbol}", symbol="资产负债表")
+            balance_sheet = statement_futures["资产负债表"].result()
             if not balance_sheet.empty:
                 latest_balance = balance_sheet.iloc[0]
                 previous_balance = balance_sheet.iloc[1] if len(
@@ -177,8 +197,7 @@ def get_financial_statements(symbol: str) -> Dict[str, Any]:
         # 获取利润表数据
         logger.info("Fetching income statement...")
         try:
-            income_statement = ak.stock_financial_report_sina(
-                stock=f"sh{symbol}", symbol="利润表")
+            income_statement = statement_futures["利润表"].result()
             if not income_statement.empty:
                 latest_income = income_statement.iloc[0]
                 previous_income = income_statement.iloc[1] if len(
@@ -198,8 +217,7 @@ def get_financial_statements(symbol: str) -> Dict[str, Any]:
         # 获取现金流量表数据
         logger.info("Fetching cash flow statement...")
         try:
-            cash_flow = ak.stock_financial_report_sina(
-                stock=f"sh{symbol}", symbol="现金流量表")
+            cash_flow = statement_futures["现金流量表"].result()
             if not cash_flow.empty:
                 latest_cash_flow = cash_flow.iloc[0]
                 previous_cash_flow = cash_flow.iloc[1] if len(
@@ -282,9 +300,13 @@ def get_financial_statements(symbol: str) -> Dict[str, Any]:
 def get_market_data(symbol: str) -> Dict[str, Any]:
     """获取市场数据"""
     try:
-        # 获取实时行情
-        realtime_data = ak.stock_zh_a_spot_em()
-        stock_data = realtime_data[realtime_data['代码'] == symbol].iloc[0]
+        # 获取实时行情（共享全市场快照缓存；回测中使用时点数据视图）
+        provider = get_active_provider(symbol)
+        stock_data = provider.get_quote() if provider else spot_snapshot.get_quote(symbol)
+        if stock_data is None:
+            logger.error(
+                f"Error getting market data: no real-time quotes found for {symbol}")
+            return {}
 
         return {
             "market_cap": float(stock_data.get("总市值", 0)),
@@ -300,6 +322,167 @@ def get_market_data(symbol: str) -> Dict[str, Any]:
         return {}
 
 
+def calculate_rolling_hurst(log_returns: pd.Series, window: int = 120, min_periods: int = 60) -> pd.Series:
+    """向量化计算滚动Hurst指数
+
+    结果与逐窗口执行以下步骤的 rolling(...).apply 实现一致：
+    窗口内序列去除空值后取相邻值之比的对数，对 2-10 的每个 lag 计算滚动标准差的均值 tau，
+    再以 log(lag) 对 log(tau) 做线性回归，斜率的一半即为 Hurst 指数。
+
+    每个窗口内的有效比值都是全序列有效比值中连续的一段，因此各 lag 的滚动标准差只需在
+    全序列上用 sliding_window_view 计算一次，窗口内的均值通过前缀和得到，
+    最后按 lag 个数分组批量求最小二乘斜率，无需逐窗口调用 Python 函数。
+
+    Args:
+        log_returns: 对数收益率序列
+        window: 滚动窗口长度
+        min_periods: 窗口内至少需要的非空数据点数
+
+    Returns:
+        与 log_returns 索引相同的Hurst指数序列，无法计算的位置为NaN
+    """
+    max_lag = 10
+    values = log_returns.to_numpy(dtype=float)
+    n = len(values)
+    hurst = np.full(n, np.nan)
+    if n == 0:
+        return pd.Series(hurst, index=log_returns.index)
+
+    # 每个窗口在去除空值后的序列 R 中对应的区间 [ka, kb]
+    valid = ~np.isnan(values)
+    series = values[valid]
+    valid_before = np.concatenate([[0], np.cumsum(valid)])
+    ends = np.arange(n)
+    ka = valid_before[np.maximum(0, ends - window + 1)]
+    kb = valid_before[ends + 1] - 1
+    series_len = kb - ka + 1
+
+    # 相邻值之比的对数；比值为负或0/0时为NaN（会被剔除），除零产生的 ±inf 保留
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_ratios = np.log(series[1:] / series[:-1])
+    ratio_valid = ~np.isnan(log_ratios)
+    ratios = log_ratios[ratio_valid]
+    # ratios_before[k]: 分子下标不超过 k 的有效比值个数
+    ratios_before = np.concatenate([[0], np.cumsum(ratio_valid)])
+
+    eligible = (series_len >= max(min_periods, 30)) & (series_len > 0)
+    start = np.where(eligible, ratios_before[np.clip(ka, 0, None)], 0)
+    stop = np.where(eligible, ratios_before[np.clip(kb, 0, None)], 0)
+    ratio_len = stop - start
+    eligible &= ratio_len >= 30
+
+    # 各窗口使用的 lag 上限：range(2, min(11, len // 4))
+    lag_stop = np.minimum(max_lag + 1, ratio_len // 4)
+    lags = np.arange(2, max_lag + 1)
+    log_tau = np.full((n, len(lags)), np.nan)
+    missing = np.zeros(n, dtype=bool)
+
+    for j, lag in enumerate(lags):
+        used = eligible & (lag < lag_stop)
+        if len(ratios) < lag or not used.any():
+            missing |= used
+            continue
+        with np.errstate(invalid="ignore"):
+            stds = sliding_window_view(ratios, lag).std(axis=1, ddof=1)
+        finite = np.isfinite(stds)
+        std_sum = np.concatenate([[0.0], np.cumsum(np.where(finite, stds, 0.0))])
+        std_count = np.concatenate([[0], np.cumsum(finite)])
+
+        # 窗口内第一个完整 lag 子窗口从 start 开始，最后一个从 stop - lag 开始
+        lo = start[used]
+        hi = np.maximum(stop[used] - lag + 1, lo)
+        count = std_count[hi] - std_count[lo]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            tau = (std_sum[hi] - std_sum[lo]) / count
+            log_tau[used, j] = np.log(tau)
+        # 某个 lag 没有可用的标准差时原实现回归失败，结果为NaN
+        missing[np.flatnonzero(used)[count == 0]] = True
+
+    # 按 lag 个数分组批量计算回归斜率
+    log_lags = np.log(lags)
+    for m in np.unique(lag_stop[eligible]):
+        n_lags = int(m) - 2
+        if n_lags < 3:
+            continue
+        rows = eligible & (lag_stop == m) & ~missing
+        x = log_lags[:n_lags]
+        y = log_tau[rows, :n_lags]
+        x_centered = x - x.mean()
+        with np.errstate(invalid="ignore"):
+            slope = ((y - y.mean(axis=1, keepdims=True)) @ x_centered) / (x_centered @ x_centered)
+        hurst[rows] = slope / 2.0
+
+    hurst[~np.isfinite(hurst)] = np.nan
+    return pd.Series(hurst, index=log_returns.index)
+
+
+def add_price_indicators(df: pd.DataFrame) -> pd.DataFrame:
+    """在行情数据上原地追加 get_price_history 返回的技术指标列
+
+    Args:
+        df: 包含 high/low/close/volume 列、按日期升序排列的行情数据
+
+    Returns:
+        追加了动量、波动率和统计套利指标列的同一个 DataFrame
+    """
+    # 计算动量指标
+    df["momentum_1m"] = df["close"].pct_change(periods=20)  # 20个交易日约等于1个月
+    df["momentum_3m"] = df["close"].pct_change(periods=60)  # 60个交易日约等于3个月
+    df["momentum_6m"] = df["close"].pct_change(
+        periods=120)  # 120个交易日约等于6个月
+
+    # 计算成交量动量（相对于20日平均成交量的变化）
+    df["volume_ma20"] = df["volume"].rolling(window=20).mean()
+    df["volume_momentum"] = df["volume"] / df["volume_ma20"]
+
+    # 计算波动率指标
+    # 1. 历史波动率 (20日)
+    returns = df["close"].pct_change()
+    df["historical_volatility"] = returns.rolling(
+        window=20).std() * np.sqrt(252)  # 年化
+
+    # 2. 波动率区间 (相对于过去120天的波动率的位置)
+    volatility_120d = returns.rolling(window=120).std() * np.sqrt(252)
+    vol_min = volatility_120d.rolling(window=120).min()
+    vol_max = volatility_120d.rolling(window=120).max()
+    vol_range = vol_max - vol_min
+    df["volatility_regime"] = np.where(
+        vol_range > 0,
+        (df["historical_volatility"] - vol_min) / vol_range,
+        0  # 当范围为0时返回0
+    )
+
+    # 3. 波动率Z分数
+    vol_mean = df["historical_volatility"].rolling(window=120).mean()
+    vol_std = df["historical_volatility"].rolling(window=120).std()
+    df["volatility_z_score"] = (
+        df["historical_volatility"] - vol_mean) / vol_std
+
+    # 4. ATR比率
+    tr = pd.DataFrame()
+    tr["h-l"] = df["high"] - df["low"]
+    tr["h-pc"] = abs(df["high"] - df["close"].shift(1))
+    tr["l-pc"] = abs(df["low"] - df["close"].shift(1))
+    tr["tr"] = tr[["h-l", "h-pc", "l-pc"]].max(axis=1)
+    df["atr"] = tr["tr"].rolling(window=14).mean()
+    df["atr_ratio"] = df["atr"] / df["close"]
+
+    # 计算统计套利指标
+    # 1. 赫斯特指数 (使用过去120天的数据)
+    # 使用对数收益率计算Hurst指数，要求至少60个数据点
+    log_returns = np.log(df["close"] / df["close"].shift(1))
+    df["hurst_exponent"] = calculate_rolling_hurst(
+        log_returns, window=120, min_periods=60)
+
+    # 2. 偏度 (20日)
+    df["skewness"] = returns.rolling(window=20).skew()
+
+    # 3. 峰度 (20日)
+    df["kurtosis"] = returns.rolling(window=20).kurt()
+
+    return df
+
+
 def get_price_history(symbol: str, start_date: str = None, end_date: str = None, adjust: str = "qfq") -> pd.DataFrame:
     """获取历史价格数据
 
@@ -362,37 +545,14 @@ def get_price_history(symbol: str, start_date: str = None, end_date: str = None,
         logger.info(f"Start date: {start_date.strftime('%Y-%m-%d')}")
         logger.info(f"End date: {end_date.strftime('%Y-%m-%d')}")
 
+        provider = get_active_provider(symbol)
+
         def get_and_process_data(start_date, end_date):
-            """获取并处理数据，包括重命名列等操作"""
-            df = ak.stock_zh_a_hist(
-                symbol=symbol,
-                period="daily",
-                start_date=start_date.strftime("%Y%m%d"),
-                end_date=end_date.strftime("%Y%m%d"),
-                adjust=adjust
-            )
-
-            if df is None or df.empty:
-                return pd.DataFrame()
-
-            # 重命名列以匹配技术分析代理的需求
-            df = df.rename(columns={
-                "日期": "date",
-                "开盘": "open",
-                "最高": "high",
-                "最低": "low",
-                "收盘": "close",
-                "成交量": "volume",
-                "成交额": "amount",
-                "振幅": "amplitude",
-                "涨跌幅": "pct_change",
-                "涨跌额": "change_amount",
-                "换手率": "turnover"
-            })
-
-            # 确保日期列为datetime类型
-            df["date"] = pd.to_datetime(df["date"])
-            return df
+            """获取并处理数据，优先读取本地行情存储，仅向 akshare 请求缺失的日期区间"""
+            if provider and adjust == "qfq":
+                # 回测中从预加载的行情中截取，不晚于当前时点
+                return provider.get_bars(start_date, end_date)
+            return price_store.get_bars(symbol, start_date, end_date, adjust)
 
         # 获取历史行情数据
         df = get_and_process_data(start_date, end_date)
@@ -417,115 +577,7 @@ def get_price_history(symbol: str, start_date: str = None, end_date: str = None,
                 logger.warning(
                     f"Warning: Even with extended time range, insufficient data ({len(df)} days)")
 
-        # 计算动量指标
-        df["momentum_1m"] = df["close"].pct_change(periods=20)  # 20个交易日约等于1个月
-        df["momentum_3m"] = df["close"].pct_change(periods=60)  # 60个交易日约等于3个月
-        df["momentum_6m"] = df["close"].pct_change(
-            periods=120)  # 120个交易日约等于6个月
-
-        # 计算成交量动量（相对于20日平均成交量的变化）
-        df["volume_ma20"] = df["volume"].rolling(window=20).mean()
-        df["volume_momentum"] = df["volume"] / df["volume_ma20"]
-
-        # 计算波动率指标
-        # 1. 历史波动率 (20日)
-        returns = df["close"].pct_change()
-        df["historical_volatility"] = returns.rolling(
-            window=20).std() * np.sqrt(252)  # 年化
-
-        # 2. 波动率区间 (相对于过去120天的波动率的位置)
-        volatility_120d = returns.rolling(window=120).std() * np.sqrt(252)
-        vol_min = volatility_120d.rolling(window=120).min()
-        vol_max = volatility_120d.rolling(window=120).max()
-        vol_range = vol_max - vol_min
-        df["volatility_regime"] = np.where(
-            vol_range > 0,
-            (df["historical_volatility"] - vol_min) / vol_range,
-            0  # 当范围为0时返回0
-        )
-
-        # 3. 波动率Z分数
-        vol_mean = df["historical_volatility"].rolling(window=120).mean()
-        vol_std = df["historical_volatility"].rolling(window=120).std()
-        df["volatility_z_score"] = (
-            df["historical_volatility"] - vol_mean) / vol_std
-
-        # 4. ATR比率
-        tr = pd.DataFrame()
-        tr["h-l"] = df["high"] - df["low"]
-        tr["h-pc"] = abs(df["high"] - df["close"].shift(1))
-        tr["l-pc"] = abs(df["low"] - df["close"].shift(1))
-        tr["tr"] = tr[["h-l", "h-pc", "l-pc"]].max(axis=1)
-        df["atr"] = tr["tr"].rolling(window=14).mean()
-        df["atr_ratio"] = df["atr"] / df["close"]
-
-        # 计算统计套利指标
-        # 1. 赫斯特指数 (使用过去120天的数据)
-        def calculate_hurst(series):
-            """
-            计算Hurst指数。
-
-            Args:
-                series: 价格序列
-
-            Returns:
-                float: Hurst指数，或在计算失败时返回np.nan
-            """
-            try:
-                series = series.dropna()
-                if len(series) < 30:  # 降低最小数据点要求
-                    return np.nan
-
-                # 使用对数收益率
-                log_returns = np.log(series / series.shift(1)).dropna()
-                if len(log_returns) < 30:  # 降低最小数据点要求
-                    return np.nan
-
-                # 使用更小的lag范围
-                # 减少lag范围到2-10天
-                lags = range(2, min(11, len(log_returns) // 4))
-
-                # 计算每个lag的标准差
-                tau = []
-                for lag in lags:
-                    # 计算滚动标准差
-                    std = log_returns.rolling(window=lag).std().dropna()
-                    if len(std) > 0:
-                        tau.append(np.mean(std))
-
-                # 基本的数值检查
-                if len(tau) < 3:  # 进一步降低最小要求
-                    return np.nan
-
-                # 使用对数回归
-                lags_log = np.log(list(lags))
-                tau_log = np.log(tau)
-
-                # 计算回归系数
-                reg = np.polyfit(lags_log, tau_log, 1)
-                hurst = reg[0] / 2.0
-
-                # 只保留基本的数值检查
-                if np.isnan(hurst) or np.isinf(hurst):
-                    return np.nan
-
-                return hurst
-
-            except Exception as e:
-                return np.nan
-
-        # 使用对数收益率计算Hurst指数
-        log_returns = np.log(df["close"] / df["close"].shift(1))
-        df["hurst_exponent"] = log_returns.rolling(
-            window=120,
-            min_periods=60  # 要求至少60个数据点
-        ).apply(calculate_hurst)
-
-        # 2. 偏度 (20日)
-        df["skewness"] = returns.rolling(window=20).skew()
-
-        # 3. 峰度 (20日)
-        df["kurtosis"] = returns.rolling(window=20).kurt()
+        df = add_price_indicators(df)
 
         # 按日期升序排序
         df = df.sort_values("date")
@@ -551,10 +603,49 @@ def get_price_history(symbol: str, start_date: str = None, end_date: str = None,
         return pd.DataFrame()
 
 
+def prices_to_columns(prices_df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """将价格 DataFrame 转换为按列存储的 NumPy 数组字典
+
+    用于在 AgentState["data"]["prices"] 中传递行情数据，避免为每一行创建字典；
+    下游通过 prices_to_df 或直接读取数组访问，不会复制数据。
+
+    Args:
+        prices_df: 价格数据
+
+    Returns:
+        列名到一维数组的映射
+    """
+    return {str(col): prices_df[col].to_numpy() for col in prices_df.columns}
+
+
+def get_price_column(prices, column: str) -> np.ndarray:
+    """从价格数据（按列数组字典或旧的逐行字典列表）中读取一列
+
+    Args:
+        prices: AgentState 中的价格数据
+        column: 列名，如 'close'
+
+    Returns:
+        该列的 NumPy 数组，列不存在时返回空数组
+    """
+    if isinstance(prices, dict):
+        values = prices.get(column)
+        return np.asarray(values) if values is not None else np.array([], dtype=float)
+    return prices_to_df(prices)[column].to_numpy()
+
+
 def prices_to_df(prices):
-    """Convert price data to DataFrame with standardized column names"""
+    """Convert price data to DataFrame with standardized column names
+
+    Accepts either the columnar payload produced by prices_to_columns (no copy)
+    or a legacy list of row dicts.
+    """
     try:
-        df = pd.DataFrame(prices)
+        if isinstance(prices, dict):
+            # 按列数组直接构造，与 AgentState 中的数组共享内存
+            df = pd.DataFrame(prices, copy=False)
+        else:
+            df = pd.DataFrame(prices)
 
         # 标准化列名映射
         column_mapping = {
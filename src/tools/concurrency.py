@@ -0,0 +1,85 @@
+import contextvars
+import threading
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from src.utils.env import getenv
+from src.utils.logging_config import setup_logger
+
+# 设置日志记录
+logger = setup_logger('concurrency')
+
+# 各数据源允许的最大并发请求数，可通过环境变量 FETCH_LIMIT_<SOURCE> 覆盖，
+# 例如 FETCH_LIMIT_SINA=2
+DEFAULT_SOURCE_LIMITS = {
+    "eastmoney": 4,  # 东方财富：日线行情、实时行情、新闻
+    "sina": 3,       # 新浪财经：财务报表、财务指标
+}
+
+_semaphores: Dict[str, threading.BoundedSemaphore] = {}
+_semaphores_lock = threading.Lock()
+
+
+def get_source_limit(source: str) -> int:
+    """获取数据源的并发上限"""
+    default = DEFAULT_SOURCE_LIMITS.get(source, 2)
+    return max(1, int(getenv(f"FETCH_LIMIT_{source.upper()}", default)))
+
+
+@contextmanager
+def source_slot(source: str) -> Iterator[None]:
+    """占用数据源的一个并发名额，超出上限的请求会排队等待
+
+    Args:
+        source: 数据源名称，如 "eastmoney"、"sina"
+    """
+    with _semaphores_lock:
+        semaphore = _semaphores.get(source)
+        if semaphore is None:
+            semaphore = threading.BoundedSemaphore(get_source_limit(source))
+            _semaphores[source] = semaphore
+    with semaphore:
+        yield
+
+
+class KeyedLocks:
+    """按键区分的锁，用于同一份数据只允许一个线程下载（single-flight）"""
+
+    def __init__(self):
+        self._locks: Dict[Any, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> threading.Lock:
+        with self._lock:
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = threading.Lock()
+                self._locks[key] = lock
+            return lock
+
+
+def submit_in_context(executor: Executor, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+    """在调用方上下文的副本中提交任务，使线程内的追踪 span 挂在当前 span 之下
+
+    每个任务复制一份上下文：同一个 Context 不能同时在多个线程中运行。
+    """
+    return executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+def run_concurrently(tasks: Dict[str, Callable[[], Any]],
+                     max_workers: Optional[int] = None) -> Dict[str, Any]:
+    """并发执行一组相互独立的 I/O 任务
+
+    Args:
+        tasks: 任务名到无参函数的映射
+        max_workers: 最大线程数，默认每个任务一个线程
+
+    Returns:
+        任务名到返回值的映射；任务抛出的异常会在这里重新抛出
+    """
+    if not tasks:
+        return {}
+    with ThreadPoolExecutor(max_workers=max_workers or len(tasks)) as executor:
+        futures = {name: submit_in_context(executor, task) for name, task in tasks.items()}
+        return {name: future.result() for name, future in futures.items()}
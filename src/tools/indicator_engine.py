@@ -0,0 +1,393 @@
+import math
+import os
+from collections import deque
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.utils.logging_config import setup_logger
+from src.tools.concurrency import KeyedLocks
+from src.utils.storage import get_data_path, read_pickle, write_pickle
+
+# 设置日志记录
+logger = setup_logger('indicator_engine')
+
+# 检查点格式版本，状态结构变化时递增，旧检查点会被丢弃并重新计算
+STATE_VERSION = 1
+
+# 计算Hurst指数时保留的最近收盘价个数
+HURST_WINDOW = 250
+
+# 判断最后一根K线是否被复权修改的相对容差
+_CLOSE_TOLERANCE = 1e-6
+
+
+class _Ewm:
+    """与 pandas Series.ewm(span=...).mean() 逐点结果一致的指数加权均值"""
+
+    def __init__(self, span: int, adjust: bool):
+        alpha = 2.0 / (span + 1.0)
+        self._old_wt_factor = 1.0 - alpha
+        self._new_wt = 1.0 if adjust else alpha
+        self._adjust = adjust
+        self._old_wt = 1.0
+        self.value = math.nan
+
+    def update(self, x: float) -> float:
+        if self.value == self.value:
+            if x == x:
+                self._old_wt *= self._old_wt_factor
+                if self.value != x:
+                    self.value = (self._old_wt * self.value + self._new_wt * x) / \
+                        (self._old_wt + self._new_wt)
+                self._old_wt = self._old_wt + self._new_wt if self._adjust else 1.0
+            else:
+                # 缺失值不参与计算，但历史权重照常衰减（ignore_na=False）
+                self._old_wt *= self._old_wt_factor
+        elif x == x:
+            self.value = x
+        return self.value
+
+
+def _valid_tail(values: np.ndarray, window: int) -> np.ndarray:
+    """取最后 window 个值中的非空值，对应 pandas rolling 的窗口"""
+    tail = values[-window:]
+    return tail[~np.isnan(tail)]
+
+
+def _rolling_mean(values: np.ndarray, window: int, min_periods: Optional[int] = None) -> float:
+    tail = _valid_tail(values, window)
+    if len(tail) < (min_periods or window):
+        return math.nan
+    return float(tail.mean())
+
+
+def _rolling_sum(values: np.ndarray, window: int, min_periods: Optional[int] = None) -> float:
+    tail = _valid_tail(values, window)
+    if len(tail) < (min_periods or window):
+        return math.nan
+    return float(tail.sum())
+
+
+def _rolling_std(values: np.ndarray, window: int, min_periods: Optional[int] = None) -> float:
+    tail = _valid_tail(values, window)
+    if len(tail) < max(min_periods or window, 2):
+        return math.nan
+    return float(tail.std(ddof=1))
+
+
+def _rolling_moments(values: np.ndarray, window: int, min_periods: int):
+    """返回窗口内非空值的个数与二、三、四阶中心矩，数据不足时返回 None"""
+    tail = _valid_tail(values, window)
+    n = len(tail)
+    if n < min_periods:
+        return None
+    centered = tail - tail.mean()
+    m2 = float(np.mean(centered ** 2))
+    # 与 pandas 一致：方差过小（如停牌导致收益率恒定）时结果为NaN
+    if m2 <= 1e-14:
+        return None
+    return n, m2, float(np.mean(centered ** 3)), float(np.mean(centered ** 4))
+
+
+def _rolling_skew(values: np.ndarray, window: int, min_periods: int) -> float:
+    moments = _rolling_moments(values, window, max(min_periods, 3))
+    if moments is None:
+        return math.nan
+    n, m2, m3, _ = moments
+    return math.sqrt(n * (n - 1)) * m3 / ((n - 2) * m2 ** 1.5)
+
+
+def _rolling_kurt(values: np.ndarray, window: int, min_periods: int) -> float:
+    moments = _rolling_moments(values, window, max(min_periods, 4))
+    if moments is None:
+        return math.nan
+    n, m2, _, m4 = moments
+    return ((n * n - 1.0) * m4 / (m2 * m2) - 3.0 * (n - 1.0) ** 2) / ((n - 2.0) * (n - 3.0))
+
+
+class IndicatorEngine:
+    """单只股票的增量技术指标引擎
+
+    保存各指标的中间状态（EMA 累加器、滚动窗口缓冲区、累计 OBV 等），追加一根新K线
+    时每个指标只做常数量的计算，不再对全部历史重新计算。各指标的取值与
+    src/agents/technicals.py 中基于 pandas 的批量实现在同一段历史上保持一致。
+
+    EMA、MACD、ADX 等递推指标从引擎看到的第一根K线开始累积，因此当后续传入的行情
+    窗口起点向后移动时，引擎保留了更长的预热历史，而滚动窗口类指标不受影响。
+    """
+
+    def __init__(self):
+        self.version = STATE_VERSION
+        self.bars = 0
+        self.first_date: Optional[pd.Timestamp] = None
+        self.last_date: Optional[pd.Timestamp] = None
+        self.prev_close = math.nan
+        self.prev_high = math.nan
+        self.prev_low = math.nan
+
+        # 递推指标
+        self.ema_12 = _Ewm(12, adjust=False)
+        self.ema_26 = _Ewm(26, adjust=False)
+        self.macd_signal = _Ewm(9, adjust=False)
+        self.macd = math.nan
+        self.prev_macd = math.nan
+        self.prev_macd_signal = math.nan
+        self.ema_8 = _Ewm(8, adjust=False)
+        self.ema_21 = _Ewm(21, adjust=False)
+        self.ema_55 = _Ewm(55, adjust=False)
+        self.plus_dm = _Ewm(14, adjust=True)
+        self.minus_dm = _Ewm(14, adjust=True)
+        self.true_range = _Ewm(14, adjust=True)
+        self.adx = _Ewm(14, adjust=True)
+        self.obv = 0.0
+
+        # 滚动窗口缓冲区，长度为相应指标所需的最长窗口
+        self.closes = deque(maxlen=max(50, HURST_WINDOW))
+        self.returns = deque(maxlen=126)
+        self.gains = deque(maxlen=28)
+        self.losses = deque(maxlen=28)
+        self.volumes = deque(maxlen=21)
+        self.ranges = deque(maxlen=14)
+        self.hist_vols = deque(maxlen=42)
+        self.obv_diffs = deque(maxlen=5)
+
+    def update(self, date: Any, high: float, low: float, close: float, volume: float) -> None:
+        """追加一根K线并更新全部指标状态
+
+        Args:
+            date: 交易日期
+            high: 最高价
+            low: 最低价
+            close: 收盘价
+            volume: 成交量
+        """
+        first = self.bars == 0
+        prev_close, prev_high, prev_low = self.prev_close, self.prev_high, self.prev_low
+
+        # MACD
+        macd = self.ema_12.update(close) - self.ema_26.update(close)
+        if not first:
+            self.prev_macd = self.macd
+            self.prev_macd_signal = self.macd_signal.value
+        self.macd = macd
+        self.macd_signal.update(macd)
+
+        # 趋势 EMA
+        self.ema_8.update(close)
+        self.ema_21.update(close)
+        self.ema_55.update(close)
+
+        # 真实波动幅度与方向运动（第一根K线没有前收盘价，真实波动幅度取最高价-最低价）
+        tr = max((v for v in (high - low, abs(high - prev_close), abs(low - prev_close)) if v == v),
+                 default=math.nan)
+        up_move = high - prev_high
+        down_move = prev_low - low
+        plus_dm = up_move if up_move > down_move and up_move > 0 else 0.0
+        minus_dm = down_move if down_move > up_move and down_move > 0 else 0.0
+        plus_dm_ewm = self.plus_dm.update(plus_dm)
+        minus_dm_ewm = self.minus_dm.update(minus_dm)
+        tr_ewm = self.true_range.update(tr)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            plus_di = 100 * (np.float64(plus_dm_ewm) / tr_ewm)
+            minus_di = 100 * (np.float64(minus_dm_ewm) / tr_ewm)
+            dx = 100 * abs(plus_di - minus_di) / (plus_di + minus_di)
+        self.adx.update(float(dx))
+        self.ranges.append(float(tr))
+
+        # 收益率、RSI 涨跌幅
+        if first:
+            ret = math.nan
+            gain = loss = 0.0
+        else:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                ret = float(np.float64(close) / prev_close - 1)
+            delta = close - prev_close
+            gain = delta if delta > 0 else 0.0
+            loss = -delta if delta < 0 else 0.0
+        self.returns.append(ret)
+        self.gains.append(gain)
+        self.losses.append(loss)
+
+        # 历史波动率需要逐日保存，用于计算波动率均值与标准差
+        returns = np.fromiter(self.returns, dtype=float, count=len(self.returns))
+        self.hist_vols.append(_rolling_std(returns, 21, 10) * math.sqrt(252))
+
+        # OBV
+        if first:
+            self.obv_diffs.append(math.nan)
+        else:
+            if close > prev_close:
+                change = volume
+            elif close < prev_close:
+                change = -volume
+            else:
+                change = 0.0
+            self.obv += change
+            self.obv_diffs.append(float(change))
+
+        self.closes.append(close)
+        self.volumes.append(volume)
+        self.prev_close, self.prev_high, self.prev_low = close, high, low
+        if first:
+            self.first_date = date
+        self.last_date = date
+        self.bars += 1
+
+    def _can_append(self, dates: pd.Series, closes: pd.Series) -> Optional[int]:
+        """判断行情数据能否在当前状态上追加，返回新K线在数据中的起始位置"""
+        if self.bars == 0 or self.version != STATE_VERSION or dates.empty:
+            return None
+        # 行情窗口起点早于已有状态时，重新计算以使用更长的历史
+        if dates.iloc[0] < self.first_date:
+            return None
+        pos = int(dates.searchsorted(self.last_date))
+        if pos >= len(dates) or dates.iloc[pos] != self.last_date:
+            return None
+        # 复权价格被修改（除权除息后前复权价格整体变化）时重新计算
+        close = float(closes.iloc[pos])
+        if abs(close - self.prev_close) > _CLOSE_TOLERANCE * max(abs(self.prev_close), 1.0):
+            return None
+        return pos + 1
+
+    def sync(self, prices_df: pd.DataFrame) -> int:
+        """用行情数据同步指标状态，只处理状态中还没有的K线
+
+        Args:
+            prices_df: 按日期升序排列的行情数据，包含 date/high/low/close/volume 列
+
+        Returns:
+            本次处理的K线数量
+        """
+        if 'date' in prices_df.columns:
+            dates = pd.to_datetime(prices_df['date']).reset_index(drop=True)
+        else:
+            # 无法按日期对齐时只能重新计算
+            dates = pd.Series(pd.NaT, index=range(len(prices_df)))
+        start = self._can_append(dates, prices_df['close'])
+        if start is None:
+            if self.bars:
+                logger.info("Rebuilding indicator state from price history")
+            self.__init__()
+            start = 0
+
+        new_bars = prices_df.iloc[start:]
+        for date, high, low, close, volume in zip(
+                dates.iloc[start:], new_bars['high'].to_numpy(dtype=float),
+                new_bars['low'].to_numpy(dtype=float), new_bars['close'].to_numpy(dtype=float),
+                new_bars['volume'].to_numpy(dtype=float)):
+            self.update(date, high, low, close, volume)
+        return len(new_bars)
+
+    def recent_closes(self) -> pd.Series:
+        """最近 HURST_WINDOW 个收盘价"""
+        return pd.Series(list(self.closes)[-HURST_WINDOW:], dtype=float)
+
+    def snapshot(self) -> Dict[str, float]:
+        """返回最新一根K线上的各项指标取值"""
+        closes = np.fromiter(self.closes, dtype=float, count=len(self.closes))
+        returns = np.fromiter(self.returns, dtype=float, count=len(self.returns))
+        gains = np.fromiter(self.gains, dtype=float, count=len(self.gains))
+        losses = np.fromiter(self.losses, dtype=float, count=len(self.losses))
+        volumes = np.fromiter(self.volumes, dtype=float, count=len(self.volumes))
+        ranges = np.fromiter(self.ranges, dtype=float, count=len(self.ranges))
+        hist_vols = np.fromiter(self.hist_vols, dtype=float, count=len(self.hist_vols))
+        obv_diffs = np.fromiter(self.obv_diffs, dtype=float, count=len(self.obv_diffs))
+        close = float(closes[-1])
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            def rsi(period):
+                rs = np.float64(_rolling_mean(gains, period)) / _rolling_mean(losses, period)
+                return float(100 - (100 / (1 + rs)))
+
+            bb_mean = _rolling_mean(closes, 20)
+            bb_std = _rolling_std(closes, 20)
+            hist_vol = float(hist_vols[-1])
+            vol_ma = _rolling_mean(hist_vols, 42, 21)
+            vol_std = _rolling_std(hist_vols, 42, 21)
+            snapshot = {
+                'close': close,
+                'close_5': float(closes[-5]) if len(closes) >= 5 else math.nan,
+                'macd': float(self.macd),
+                'macd_signal': float(self.macd_signal.value),
+                'prev_macd': float(self.prev_macd),
+                'prev_macd_signal': float(self.prev_macd_signal),
+                'rsi_14': rsi(14),
+                'rsi_28': rsi(28),
+                'bb_upper': bb_mean + bb_std * 2,
+                'bb_lower': bb_mean - bb_std * 2,
+                'obv_slope': float(np.nanmean(obv_diffs)) if (~np.isnan(obv_diffs)).any() else math.nan,
+                'ema_8': float(self.ema_8.value),
+                'ema_21': float(self.ema_21.value),
+                'ema_55': float(self.ema_55.value),
+                'adx': float(self.adx.value),
+                'z_score': float(np.float64(close - _rolling_mean(closes, 50)) / _rolling_std(closes, 50)),
+                'momentum_1m': _rolling_sum(returns, 21, 5),
+                'momentum_3m': _rolling_sum(returns, 63, 42),
+                'momentum_6m': _rolling_sum(returns, 126, 63),
+                'volume_momentum': float(np.float64(volumes[-1]) / _rolling_mean(volumes, 21, 10)),
+                'historical_volatility': hist_vol,
+                'volatility_regime': float(np.float64(hist_vol) / vol_ma),
+                'volatility_z_score': float(np.float64(hist_vol - vol_ma) / (vol_std if vol_std != 0 else math.nan)),
+                'atr_ratio': float(np.float64(_rolling_mean(ranges, 14, 7)) / close),
+                'skewness': _rolling_skew(returns, 42, 21),
+                'kurtosis': _rolling_kurt(returns, 42, 21),
+            }
+        return snapshot
+
+
+class IndicatorEngineStore:
+    """按股票代码管理指标引擎，并将状态检查点保存到磁盘
+
+    检查点保存在 src/data/indicator_state/{ticker}.pkl，跨进程复用，
+    因此回测中每推进一个交易日只需处理新增的一根K线。
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        """
+        Args:
+            root: 检查点目录，默认为 src/data/indicator_state
+        """
+        self.root = root or get_data_path("indicator_state")
+        self._engines: Dict[str, IndicatorEngine] = {}
+        self._locks = KeyedLocks()
+
+    def _path(self, ticker: str) -> str:
+        return os.path.join(self.root, f"{ticker}.pkl")
+
+    def _load(self, ticker: str) -> IndicatorEngine:
+        engine = self._engines.get(ticker)
+        if engine is None:
+            engine = read_pickle(self._path(ticker))
+            if not isinstance(engine, IndicatorEngine) or engine.version != STATE_VERSION:
+                engine = IndicatorEngine()
+            self._engines[ticker] = engine
+        return engine
+
+    def snapshot(self, ticker: str, prices_df: pd.DataFrame) -> Dict[str, Any]:
+        """同步行情并返回最新指标
+
+        Args:
+            ticker: 股票代码
+            prices_df: 按日期升序排列的行情数据
+
+        Returns:
+            IndicatorEngine.snapshot() 的结果，另含 recent_closes（最近收盘价序列）
+        """
+        with self._locks.get(ticker):
+            engine = self._load(ticker)
+            processed = engine.sync(prices_df)
+            if processed:
+                logger.info(f"Indicator state of {ticker} updated with {processed} bars")
+                try:
+                    write_pickle(engine, self._path(ticker))
+                except Exception as e:
+                    logger.warning(f"Failed to checkpoint indicator state of {ticker}: {e}")
+            snapshot = engine.snapshot()
+            snapshot['recent_closes'] = engine.recent_closes()
+            return snapshot
+
+
+# 进程内共享的默认指标引擎
+indicator_store = IndicatorEngineStore()
@@ -0,0 +1,174 @@
+import json
+import time
+import hashlib
+import threading
+from typing import Any, Dict, Optional
+
+from src.utils.env import getenv
+from src.utils.logging_config import setup_logger
+from src.utils.storage import connect_sqlite, get_data_path
+from src.utils.tracing import record_cache
+
+# 设置日志记录
+logger = setup_logger('llm_cache')
+
+# 缓存的最大条目数，可通过环境变量 LLM_CACHE_MAX_ENTRIES 配置
+DEFAULT_MAX_ENTRIES = 10000
+
+# 缓存有效期（秒），可通过环境变量 LLM_CACHE_TTL 配置，0 表示永不过期
+DEFAULT_TTL = 0.0
+
+
+def make_cache_key(model: str, system_instruction: Optional[str], prompt: str,
+                   config: Optional[Dict[str, Any]] = None) -> str:
+    """根据模型、系统指令、提示词和生成配置计算缓存键（sha256）"""
+    payload = json.dumps({
+        "model": model,
+        "system_instruction": system_instruction,
+        "prompt": prompt,
+        "config": config or {},
+    }, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """按内容寻址的 LLM 响应缓存
+
+    以 make_cache_key 计算的哈希为键，将模型响应持久化到
+    src/data/llm_cache.sqlite，跨进程复用。重新运行同一段回测时，
+    完全相同的提示词直接返回缓存的响应，不再调用 API。
+    超过最大条目数时按最近访问时间淘汰（LRU），可选按写入时间过期。
+    命中时只在内存中记录访问时间，下次写入时再批量更新到数据库，读路径不产生写事务。
+    """
+
+    def __init__(self, path: Optional[str] = None, max_entries: Optional[int] = None,
+                 ttl: Optional[float] = None, enabled: Optional[bool] = None):
+        """
+        Args:
+            path: 数据库文件路径，默认为 src/data/llm_cache.sqlite
+            max_entries: 最大条目数，为 None 时读取环境变量 LLM_CACHE_MAX_ENTRIES
+            ttl: 有效期（秒），为 None 时读取环境变量 LLM_CACHE_TTL，0 表示永不过期
+            enabled: 是否启用，为 None 时读取环境变量 LLM_CACHE_ENABLED（默认启用）
+        """
+        if max_entries is None:
+            max_entries = int(getenv("LLM_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES))
+        if ttl is None:
+            ttl = float(getenv("LLM_CACHE_TTL", DEFAULT_TTL))
+        if enabled is None:
+            enabled = getenv("LLM_CACHE_ENABLED", "true").lower() not in ("0", "false", "no")
+        self.path = path or get_data_path("llm_cache.sqlite")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._conn = None
+        self._lock = threading.Lock()
+        # 尚未写入数据库的访问时间 {键: 时间}
+        self._touched: Dict[str, float] = {}
+
+    def _connection(self):
+        # 首次使用时才创建数据库文件
+        if self._conn is None:
+            self._conn = connect_sqlite(self.path)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    model TEXT,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )""")
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_llm_cache_accessed ON llm_cache (accessed_at)")
+            self._conn.commit()
+        return self._conn
+
+    def get(self, key: str) -> Optional[str]:
+        """读取缓存的响应，不存在或已过期时返回 None"""
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            try:
+                conn = self._connection()
+                row = conn.execute(
+                    "SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+                if row is not None and self.ttl > 0 and now - row[1] >= self.ttl:
+                    conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    conn.commit()
+                    self._touched.pop(key, None)
+                    row = None
+                if row is None:
+                    self.misses += 1
+                    record_cache(False)
+                    return None
+                self._touched[key] = now
+            except Exception as e:
+                logger.warning(f"Failed to read LLM cache: {e}")
+                self.misses += 1
+                return None
+            self.hits += 1
+            record_cache(True)
+            return row[0]
+
+    def put(self, key: str, response: str, model: Optional[str] = None) -> None:
+        """写入响应，超过最大条目数时淘汰最久未访问的条目"""
+        if not self.enabled or response is None:
+            return
+        now = time.time()
+        with self._lock:
+            try:
+                conn = self._connection()
+                # 淘汰前先写入命中时记录的访问时间
+                if self._touched:
+                    conn.executemany(
+                        "UPDATE llm_cache SET accessed_at = ? WHERE key = ?",
+                        [(accessed_at, touched_key) for touched_key, accessed_at in self._touched.items()])
+                    self._touched.clear()
+                conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, model, response, created_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?)", (key, model, response, now, now))
+                if self.max_entries > 0:
+                    count = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+                    if count > self.max_entries:
+                        conn.execute(
+                            "DELETE FROM llm_cache WHERE key IN "
+                            "(SELECT key FROM llm_cache ORDER BY accessed_at LIMIT ?)",
+                            (count - self.max_entries,))
+                conn.commit()
+            except Exception as e:
+                logger.warning(f"Failed to write LLM cache: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """命中统计与当前条目数"""
+        entries = 0
+        if self.enabled:
+            with self._lock:
+                try:
+                    entries = self._connection().execute(
+                        "SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+                except Exception as e:
+                    logger.warning(f"Failed to read LLM cache: {e}")
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": entries,
+        }
+
+    def clear(self) -> None:
+        """清空缓存与统计"""
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self._touched.clear()
+            if self.enabled:
+                conn = self._connection()
+                conn.execute("DELETE FROM llm_cache")
+                conn.commit()
+
+
+# 进程内共享的默认响应缓存
+llm_cache = LLMCache()
@@ -1,198 +1,59 @@
-import os
+import re
 import sys
 import json
+import asyncio
 from datetime import datetime
-import akshare as ak
 import requests
 from bs4 import BeautifulSoup
-from src.tools.openrouter_config import get_chat_completion, logger as api_logger
+from src.tools.openrouter_config import aget_chat_completion, get_chat_completion, logger as api_logger
+from src.tools.point_in_time import get_active_provider
+from src.tools.news_store import news_store
+from src.tools.rate_limiter import estimate_tokens
+from src.tools.sentiment_store import sentiment_store
+from src.utils.env import getenv
 import time
-import pandas as pd
 
 
 def get_stock_news(symbol: str, max_news: int = 10) -> list:
     """获取并处理个股新闻
 
+    新闻由本地新闻存储增量维护：每次只追加上次拉取之后发布的新闻，
+    任意条数的请求都从本地历史中截取。
+
     Args:
         symbol (str): 股票代码，如 "300059"
         max_news (int, optional): 获取的新闻条数，默认为10条。最大支持100条。
 
     Returns:
-        list: 新闻列表，每条新闻包含标题、内容、发布时间等信息
+        list: 新闻列表，每条新闻包含标题、内容、发布时间等信息，按发布时间降序排列
     """
-
-    # 设置pandas显示选项，确保显示完整内容
-    pd.set_option('display.max_columns', None)
-    pd.set_option('display.max_rows', None)
-    pd.set_option('display.max_colwidth', None)
-    pd.set_option('display.width', None)
-
     # 限制最大新闻条数
     max_news = min(max_news, 100)
 
-    # 获取当前日期
-    today = datetime.now().strftime("%Y-%m-%d")
-
-    # 构建新闻文件路径
-    # project_root = os.path.dirname(os.path.dirname(
-    #     os.path.dirname(os.path.abspath(__file__))))
-    news_dir = os.path.join("src", "data", "stock_news")
-    print(f"新闻保存目录: {news_dir}")
-
-    # 确保目录存在
-    try:
-        os.makedirs(news_dir, exist_ok=True)
-        print(f"成功创建或确认目录存在: {news_dir}")
-    except Exception as e:
-        print(f"创建目录失败: {e}")
-        return []
-
-    news_file = os.path.join(news_dir, f"{symbol}_news.json")
-    print(f"新闻文件路径: {news_file}")
-
-    # 检查是否需要更新新闻
-    need_update = True
-    if os.path.exists(news_file):
-        try:
-            with open(news_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                if data.get("date") == today:
-                    cached_news = data.get("news", [])
-                    if len(cached_news) >= max_news:
-                        print(f"使用缓存的新闻数据: {news_file}")
-                        return cached_news[:max_news]
-                    else:
-                        print(
-                            f"缓存的新闻数量({len(cached_news)})不足，需要获取更多新闻({max_news}条)")
-        except Exception as e:
-            print(f"读取缓存文件失败: {e}")
-
-    print(f'开始获取{symbol}的新闻数据...')
+    # 回测中从预加载的新闻中截取当前时点之前发布的新闻
+    provider = get_active_provider(symbol)
+    if provider is not None and provider.loaded:
+        return provider.get_news(max_news)
 
     try:
-        # 获取新闻列表
-        news_df = ak.stock_news_em(symbol=symbol)
-        if news_df is None or len(news_df) == 0:
-            print(f"未获取到{symbol}的新闻数据")
-            return []
-
-        print(f"成功获取到{len(news_df)}条新闻")
-
-        # 实际可获取的新闻数量
-        available_news_count = len(news_df)
-        if available_news_count < max_news:
-            print(f"警告：实际可获取的新闻数量({available_news_count})少于请求的数量({max_news})")
-            max_news = available_news_count
-
-        # 获取指定条数的新闻（考虑到可能有些新闻内容为空，多获取50%）
-        news_list = []
-        for _, row in news_df.head(int(max_news * 1.5)).iterrows():
-            try:
-                # 获取新闻内容
-                content = row["新闻内容"] if "新闻内容" in row and not pd.isna(
-                    row["新闻内容"]) else ""
-                if not content:
-                    content = row["新闻标题"]
-
-                # 只去除首尾空白字符
-                content = content.strip()
-                if len(content) < 10:  # 内容太短的跳过
-                    continue
-
-                # 获取关键词
-                keyword = row["关键词"] if "关键词" in row and not pd.isna(
-                    row["关键词"]) else ""
-
-                # 添加新闻
-                news_item = {
-                    "title": row["新闻标题"].strip(),
-                    "content": content,
-                    "publish_time": row["发布时间"],
-                    "source": row["文章来源"].strip(),
-                    "url": row["新闻链接"].strip(),
-                    "keyword": keyword.strip()
-                }
-                news_list.append(news_item)
-                print(f"成功添加新闻: {news_item['title']}")
-
-            except Exception as e:
-                print(f"处理单条新闻时出错: {e}")
-                continue
-
-        # 按发布时间排序
-        news_list.sort(key=lambda x: x["publish_time"], reverse=True)
-
-        # 只保留指定条数的有效新闻
-        news_list = news_list[:max_news]
-
-        # 保存到文件
-        try:
-            save_data = {
-                "date": today,
-                "news": news_list
-            }
-            with open(news_file, 'w', encoding='utf-8') as f:
-                json.dump(save_data, f, ensure_ascii=False, indent=2)
-            print(f"成功保存{len(news_list)}条新闻到文件: {news_file}")
-        except Exception as e:
-            print(f"保存新闻数据到文件时出错: {e}")
-
-        return news_list
-
+        news_list = news_store.get_news(symbol, max_news)
     except Exception as e:
         print(f"获取新闻数据时出错: {e}")
         return []
 
+    if len(news_list) < max_news:
+        print(f"警告：本地可用的新闻数量({len(news_list)})少于请求的数量({max_news})")
+    return news_list
 
-def get_news_sentiment(news_list: list, num_of_news: int = 5) -> float:
-    """分析新闻情感得分
 
-    Args:
-        news_list (list): 新闻列表
-        num_of_news (int): 用于分析的新闻数量，默认为5条
+# 汇总单条新闻得分时，发布时间每早该天数权重减半
+SENTIMENT_HALF_LIFE_DAYS = 3.0
 
-    Returns:
-        float: 情感得分，范围[-1, 1]，-1最消极，1最积极
-    """
-    if not news_list:
-        return 0.0
-
-    # # 获取项目根目录
-    # project_root = os.path.dirname(os.path.dirname(
-    #     os.path.dirname(os.path.abspath(__file__))))
-
-    # 检查是否有缓存的情感分析结果
-    # 检查是否有缓存的情感分析结果
-    cache_file = "src/data/sentiment_cache.json"
-    os.makedirs(os.path.dirname(cache_file), exist_ok=True)
-
-    # 生成新闻内容的唯一标识
-    news_key = "|".join([
-        f"{news['title']}|{news['content'][:100]}|{news['publish_time']}"
-        for news in news_list[:num_of_news]
-    ])
+# 批量打分时单个请求中新闻内容的 token 预算，可通过环境变量 SENTIMENT_BATCH_TOKENS 配置
+DEFAULT_SENTIMENT_BATCH_TOKENS = 6000
 
-    # 检查缓存
-    if os.path.exists(cache_file):
-        print("发现情感分析缓存文件")
-        try:
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                cache = json.load(f)
-                if news_key in cache:
-                    print("使用缓存的情感分析结果")
-                    return cache[news_key]
-                print("未找到匹配的情感分析缓存")
-        except Exception as e:
-            print(f"读取情感分析缓存出错: {e}")
-            cache = {}
-    else:
-        print("未找到情感分析缓存文件，将创建新文件")
-        cache = {}
-
-    # 准备系统消息
-    system_message = {
-        "role": "system",
-        "content": """你是一个专业的A股市场分析师，擅长解读新闻对股票走势的影响。你需要分析一组新闻的情感倾向，并给出一个介于-1到1之间的分数：
+# 情感分析的打分标准，单条与批量打分共用
+SENTIMENT_SCALE = """分数介于-1到1之间：
         - 1表示极其积极（例如：重大利好消息、超预期业绩、行业政策支持）
         - 0.5到0.9表示积极（例如：业绩增长、新项目落地、获得订单）
         - 0.1到0.4表示轻微积极（例如：小额合同签订、日常经营正常）
@@ -215,9 +76,35 @@ def get_news_sentiment(news_list: list, num_of_news: int = 5) -> float:
         2. 新闻的时效性和影响范围
         3. 对公司基本面的实际影响
         4. A股市场的特殊反应规律"""
-    }
 
-    # 准备新闻内容
+# 单条新闻打分的系统提示词：只返回一个数字
+SENTIMENT_SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": f"""你是一个专业的A股市场分析师，擅长解读新闻对股票走势的影响。你需要分析新闻的情感倾向，并给出一个分数。{SENTIMENT_SCALE}
+
+        只返回这一个数字，不要附加任何解释。"""
+}
+
+# 批量打分的系统提示词：按编号返回 JSON 数组
+BATCH_SENTIMENT_SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": f"""你是一个专业的A股市场分析师，擅长解读新闻对股票走势的影响。你会收到多条带编号的新闻，需要分别分析每条新闻各自的情感倾向，并为每条新闻给出一个分数。{SENTIMENT_SCALE}
+
+        只返回一个JSON数组，每条新闻一个元素，格式为 {{"id": 编号, "score": 分数}}，
+        不要遗漏任何编号，不要附加任何解释或代码块标记。"""
+}
+
+
+def _sentiment_news_key(news_list: list, num_of_news: int) -> str:
+    """生成新闻内容的唯一标识"""
+    return "|".join([
+        f"{news['title']}|{news['content'][:100]}|{news['publish_time']}"
+        for news in news_list[:num_of_news]
+    ])
+
+
+def _sentiment_messages(news_list: list, num_of_news: int) -> list:
+    """构建情感分析的对话消息"""
     news_content = "\n\n".join([
         f"标题：{news['title']}\n"
         f"来源：{news['source']}\n"
@@ -230,35 +117,354 @@ def get_news_sentiment(news_list: list, num_of_news: int = 5) -> float:
         "role": "user",
         "content": f"请分析以下A股上市公司相关新闻的情感倾向：\n\n{news_content}\n\n请直接返回一个数字，范围是-1到1，无需解释。"
     }
+    return [SENTIMENT_SYSTEM_MESSAGE, user_message]
+
 
+def _parse_sentiment(result) -> float:
+    """解析 LLM 返回的情感得分，失败时返回 None"""
+    if result is None:
+        print("Error: PI error occurred, LLM returned None")
+        return None
     try:
-        # 获取LLM分析结果
-        result = get_chat_completion([system_message, user_message])
-        if result is None:
-            print("Error: PI error occurred, LLM returned None")
-            return 0.0
-
-        # 提取数字结果
-        try:
-            sentiment_score = float(result.strip())
-        except ValueError as e:
-            print(f"Error parsing sentiment score: {e}")
-            print(f"Raw result: {result}")
-            return 0.0
-
-        # 确保分数在-1到1之间
-        sentiment_score = max(-1.0, min(1.0, sentiment_score))
-
-        # 缓存结果
-        cache[news_key] = sentiment_score
-        try:
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(cache, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"Error writing cache: {e}")
-
-        return sentiment_score
+        sentiment_score = float(result.strip())
+    except ValueError as e:
+        print(f"Error parsing sentiment score: {e}")
+        print(f"Raw result: {result}")
+        return None
+    # 确保分数在-1到1之间
+    return max(-1.0, min(1.0, sentiment_score))
 
-    except Exception as e:
-        print(f"Error analyzing news sentiment: {e}")
-        return 0.0  # 出错时返回中性分数
+
+def _cached_sentiment(news_key: str):
+    """查询缓存的情感分析结果"""
+    cached = sentiment_store.get(news_key)
+    if cached is not None:
+        print("使用缓存的情感分析结果")
+    return cached
+
+
+def _article_key(news: dict) -> str:
+    """单条新闻的缓存标识：优先使用新闻链接，没有链接时使用标题、发布时间与全文"""
+    if news.get("url"):
+        return f"article|{news['url']}"
+    return f"article|{news['title']}|{news['publish_time']}|{news['content']}"
+
+
+def _publish_time(news: dict):
+    try:
+        return datetime.strptime(news["publish_time"], "%Y-%m-%d %H:%M:%S")
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def aggregate_article_scores(scored_news: list, half_life_days: float = SENTIMENT_HALF_LIFE_DAYS) -> float:
+    """按发布时间加权汇总单条新闻的情感得分
+
+    以最新一条新闻的发布时间为基准，每早 half_life_days 天权重减半；
+    发布时间无法解析的新闻按最新处理。
+
+    Args:
+        scored_news: [(新闻, 得分)] 列表
+        half_life_days: 权重减半的天数
+
+    Returns:
+        float: 加权平均得分，范围[-1, 1]，列表为空时为0
+    """
+    if not scored_news:
+        return 0.0
+    times = [_publish_time(news) for news, _ in scored_news]
+    latest = max((t for t in times if t is not None), default=None)
+    total_weight = 0.0
+    weighted_sum = 0.0
+    for (_, score), published in zip(scored_news, times):
+        age_days = (latest - published).total_seconds() / 86400 if published is not None else 0.0
+        weight = 0.5 ** (age_days / half_life_days)
+        weighted_sum += weight * score
+        total_weight += weight
+    return max(-1.0, min(1.0, weighted_sum / total_weight))
+
+
+def _score_article(news: dict):
+    """为单条新闻打分，优先使用缓存，失败时返回 None"""
+    article_key = _article_key(news)
+    cached = sentiment_store.get(article_key)
+    if cached is not None:
+        return cached
+    score = _parse_sentiment(get_chat_completion(_sentiment_messages([news], 1)))
+    if score is not None:
+        sentiment_store.put(article_key, score)
+    return score
+
+
+async def _ascore_article(news: dict):
+    """_score_article 的异步版本"""
+    article_key = _article_key(news)
+    cached = await asyncio.to_thread(sentiment_store.get, article_key)
+    if cached is not None:
+        return cached
+    score = _parse_sentiment(await aget_chat_completion(_sentiment_messages([news], 1)))
+    if score is not None:
+        await asyncio.to_thread(sentiment_store.put, article_key, score)
+    return score
+
+
+def _combine_article_scores(news_key: str, news_list: list, scores: list) -> float:
+    """汇总单条新闻的得分；全部新闻都打分成功时缓存整组的结果"""
+    scored_news = [(news, score) for news, score in zip(news_list, scores) if score is not None]
+    if not scored_news:
+        return 0.0
+    sentiment_score = aggregate_article_scores(scored_news)
+    if len(scored_news) == len(news_list):
+        sentiment_store.put(news_key, sentiment_score)
+    return sentiment_score
+
+
+def get_news_sentiment(news_list: list, num_of_news: int = 5) -> float:
+    """分析新闻情感得分
+
+    每条新闻的得分按新闻缓存，再按发布时间加权汇总；尚未打分的新闻在一个批量请求中
+    打分（见 score_articles_batch），重新分析时只有新出现的新闻需要调用模型；
+    整组新闻完全相同时直接使用缓存的汇总结果。
+
+    Args:
+        news_list (list): 新闻列表
+        num_of_news (int): 用于分析的新闻数量，默认为5条
+
+    Returns:
+        float: 情感得分，范围[-1, 1]，-1最消极，1最积极
+    """
+    if not news_list:
+        return 0.0
+
+    # 检查是否有缓存的情感分析结果
+    news_key = _sentiment_news_key(news_list, num_of_news)
+    cached = _cached_sentiment(news_key)
+    if cached is not None:
+        return cached
+
+    news_list = news_list[:num_of_news]
+    return _combine_article_scores(news_key, news_list, score_articles_batch(news_list))
+
+
+async def aget_news_sentiment(news_list: list, num_of_news: int = 5) -> float:
+    """get_news_sentiment 的异步版本，多只股票的分析可以用 asyncio.gather 并发进行
+
+    Args:
+        news_list (list): 新闻列表
+        num_of_news (int): 用于分析的新闻数量，默认为5条
+
+    Returns:
+        float: 情感得分，范围[-1, 1]，-1最消极，1最积极
+    """
+    if not news_list:
+        return 0.0
+
+    news_key = _sentiment_news_key(news_list, num_of_news)
+    # 缓存读写是带锁的同步 SQLite 操作，放到线程中执行，避免阻塞事件循环
+    cached = await asyncio.to_thread(_cached_sentiment, news_key)
+    if cached is not None:
+        return cached
+
+    news_list = news_list[:num_of_news]
+    scores = await ascore_articles_batch(news_list)
+    return await asyncio.to_thread(_combine_article_scores, news_key, news_list, scores)
+
+
+def _batch_sentiment_messages(articles: list) -> list:
+    """构建批量打分的对话消息：每条新闻带编号，要求按编号返回 JSON 数组"""
+    news_content = "\n\n".join([
+        f"[编号 {index}]\n"
+        f"标题：{news['title']}\n"
+        f"来源：{news['source']}\n"
+        f"时间：{news['publish_time']}\n"
+        f"内容：{news['content']}"
+        for index, news in enumerate(articles, 1)
+    ])
+
+    user_message = {
+        "role": "user",
+        "content": f"请分别分析以下{len(articles)}条A股上市公司相关新闻各自的情感倾向：\n\n{news_content}\n\n"
+                   f"请直接返回一个JSON数组，每条新闻一个元素，格式为 {{\"id\": 编号, \"score\": 分数}}，"
+                   f"分数范围是-1到1，无需解释。"
+    }
+    return [BATCH_SENTIMENT_SYSTEM_MESSAGE, user_message]
+
+
+def _parse_batch_sentiment(result, count: int) -> dict:
+    """解析批量打分结果，返回 {编号: 得分}；格式不正确的元素被跳过"""
+    if result is None:
+        return {}
+    text = result.strip()
+    # 去掉模型可能附带的 ```json 代码块标记
+    fenced = re.search(r"```(?:json)?\s*(.*?)```", text, re.S)
+    if fenced:
+        text = fenced.group(1).strip()
+    try:
+        items = json.loads(text)
+    except ValueError:
+        print(f"Error parsing batch sentiment scores, raw result: {result[:200]}")
+        return {}
+    if not isinstance(items, list):
+        return {}
+
+    scores = {}
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        index, score = item.get("id"), item.get("score")
+        if isinstance(index, bool) or not isinstance(index, int) or not 1 <= index <= count:
+            continue
+        if isinstance(score, bool) or not isinstance(score, (int, float)):
+            continue
+        scores[index] = max(-1.0, min(1.0, float(score)))
+    return scores
+
+
+def _pack_batches(articles: list, token_budget: int) -> list:
+    """按 token 预算将新闻依次装入批次，单条超出预算的新闻独占一个批次"""
+    batches, current, used = [], [], 0
+    for news in articles:
+        tokens = estimate_tokens(f"{news['title']}{news['source']}{news['content']}")
+        if current and used + tokens > token_budget:
+            batches.append(current)
+            current, used = [], 0
+        current.append(news)
+        used += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _pending_articles(articles: list):
+    """按新闻去重，拆分为已缓存的得分 {新闻标识: 得分} 与需要打分的新闻列表"""
+    scores = {}
+    pending = {}
+    for news in articles:
+        article_key = _article_key(news)
+        if article_key in scores or article_key in pending:
+            continue
+        cached = sentiment_store.get(article_key)
+        if cached is not None:
+            scores[article_key] = cached
+        else:
+            pending[article_key] = news
+    return scores, list(pending.values())
+
+
+def _store_batch_scores(batch: list, parsed: dict, scores: dict) -> list:
+    """记录并缓存批量结果中的得分，返回缺失或格式不正确、需要单独重试的新闻"""
+    retry = []
+    for index, news in enumerate(batch, 1):
+        if index in parsed:
+            article_key = _article_key(news)
+            scores[article_key] = parsed[index]
+            sentiment_store.put(article_key, parsed[index])
+        else:
+            retry.append(news)
+    return retry
+
+
+def score_articles_batch(articles: list, token_budget: int = None) -> list:
+    """批量为多条新闻（可来自不同股票）打分
+
+    已缓存的新闻直接使用缓存；其余新闻按 token 预算装入尽量少的请求，共享一份系统提示词，
+    模型返回按编号的 JSON 数组。只有一条新闻的批次、以及批量结果中缺失或格式不正确的
+    新闻逐条单独打分。
+
+    Args:
+        articles: 新闻列表，重复的新闻只打分一次
+        token_budget: 单个请求中新闻内容的 token 预算，为 None 时读取环境变量 SENTIMENT_BATCH_TOKENS
+
+    Returns:
+        与 articles 一一对应的得分列表，打分失败的新闻为 None
+    """
+    if token_budget is None:
+        token_budget = int(getenv("SENTIMENT_BATCH_TOKENS", DEFAULT_SENTIMENT_BATCH_TOKENS))
+
+    scores, pending = _pending_articles(articles)
+    batches = _pack_batches(pending, token_budget)
+    if pending:
+        print(f"批量情感分析：{len(articles)} 条新闻，{len(pending)} 条需要打分，共 {len(batches)} 个请求")
+
+    for batch in batches:
+        retry = batch
+        if len(batch) > 1:
+            try:
+                parsed = _parse_batch_sentiment(
+                    get_chat_completion(_batch_sentiment_messages(batch)), len(batch))
+            except Exception as e:
+                print(f"Error analyzing news sentiment: {e}")
+                parsed = {}
+            retry = _store_batch_scores(batch, parsed, scores)
+        for news in retry:
+            try:
+                scores[_article_key(news)] = _score_article(news)
+            except Exception as e:
+                print(f"Error analyzing news sentiment: {e}")
+                scores[_article_key(news)] = None
+
+    return [scores.get(_article_key(news)) for news in articles]
+
+
+async def ascore_articles_batch(articles: list, token_budget: int = None) -> list:
+    """score_articles_batch 的异步版本，各批次以及需要单独重试的新闻并发打分"""
+    if token_budget is None:
+        token_budget = int(getenv("SENTIMENT_BATCH_TOKENS", DEFAULT_SENTIMENT_BATCH_TOKENS))
+
+    # 缓存读写是带锁的同步 SQLite 操作，放到线程中执行，避免阻塞事件循环
+    scores, pending = await asyncio.to_thread(_pending_articles, articles)
+
+    async def score_batch(batch):
+        retry = batch
+        if len(batch) > 1:
+            try:
+                parsed = _parse_batch_sentiment(
+                    await aget_chat_completion(_batch_sentiment_messages(batch)), len(batch))
+            except Exception as e:
+                print(f"Error analyzing news sentiment: {e}")
+                parsed = {}
+            retry = await asyncio.to_thread(_store_batch_scores, batch, parsed, scores)
+        results = await asyncio.gather(*(_ascore_article(news) for news in retry),
+                                       return_exceptions=True)
+        for news, result in zip(retry, results):
+            if isinstance(result, BaseException):
+                print(f"Error analyzing news sentiment: {result}")
+                result = None
+            scores[_article_key(news)] = result
+
+    await asyncio.gather(*(score_batch(batch) for batch in _pack_batches(pending, token_budget)))
+    return [scores.get(_article_key(news)) for news in articles]
+
+
+def get_news_sentiment_batch(news_by_ticker: dict, num_of_news: int = 5) -> dict:
+    """在尽量少的请求中分析多只股票的新闻情感得分
+
+    各股票的新闻一起交给 score_articles_batch 打分，再按股票分别汇总并缓存，
+    之后对同一组新闻调用 get_news_sentiment 会直接命中缓存。
+
+    Args:
+        news_by_ticker (dict): 股票代码到新闻列表的映射
+        num_of_news (int): 每只股票用于分析的新闻数量，默认为5条
+
+    Returns:
+        dict: 股票代码到情感得分的映射
+    """
+    results = {}
+    selected = {}
+    for ticker, news_list in news_by_ticker.items():
+        if not news_list:
+            results[ticker] = 0.0
+            continue
+        news_key = _sentiment_news_key(news_list, num_of_news)
+        cached = sentiment_store.get(news_key)
+        if cached is not None:
+            results[ticker] = cached
+        else:
+            selected[ticker] = (news_key, news_list[:num_of_news])
+
+    articles = [news for _, news_list in selected.values() for news in news_list]
+    scores = iter(score_articles_batch(articles))
+    for ticker, (news_key, news_list) in selected.items():
+        ticker_scores = [next(scores) for _ in news_list]
+        results[ticker] = _combine_article_scores(news_key, news_list, ticker_scores)
+    return results
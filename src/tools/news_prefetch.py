@@ -0,0 +1,146 @@
+"""新闻预取守护进程
+
+按固定间隔并发拉取自选股的新闻并写入本地新闻存储，决策运行时情感分析代理直接读取
+本地新闻，不再等待东方财富的新闻接口。
+
+用法：
+    poetry run python -m src.tools.news_prefetch --tickers 600519,000001 --interval 600
+    poetry run python -m src.tools.news_prefetch --tickers-file watchlist.txt --workers 4 --once
+"""
+import argparse
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from src.tools.concurrency import submit_in_context
+from src.tools.news_store import NewsStore, news_store
+from src.utils.logging_config import setup_logger
+from src.utils.tickers import load_tickers
+
+# 设置日志记录
+logger = setup_logger('news_prefetch')
+
+# 默认的拉取间隔（秒），应小于 NEWS_REFRESH_SECONDS，使代理读取时新闻总是新鲜的
+DEFAULT_INTERVAL = 600.0
+
+# 默认的随机抖动（秒）：每只股票在一轮中的开始时间随机错开，每轮的开始时间也随机提前或推后
+DEFAULT_JITTER = 5.0
+
+
+class NewsPrefetcher:
+    """按间隔并发刷新自选股新闻的预取器
+
+    每轮用有界的线程池刷新所有股票：每只股票在本轮开始后 [0, jitter] 秒内的随机时刻提交给
+    线程池，避免同时打到新闻接口，等待提交的过程不占用工作线程。相邻两轮的开始时间相隔
+    interval 秒（上下随机浮动 jitter 秒），与每轮本身的耗时无关。
+    对东方财富接口的并发同时受 FETCH_LIMIT_EASTMONEY 限制。
+    """
+
+    def __init__(self, tickers: List[str], store: Optional[NewsStore] = None,
+                 interval: float = DEFAULT_INTERVAL, workers: int = 4,
+                 jitter: float = DEFAULT_JITTER, rng: Optional[random.Random] = None):
+        """
+        Args:
+            tickers: 自选股代码列表
+            store: 新闻存储，默认为进程内共享的 news_store
+            interval: 相邻两轮开始时间的间隔（秒）
+            workers: 并发拉取的线程数
+            jitter: 随机抖动（秒）
+            rng: 随机数生成器，便于测试
+        """
+        self.tickers = list(tickers)
+        self.store = store or news_store
+        self.interval = interval
+        self.workers = max(1, workers)
+        self.jitter = max(0.0, jitter)
+        self._rng = rng or random.Random()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _refresh_one(self, ticker: str) -> Optional[int]:
+        """刷新一只股票的新闻，返回新增条数，失败时返回 None"""
+        try:
+            return self.store.refresh(ticker, force=True)
+        except Exception as e:
+            logger.warning(f"Failed to prefetch news for {ticker}: {e}")
+            return None
+
+    def run_once(self) -> Dict[str, Optional[int]]:
+        """并发刷新所有股票一轮，返回股票代码到新增条数（失败或因停止未执行为 None）的映射"""
+        started = time.perf_counter()
+        offsets = sorted((self._rng.uniform(0, self.jitter), ticker) for ticker in self.tickers)
+        futures = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for offset, ticker in offsets:
+                # 在当前线程中等到该股票的开始时刻再提交
+                if self._stop.wait(max(0.0, started + offset - time.perf_counter())):
+                    break
+                futures[ticker] = submit_in_context(executor, self._refresh_one, ticker)
+        results = {ticker: futures[ticker].result() if ticker in futures else None
+                   for ticker in self.tickers}
+        failed = sum(1 for added in results.values() if added is None)
+        added = sum(added for added in results.values() if added)
+        logger.info(f"Prefetched news for {len(results) - failed}/{len(results)} tickers, "
+                    f"{added} new items in {time.perf_counter() - started:.1f}s")
+        return results
+
+    def run_forever(self) -> None:
+        """循环拉取直到 stop() 被调用；每轮耗时超过间隔时下一轮立即开始"""
+        while not self._stop.is_set():
+            round_started = time.perf_counter()
+            self.run_once()
+            next_start = round_started + self.interval + self._rng.uniform(-self.jitter, self.jitter)
+            self._stop.wait(max(0.0, next_start - time.perf_counter()))
+
+    def start(self) -> threading.Thread:
+        """在后台守护线程中循环拉取，供常驻进程（如决策服务）使用"""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run_forever, name="news-prefetch", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """停止循环，等待当前一轮结束"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='新闻预取守护进程')
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('--tickers', type=str, help='逗号分隔的股票代码')
+    group.add_argument('--tickers-file', type=str,
+                       help='股票代码文件（每行一个，# 开头为注释）')
+    parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL,
+                        help='相邻两轮开始时间的间隔秒数 (默认: 600)')
+    parser.add_argument('--workers', type=int, default=4,
+                        help='并发拉取的线程数 (默认: 4)')
+    parser.add_argument('--jitter', type=float, default=DEFAULT_JITTER,
+                        help='随机抖动秒数 (默认: 5)')
+    parser.add_argument('--once', action='store_true',
+                        help='只拉取一轮后退出')
+    args = parser.parse_args(argv)
+
+    tickers = load_tickers(args.tickers, args.tickers_file)
+    if not tickers:
+        parser.error("no tickers given")
+
+    prefetcher = NewsPrefetcher(tickers, interval=args.interval, workers=args.workers,
+                                jitter=args.jitter)
+    if args.once:
+        prefetcher.run_once()
+        return
+
+    logger.info(f"Prefetching news for {len(tickers)} tickers every {args.interval:.0f}s")
+    try:
+        prefetcher.run_forever()
+    except KeyboardInterrupt:
+        logger.info("News prefetch stopped")
+
+
+if __name__ == "__main__":
+    main()
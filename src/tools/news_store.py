@@ -0,0 +1,248 @@
+import os
+import json
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Set
+
+import pandas as pd
+
+from src.utils.env import getenv
+from src.utils.lazy_import import lazy_import
+from src.utils.tracing import record_cache, traced_module
+from src.utils.logging_config import setup_logger
+from src.tools.concurrency import KeyedLocks, source_slot
+from src.utils.storage import get_data_path, read_json, write_json
+
+# 设置日志记录
+logger = setup_logger('news_store')
+
+# akshare 导入较慢，首次调用时才导入；每次调用记录为追踪 span
+ak = traced_module(lazy_import("akshare"), "akshare")
+
+# 两次向 akshare 拉取新闻的最短间隔（秒），可通过环境变量 NEWS_REFRESH_SECONDS 配置
+DEFAULT_REFRESH_SECONDS = 3600.0
+
+# 内容少于该字数的新闻被跳过
+MIN_CONTENT_LENGTH = 10
+
+# 旧版按日期整体缓存的新闻目录，首次加载某只股票时导入
+LEGACY_NEWS_DIR = get_data_path("stock_news")
+
+
+def fetch_stock_news(symbol: str) -> List[Dict[str, Any]]:
+    """从 akshare 获取个股新闻，转换为新闻字典列表
+
+    Args:
+        symbol: 股票代码
+
+    Returns:
+        按发布时间升序排列的新闻列表，每条包含 title/content/publish_time/source/url/keyword
+    """
+    with source_slot("eastmoney"):
+        news_df = ak.stock_news_em(symbol=symbol)
+    if news_df is None or news_df.empty:
+        return []
+
+    def column(name: str) -> pd.Series:
+        if name not in news_df.columns:
+            return pd.Series("", index=news_df.index)
+        return news_df[name].fillna("").astype(str).str.strip()
+
+    title = column("新闻标题")
+    content = column("新闻内容")
+    # 没有正文时用标题代替
+    content = content.where(content != "", title)
+    frame = pd.DataFrame({
+        "title": title,
+        "content": content,
+        "publish_time": column("发布时间"),
+        "source": column("文章来源"),
+        "url": column("新闻链接"),
+        "keyword": column("关键词"),
+    })
+    frame = frame[frame["content"].str.len() >= MIN_CONTENT_LENGTH]
+    frame = frame.sort_values("publish_time", kind="stable")
+    return frame.to_dict("records")
+
+
+class NewsStore:
+    """按股票增量保存的本地新闻历史
+
+    每只股票的新闻按发布时间升序追加到 src/data/news_store/{symbol}.jsonl，
+    同名 .json 文件记录水位线（最新发布时间及该时刻的新闻链接）和上次拉取时间。
+    每次拉取只追加水位线之后的新闻；任意条数的请求都从本地历史中截取，
+    只有距上次拉取超过刷新间隔时才会访问 akshare。
+    """
+
+    def __init__(self, root: Optional[str] = None,
+                 fetcher: Callable[[str], List[Dict[str, Any]]] = fetch_stock_news,
+                 refresh_seconds: Optional[float] = None,
+                 legacy_dir: Optional[str] = LEGACY_NEWS_DIR):
+        """
+        Args:
+            root: 存储根目录，默认为 src/data/news_store
+            fetcher: 实际获取新闻的函数，签名同 fetch_stock_news
+            refresh_seconds: 刷新间隔，为 None 时读取环境变量 NEWS_REFRESH_SECONDS
+            legacy_dir: 旧版 {symbol}_news.json 所在目录，为 None 时不导入
+        """
+        if refresh_seconds is None:
+            refresh_seconds = float(getenv("NEWS_REFRESH_SECONDS", DEFAULT_REFRESH_SECONDS))
+        self.root = root or get_data_path("news_store")
+        self.refresh_seconds = refresh_seconds
+        self.legacy_dir = legacy_dir
+        self._fetcher = fetcher
+        self._history: Dict[str, List[Dict[str, Any]]] = {}
+        self._urls: Dict[str, Set[str]] = {}
+        self._meta: Dict[str, Dict[str, Any]] = {}
+        # 每只股票一把锁：不同股票可以并发拉取，同一股票只拉取一次
+        self._locks = KeyedLocks()
+
+    def _path(self, symbol: str) -> str:
+        return os.path.join(self.root, symbol)
+
+    @staticmethod
+    def _identity(news: Dict[str, Any]) -> str:
+        return news.get("url") or f"{news.get('title')}|{news.get('publish_time')}"
+
+    def _load(self, symbol: str) -> None:
+        """从内存或磁盘加载新闻历史，首次加载时导入旧版缓存"""
+        if symbol in self._history:
+            return
+        path = self._path(symbol)
+        history: List[Dict[str, Any]] = []
+        if os.path.exists(path + ".jsonl"):
+            with open(path + ".jsonl", "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        history.append(json.loads(line))
+                    except ValueError:
+                        # 写入中断留下的不完整行
+                        continue
+            meta = read_json(path + ".json") or {}
+        else:
+            history = self._read_legacy(symbol)
+            meta = {}
+            if history:
+                self._append(symbol, history)
+
+        # 多个进程同时追加时可能出现重复，按链接去重
+        urls: Set[str] = set()
+        unique = []
+        for news in history:
+            identity = self._identity(news)
+            if identity not in urls:
+                urls.add(identity)
+                unique.append(news)
+
+        self._history[symbol] = unique
+        self._urls[symbol] = urls
+        self._meta[symbol] = meta
+
+    def _read_legacy(self, symbol: str) -> List[Dict[str, Any]]:
+        if not self.legacy_dir:
+            return []
+        legacy = read_json(os.path.join(self.legacy_dir, f"{symbol}_news.json"))
+        news = (legacy or {}).get("news") or []
+        if news:
+            logger.info(f"Imported {len(news)} legacy news items for {symbol}")
+        return sorted(news, key=lambda item: str(item.get("publish_time", "")))
+
+    def _append(self, symbol: str, news: List[Dict[str, Any]]) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        with open(self._path(symbol) + ".jsonl", "a", encoding="utf-8") as f:
+            for item in news:
+                f.write(json.dumps(item, ensure_ascii=False, default=str) + "\n")
+
+    def _watermark(self, symbol: str) -> Dict[str, Any]:
+        """最新一条新闻的发布时间及该时刻的全部新闻链接"""
+        history = self._history[symbol]
+        if not history:
+            return {"publish_time": "", "urls": []}
+        latest = str(history[-1].get("publish_time", ""))
+        urls = [self._identity(news) for news in reversed(history)
+                if str(news.get("publish_time", "")) == latest]
+        return {"publish_time": latest, "urls": urls}
+
+    def _refresh(self, symbol: str) -> int:
+        """拉取新闻并追加水位线之后的部分，返回新增条数"""
+        watermark = self._watermark(symbol)
+        seen = self._urls[symbol]
+        fetched = self._fetcher(symbol) or []
+        new_news = [
+            news for news in sorted(fetched, key=lambda item: str(item.get("publish_time", "")))
+            if self._identity(news) not in seen and (
+                str(news.get("publish_time", "")) > watermark["publish_time"]
+                or (str(news.get("publish_time", "")) == watermark["publish_time"]
+                    and self._identity(news) not in watermark["urls"]))
+        ]
+        if new_news:
+            self._append(symbol, new_news)
+            self._history[symbol].extend(new_news)
+            seen.update(self._identity(news) for news in new_news)
+
+        meta = {
+            "symbol": symbol,
+            "watermark": self._watermark(symbol),
+            "count": len(self._history[symbol]),
+            "fetched_at": time.time(),
+            "updated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        self._meta[symbol] = meta
+        try:
+            write_json(meta, self._path(symbol) + ".json")
+        except Exception as e:
+            logger.warning(f"Failed to persist news store meta for {symbol}: {e}")
+        logger.info(f"Fetched {len(fetched)} news items for {symbol}, {len(new_news)} new")
+        return len(new_news)
+
+    def _is_fresh(self, symbol: str) -> bool:
+        return time.time() - self._meta[symbol].get("fetched_at", 0.0) < self.refresh_seconds
+
+    def _reload_if_updated(self, symbol: str) -> bool:
+        """其他进程（如新闻预取守护进程）拉取过新闻时，从磁盘重新加载历史"""
+        meta = read_json(self._path(symbol) + ".json") or {}
+        if meta.get("fetched_at", 0.0) <= self._meta[symbol].get("fetched_at", 0.0):
+            return False
+        del self._history[symbol]
+        self._load(symbol)
+        return True
+
+    def refresh(self, symbol: str, force: bool = False) -> int:
+        """距上次拉取超过刷新间隔（或 force）时拉取新闻，返回新增条数"""
+        with self._locks.get(symbol):
+            self._load(symbol)
+            self._reload_if_updated(symbol)
+            if not force and self._is_fresh(symbol):
+                return 0
+            return self._refresh(symbol)
+
+    def get_news(self, symbol: str, max_news: int = 10) -> List[Dict[str, Any]]:
+        """获取最新的 max_news 条新闻，按发布时间降序排列
+
+        Args:
+            symbol: 股票代码
+            max_news: 新闻条数
+
+        Returns:
+            新闻字典列表（副本）
+        """
+        with self._locks.get(symbol):
+            self._load(symbol)
+            # 每次都检查其他进程是否拉取过更新的新闻（读取一个很小的元数据文件），
+            # 常驻进程在本地历史尚未过期时也能读到预取进程追加的新闻
+            self._reload_if_updated(symbol)
+            fresh = self._is_fresh(symbol)
+            record_cache(fresh)
+            if not fresh:
+                try:
+                    self._refresh(symbol)
+                except Exception as e:
+                    # 拉取失败时使用本地已有的历史
+                    logger.warning(f"Failed to fetch news for {symbol}: {e}")
+            history = self._history[symbol]
+            latest = history[-max_news:] if max_news > 0 else []
+        return [dict(news) for news in reversed(latest)]
+
+
+# 进程内共享的默认新闻存储
+news_store = NewsStore()
@@ -1,10 +1,13 @@
-import os
-import time
-from google import genai
-from dotenv import load_dotenv
+import asyncio
+import threading
+import weakref
 from dataclasses import dataclass
 import backoff
+from src.utils.env import getenv
 from src.utils.logging_config import setup_logger, SUCCESS_ICON, ERROR_ICON, WAIT_ICON
+from src.utils.tracing import payload_bytes, record_bytes, span, traced
+from src.tools.llm_cache import llm_cache, make_cache_key
+from src.tools.rate_limiter import estimate_tokens, is_rate_limit_error, rate_limiter
 
 # 设置日志记录
 logger = setup_logger('api_calls')
@@ -25,32 +28,102 @@ class ChatCompletion:
     choices: list[ChatChoice]
 
 
-# 获取项目根目录
-project_root = os.path.dirname(os.path.dirname(
-    os.path.dirname(os.path.abspath(__file__))))
-env_path = os.path.join(project_root, '.env')
+class GeminiConfigError(ValueError):
+    """Gemini 配置错误（如未配置 GEMINI_API_KEY），重试无法恢复，直接向上抛出"""
 
-# 加载环境变量
-if os.path.exists(env_path):
-    load_dotenv(env_path, override=True)
-    logger.info(f"{SUCCESS_ICON} 已加载环境变量: {env_path}")
-else:
-    logger.warning(f"{ERROR_ICON} 未找到环境变量文件: {env_path}")
 
-# 验证环境变量
-api_key = os.getenv("GEMINI_API_KEY")
-model = os.getenv("GEMINI_MODEL")
+# 未配置 GEMINI_MODEL 时使用的模型
+DEFAULT_MODEL = "gemini-1.5-flash"
 
-if not api_key:
-    logger.error(f"{ERROR_ICON} 未找到 GEMINI_API_KEY 环境变量")
-    raise ValueError("GEMINI_API_KEY not found in environment variables")
-if not model:
-    model = "gemini-1.5-flash"
-    logger.info(f"{WAIT_ICON} 使用默认模型: {model}")
+# Gemini 客户端，首次调用 API 时由 get_client 创建（测试或桩模型可以直接替换）
+client = None
+_client_lock = threading.Lock()
 
-# 初始化 Gemini 客户端
-client = genai.Client(api_key=api_key)
-logger.info(f"{SUCCESS_ICON} Gemini 客户端初始化成功")
+
+def get_client():
+    """获取 Gemini 客户端，首次调用时加载 google-genai 并校验 GEMINI_API_KEY
+
+    Raises:
+        GeminiConfigError: 未配置 GEMINI_API_KEY
+    """
+    global client
+    if client is None:
+        with _client_lock:
+            if client is None:
+                api_key = getenv("GEMINI_API_KEY")
+                if not api_key:
+                    logger.error(f"{ERROR_ICON} 未找到 GEMINI_API_KEY 环境变量")
+                    raise GeminiConfigError("GEMINI_API_KEY not found in environment variables")
+
+                from google import genai
+                client = genai.Client(api_key=api_key)
+                logger.info(f"{SUCCESS_ICON} Gemini 客户端初始化成功")
+    return client
+
+
+def default_model() -> str:
+    """当前配置的模型名称"""
+    return getenv("GEMINI_MODEL") or DEFAULT_MODEL
+
+
+# 异步调用的最大并发数，可通过环境变量 GEMINI_MAX_CONCURRENCY 配置
+DEFAULT_MAX_CONCURRENCY = 8
+
+# 每个事件循环各自的并发信号量（asyncio.Semaphore 不能跨事件循环使用）
+_semaphores = weakref.WeakKeyDictionary()
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    if loop not in _semaphores:
+        _semaphores[loop] = asyncio.Semaphore(
+            int(getenv("GEMINI_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY)))
+    return _semaphores[loop]
+
+
+def _estimate_request_tokens(contents, config=None):
+    """预估请求的 token 数，用于预约限速配额"""
+    return estimate_tokens(contents + str((config or {}).get('system_instruction') or ""))
+
+
+def _settle_usage(response, estimated_tokens):
+    """按响应中的实际用量修正预约的 token 数"""
+    usage = getattr(response, "usage_metadata", None)
+    total_tokens = getattr(usage, "total_token_count", None)
+    if total_tokens:
+        rate_limiter.adjust(total_tokens - estimated_tokens)
+
+
+def _to_request(messages):
+    """将聊天消息转换为 Gemini 的提示词与配置"""
+    prompt = ""
+    system_instruction = None
+
+    for message in messages:
+        role = message["role"]
+        content = message["content"]
+        if role == "system":
+            system_instruction = content
+        elif role == "user":
+            prompt += f"User: {content}\n"
+        elif role == "assistant":
+            prompt += f"Assistant: {content}\n"
+
+    # 准备配置
+    config = {}
+    if system_instruction:
+        config['system_instruction'] = system_instruction
+    return prompt.strip(), system_instruction, config
+
+
+def _handle_api_error(e):
+    """记录 API 错误；服务端限流时暂停所有调用方，而不只是当前调用"""
+    if is_rate_limit_error(e):
+        logger.warning(f"{ERROR_ICON} 触发 API 限制，等待重试... 错误: {str(e)}")
+        rate_limiter.penalize()
+        return
+    logger.error(f"{ERROR_ICON} API 调用失败: {str(e)}")
+    logger.error(f"错误详情: {str(e)}")
 
 
 @backoff.on_exception(
@@ -58,101 +131,166 @@ logger.info(f"{SUCCESS_ICON} Gemini 客户端初始化成功")
     (Exception),
     max_tries=5,
     max_time=300,
-    giveup=lambda e: "AFC is enabled" not in str(e)
+    giveup=lambda e: not is_rate_limit_error(e)
 )
 def generate_content_with_retry(model, contents, config=None):
-    """带重试机制的内容生成函数"""
+    """带重试机制的内容生成函数，所有调用共享同一个限速器"""
     try:
+        gemini = get_client()
+        # 按预估的 token 数预约配额，拿到响应后按实际用量修正
+        estimated_tokens = _estimate_request_tokens(contents, config)
+        with span("gemini.rate_limit_wait", kind="wait"):
+            rate_limiter.acquire(estimated_tokens)
+
         logger.info(f"{WAIT_ICON} 正在调用 Gemini API...")
         logger.debug(f"请求内容: {contents}")
         logger.debug(f"请求配置: {config}")
 
-        response = client.models.generate_content(
-            model=model,
-            contents=contents,
-            config=config
-        )
+        with span("gemini.generate_content", kind="llm", model=model):
+            response = gemini.models.generate_content(
+                model=model,
+                contents=contents,
+                config=config
+            )
+            record_bytes(payload_bytes(response.text))
+
+        _settle_usage(response, estimated_tokens)
 
         logger.info(f"{SUCCESS_ICON} API 调用成功")
         logger.debug(f"响应内容: {response.text[:500]}...")
         return response
     except Exception as e:
-        if "AFC is enabled" in str(e):
-            logger.warning(f"{ERROR_ICON} 触发 API 限制，等待重试... 错误: {str(e)}")
-            time.sleep(5)
-            raise e
-        logger.error(f"{ERROR_ICON} API 调用失败: {str(e)}")
-        logger.error(f"错误详情: {str(e)}")
+        _handle_api_error(e)
         raise e
 
 
-def get_chat_completion(messages, model=None, max_retries=3, initial_retry_delay=1):
-    """获取聊天完成结果，包含重试逻辑"""
+@backoff.on_exception(
+    backoff.expo,
+    (Exception),
+    max_tries=5,
+    max_time=300,
+    giveup=lambda e: not is_rate_limit_error(e)
+)
+async def agenerate_content_with_retry(model, contents, config=None):
+    """generate_content_with_retry 的异步版本，共享同一个限速器与重试策略"""
     try:
-        if model is None:
-            model = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
-
-        logger.info(f"{WAIT_ICON} 使用模型: {model}")
-        logger.debug(f"消息内容: {messages}")
-
-        for attempt in range(max_retries):
-            try:
-                # 转换消息格式
-                prompt = ""
-                system_instruction = None
-
-                for message in messages:
-                    role = message["role"]
-                    content = message["content"]
-                    if role == "system":
-                        system_instruction = content
-                    elif role == "user":
-                        prompt += f"User: {content}\n"
-                    elif role == "assistant":
-                        prompt += f"Assistant: {content}\n"
-
-                # 准备配置
-                config = {}
-                if system_instruction:
-                    config['system_instruction'] = system_instruction
-
-                # 调用 API
-                response = generate_content_with_retry(
-                    model=model,
-                    contents=prompt.strip(),
-                    config=config
-                )
-
-                if response is None:
-                    logger.warning(
-                        f"{ERROR_ICON} 尝试 {attempt + 1}/{max_retries}: API 返回空值")
-                    if attempt < max_retries - 1:
-                        retry_delay = initial_retry_delay * (2 ** attempt)
-                        logger.info(f"{WAIT_ICON} 等待 {retry_delay} 秒后重试...")
-                        time.sleep(retry_delay)
-                        continue
-                    return None
-
-                # 转换响应格式
-                chat_message = ChatMessage(content=response.text)
-                chat_choice = ChatChoice(message=chat_message)
-                completion = ChatCompletion(choices=[chat_choice])
-
-                logger.debug(f"API 原始响应: {response.text}")
-                logger.info(f"{SUCCESS_ICON} 成功获取响应")
-                return completion.choices[0].message.content
-
-            except Exception as e:
-                logger.error(
-                    f"{ERROR_ICON} 尝试 {attempt + 1}/{max_retries} 失败: {str(e)}")
-                if attempt < max_retries - 1:
-                    retry_delay = initial_retry_delay * (2 ** attempt)
-                    logger.info(f"{WAIT_ICON} 等待 {retry_delay} 秒后重试...")
-                    time.sleep(retry_delay)
-                else:
-                    logger.error(f"{ERROR_ICON} 最终错误: {str(e)}")
-                    return None
+        gemini = get_client()
+        estimated_tokens = _estimate_request_tokens(contents, config)
+        with span("gemini.rate_limit_wait", kind="wait"):
+            await rate_limiter.acquire_async(estimated_tokens)
+
+        logger.info(f"{WAIT_ICON} 正在异步调用 Gemini API...")
+        logger.debug(f"请求内容: {contents}")
+
+        with span("gemini.generate_content", kind="llm", model=model):
+            response = await gemini.aio.models.generate_content(
+                model=model,
+                contents=contents,
+                config=config
+            )
+            record_bytes(payload_bytes(response.text))
+
+        _settle_usage(response, estimated_tokens)
 
+        logger.info(f"{SUCCESS_ICON} API 调用成功")
+        logger.debug(f"响应内容: {response.text[:500]}...")
+        return response
+    except Exception as e:
+        _handle_api_error(e)
+        raise e
+
+
+@traced("get_chat_completion", kind="llm")
+def get_chat_completion(messages, model=None):
+    """获取聊天完成结果
+
+    限流错误由 generate_content_with_retry 统一退避重试（与限速器共享）；其他错误不再重试，
+    直接返回 None。
+
+    Raises:
+        GeminiConfigError: 未配置 GEMINI_API_KEY
+    """
+    if model is None:
+        model = default_model()
+
+    logger.info(f"{WAIT_ICON} 使用模型: {model}")
+    logger.debug(f"消息内容: {messages}")
+
+    # 转换消息格式
+    prompt, system_instruction, config = _to_request(messages)
+
+    # 完全相同的请求直接返回缓存的响应
+    cache_key = make_cache_key(model, system_instruction, prompt, config)
+    cached = llm_cache.get(cache_key)
+    if cached is not None:
+        logger.info(f"{SUCCESS_ICON} 命中响应缓存")
+        return cached
+
+    try:
+        response = generate_content_with_retry(
+            model=model,
+            contents=prompt,
+            config=config
+        )
+    except GeminiConfigError:
+        raise
     except Exception as e:
         logger.error(f"{ERROR_ICON} get_chat_completion 发生错误: {str(e)}")
         return None
+
+    if response is None or response.text is None:
+        logger.warning(f"{ERROR_ICON} API 返回空值")
+        return None
+
+    logger.debug(f"API 原始响应: {response.text}")
+    logger.info(f"{SUCCESS_ICON} 成功获取响应")
+    llm_cache.put(cache_key, response.text, model)
+    return response.text
+
+
+@traced("aget_chat_completion", kind="llm")
+async def aget_chat_completion(messages, model=None):
+    """get_chat_completion 的异步版本
+
+    使用 Gemini 异步客户端，同一事件循环内最多 GEMINI_MAX_CONCURRENCY 个请求同时进行，
+    与同步版本共享响应缓存、限速器和重试策略。取消（asyncio.CancelledError）会直接向上传播。
+
+    Raises:
+        GeminiConfigError: 未配置 GEMINI_API_KEY
+    """
+    if model is None:
+        model = default_model()
+
+    logger.info(f"{WAIT_ICON} 使用模型: {model}")
+    logger.debug(f"消息内容: {messages}")
+
+    prompt, system_instruction, config = _to_request(messages)
+
+    cache_key = make_cache_key(model, system_instruction, prompt, config)
+    # 缓存读写是带锁的同步 SQLite 操作，放到线程中执行，避免阻塞事件循环
+    cached = await asyncio.to_thread(llm_cache.get, cache_key)
+    if cached is not None:
+        logger.info(f"{SUCCESS_ICON} 命中响应缓存")
+        return cached
+
+    try:
+        async with _get_semaphore():
+            response = await agenerate_content_with_retry(
+                model=model,
+                contents=prompt,
+                config=config
+            )
+    except GeminiConfigError:
+        raise
+    except Exception as e:
+        logger.error(f"{ERROR_ICON} aget_chat_completion 发生错误: {str(e)}")
+        return None
+
+    if response is None or response.text is None:
+        logger.warning(f"{ERROR_ICON} API 返回空值")
+        return None
+
+    logger.debug(f"API 原始响应: {response.text}")
+    logger.info(f"{SUCCESS_ICON} 成功获取响应")
+    await asyncio.to_thread(llm_cache.put, cache_key, response.text, model)
+    return response.text
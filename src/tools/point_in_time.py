@@ -0,0 +1,257 @@
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import pandas as pd
+
+from src.utils.lazy_import import lazy_import
+from src.utils.tracing import traced_module
+from src.utils.logging_config import setup_logger
+from src.tools.concurrency import source_slot
+from src.tools.price_store import price_store
+from src.tools.spot_snapshot import spot_snapshot
+from src.tools.statement_cache import STATEMENT_FILES, disclosure_deadline, statement_cache
+
+# 设置日志记录
+logger = setup_logger('point_in_time')
+
+# akshare 导入较慢，首次调用时才导入；每次调用记录为追踪 span
+ak = traced_module(lazy_import("akshare"), "akshare")
+
+# 预加载的行情需要覆盖回测开始前的历史，供技术指标使用（与 get_price_history 扩展的范围一致）
+PRICE_LOOKBACK_DAYS = 730
+
+# 预加载的新闻条数（东方财富个股新闻接口的上限）
+NEWS_PRELOAD_COUNT = 100
+
+
+def fetch_financial_indicators(symbol: str, start_year: int) -> pd.DataFrame:
+    """从新浪获取财务指标"""
+    with source_slot("sina"):
+        return ak.stock_financial_analysis_indicator(symbol=symbol, start_year=str(start_year))
+
+
+def estimate_available_date(report_date: pd.Timestamp) -> pd.Timestamp:
+    """没有公告日期时，按法定披露截止日估计报告的可用日期"""
+    try:
+        return disclosure_deadline(report_date)
+    except KeyError:
+        return report_date + pd.Timedelta(days=120)
+
+
+def _available_dates(df: pd.DataFrame, report_column: str) -> pd.Series:
+    """计算每条报告的可用日期：优先使用公告日期，缺失时使用披露截止日"""
+    report_dates = pd.to_datetime(df[report_column].astype(str), errors="coerce")
+    estimated = report_dates.map(
+        lambda d: estimate_available_date(d) if pd.notna(d) else pd.NaT)
+    if "公告日期" in df.columns:
+        announced = pd.to_datetime(df["公告日期"].astype(str), errors="coerce")
+        return announced.fillna(estimated)
+    return estimated
+
+
+class PointInTimeProvider:
+    """回测用的时点数据视图
+
+    回测开始前一次性加载整个回测区间所需的行情、财务报表、财务指标、实时行情快照和新闻，
+    之后每个交易日只需调用 set_as_of 移动时点，get_* 接口返回截至该时点可见的数据切片：
+    - 行情：日期不晚于时点的K线
+    - 财务报表/财务指标：公告日期（缺失时为法定披露截止日）不晚于时点的报告
+    - 新闻：发布时间不晚于时点的新闻
+    - 市值、市盈率等估值数据：以最新快照为基准，按时点收盘价与最新收盘价之比缩放
+    """
+
+    def __init__(self, ticker: str, start_date: str, end_date: str,
+                 prices=price_store, statements=statement_cache, quotes=spot_snapshot,
+                 indicator_fetcher: Callable[[str, int], pd.DataFrame] = fetch_financial_indicators,
+                 news_fetcher: Optional[Callable[[str, int], List[Dict[str, Any]]]] = None):
+        """
+        Args:
+            ticker: 股票代码
+            start_date: 回测开始日期，格式：YYYY-MM-DD
+            end_date: 回测结束日期，格式：YYYY-MM-DD
+            prices: 行情存储，需提供 get_bars
+            statements: 财务报表缓存，需提供 get
+            quotes: 实时行情快照，需提供 get_quote
+            indicator_fetcher: 获取财务指标的函数，签名同 fetch_financial_indicators
+            news_fetcher: 获取新闻的函数，默认为 news_crawler.get_stock_news
+        """
+        self.ticker = ticker
+        self.start_date = datetime.strptime(start_date, "%Y-%m-%d")
+        self.end_date = datetime.strptime(end_date, "%Y-%m-%d")
+        self._prices = prices
+        self._statements = statements
+        self._quotes = quotes
+        self._indicator_fetcher = indicator_fetcher
+        self._news_fetcher = news_fetcher
+
+        self.as_of: pd.Timestamp = pd.Timestamp(self.end_date)
+        self.bars = pd.DataFrame()
+        self.statements: Dict[str, pd.DataFrame] = {}
+        self.indicators = pd.DataFrame()
+        self.quote: Optional[Dict[str, Any]] = None
+        self.news: List[Dict[str, Any]] = []
+        self._latest_close: Optional[float] = None
+        self.loaded = False
+
+    def load(self) -> "PointInTimeProvider":
+        """一次性加载回测所需的全部数据，各数据源失败时退化为空数据"""
+        logger.info(f"Preloading point-in-time data for {self.ticker}...")
+        try:
+            bars = self._prices.get_bars(
+                self.ticker, self.start_date - timedelta(days=PRICE_LOOKBACK_DAYS), self.end_date)
+            self.bars = bars if bars is not None else pd.DataFrame()
+        except Exception as e:
+            logger.error(f"Failed to preload prices: {e}")
+
+        for statement in STATEMENT_FILES:
+            try:
+                df = self._statements.get(self.ticker, statement)
+                if df is not None and not df.empty and "报告日" in df.columns:
+                    df = df.assign(_available=_available_dates(df, "报告日"))
+                self.statements[statement] = df
+            except Exception as e:
+                logger.error(f"Failed to preload {statement}: {e}")
+                self.statements[statement] = pd.DataFrame()
+
+        try:
+            df = self._indicator_fetcher(self.ticker, self.start_date.year - 1)
+            if df is not None and not df.empty:
+                df = df.assign(日期=pd.to_datetime(df["日期"]))
+                df = df.assign(_available=_available_dates(df, "日期"))
+                self.indicators = df
+        except Exception as e:
+            logger.error(f"Failed to preload financial indicators: {e}")
+
+        try:
+            self.quote = self._quotes.get_quote(self.ticker)
+        except Exception as e:
+            logger.error(f"Failed to preload real-time quote: {e}")
+
+        try:
+            news_fetcher = self._news_fetcher
+            if news_fetcher is None:
+                from src.tools.news_crawler import get_stock_news
+                news_fetcher = get_stock_news
+            self.news = news_fetcher(self.ticker, NEWS_PRELOAD_COUNT) or []
+        except Exception as e:
+            logger.error(f"Failed to preload news: {e}")
+
+        if self.quote and self.quote.get("最新价"):
+            self._latest_close = float(self.quote["最新价"])
+        elif not self.bars.empty:
+            self._latest_close = float(self.bars["close"].iloc[-1])
+
+        self.loaded = True
+        logger.info(f"✓ Point-in-time data loaded ({len(self.bars)} bars, "
+                    f"{len(self.indicators)} indicator records, {len(self.news)} news)")
+        return self
+
+    def set_as_of(self, as_of) -> None:
+        """设置当前时点，时点当天收盘后的数据均可见"""
+        self.as_of = pd.Timestamp(as_of).normalize()
+
+    @property
+    def as_of_end(self) -> pd.Timestamp:
+        """时点当天的最后时刻"""
+        return self.as_of + pd.Timedelta(days=1) - pd.Timedelta(microseconds=1)
+
+    def get_bars(self, start_date, end_date) -> pd.DataFrame:
+        """获取 [start_date, min(end_date, 时点)] 区间内的日线行情（副本）"""
+        if self.bars.empty:
+            return pd.DataFrame()
+        start = pd.Timestamp(start_date).normalize()
+        end = min(pd.Timestamp(end_date).normalize(), self.as_of)
+        dates = self.bars["date"]
+        lo = dates.searchsorted(start, side="left")
+        hi = dates.searchsorted(end, side="right")
+        return self.bars.iloc[lo:hi].reset_index(drop=True)
+
+    def get_statement(self, statement: str) -> pd.DataFrame:
+        """获取截至时点已公告的财务报表，最新报告期在前"""
+        df = self.statements.get(statement)
+        if df is None or df.empty or "_available" not in df.columns:
+            return pd.DataFrame()
+        visible = df[df["_available"] <= self.as_of]
+        return visible.drop(columns="_available").reset_index(drop=True)
+
+    def get_financial_indicators(self) -> pd.DataFrame:
+        """获取截至时点已公告的财务指标"""
+        if self.indicators.empty:
+            return pd.DataFrame()
+        visible = self.indicators[self.indicators["_available"] <= self.as_of]
+        return visible.drop(columns="_available").reset_index(drop=True)
+
+    def get_quote(self) -> Optional[Dict[str, Any]]:
+        """获取按时点价格缩放后的行情快照
+
+        市值、市盈率、市净率按时点收盘价与最新价之比缩放（假设股本不变），
+        成交量与52周高低点由时点之前的K线计算。
+        """
+        if self.quote is None:
+            return None
+        bars = self.get_bars(self.as_of - pd.Timedelta(weeks=52), self.as_of)
+        if bars.empty or not self._latest_close:
+            return dict(self.quote)
+
+        ratio = float(bars["close"].iloc[-1]) / self._latest_close
+        quote = dict(self.quote)
+        for field in ("最新价", "总市值", "流通市值", "市盈率-动态", "市净率"):
+            try:
+                quote[field] = float(self.quote.get(field, 0)) * ratio
+            except (TypeError, ValueError):
+                pass
+        quote["成交量"] = float(bars["volume"].iloc[-1])
+        quote["52周最高"] = float(bars["high"].max())
+        quote["52周最低"] = float(bars["low"].min())
+        return quote
+
+    def get_news(self, max_news: int) -> List[Dict[str, Any]]:
+        """获取发布时间不晚于时点的最新新闻"""
+        cutoff = self.as_of_end.strftime("%Y-%m-%d %H:%M:%S")
+        visible = [news for news in self.news
+                   if str(news.get("publish_time", "")) <= cutoff]
+        return visible[:max_news]
+
+
+_active_provider: Optional[PointInTimeProvider] = None
+_active_lock = threading.Lock()
+
+
+def get_active_provider(symbol: Optional[str] = None) -> Optional[PointInTimeProvider]:
+    """获取当前生效的时点数据视图
+
+    Args:
+        symbol: 股票代码，指定时只在视图属于该股票时返回
+
+    Returns:
+        生效的视图，没有时返回 None（get_* 接口走实时数据）
+    """
+    provider = _active_provider
+    if provider is None or (symbol is not None and provider.ticker != symbol):
+        return None
+    return provider
+
+
+def current_time(symbol: Optional[str] = None) -> datetime:
+    """当前分析时点：回测中为时点当天收盘后，否则为当前时间"""
+    provider = get_active_provider(symbol)
+    if provider is None:
+        return datetime.now()
+    return provider.as_of_end.to_pydatetime()
+
+
+@contextmanager
+def use_point_in_time(provider: PointInTimeProvider) -> Iterator[PointInTimeProvider]:
+    """在 with 块内让 get_* 接口使用时点数据视图（对所有线程生效）"""
+    global _active_provider
+    if not provider.loaded:
+        provider.load()
+    with _active_lock:
+        previous, _active_provider = _active_provider, provider
+    try:
+        yield provider
+    finally:
+        with _active_lock:
+            _active_provider = previous
@@ -0,0 +1,174 @@
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+
+class PriceFeatures:
+    """按价格数据缓存技术指标中间结果的特征帧
+
+    收益率、真实波动幅度、按窗口计算的滚动统计量、EMA、RSI 等基础量对同一份行情数据
+    只计算一次，由各个策略函数共享。原始 DataFrame 只读不写，所有结果都是新的
+    Series/DataFrame；缓存的结果在多个调用方之间共享，调用方不应原地修改它们。
+
+    用法：
+        features = PriceFeatures(prices_df)
+        calculate_trend_signals(features)
+        calculate_mean_reversion_signals(features)
+    """
+
+    # 除行情列以外可按名称引用的派生序列
+    _DERIVED = ('returns', 'close_diff', 'gain', 'loss', 'true_range')
+
+    def __init__(self, prices_df: pd.DataFrame):
+        """
+        Args:
+            prices_df: 包含 open/high/low/close/volume 列的行情数据
+        """
+        self.prices_df = prices_df
+        self._cache: Dict[Tuple[Hashable, ...], Any] = {}
+
+    @classmethod
+    def of(cls, prices: Union[pd.DataFrame, 'PriceFeatures']) -> 'PriceFeatures':
+        """将行情数据包装为特征帧，已经是特征帧时直接返回"""
+        return prices if isinstance(prices, cls) else cls(prices)
+
+    def _memo(self, key: Tuple[Hashable, ...], compute: Callable[[], Any]) -> Any:
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    def series(self, name: str) -> pd.Series:
+        """按名称获取行情列或派生序列"""
+        if name in self._DERIVED:
+            return getattr(self, name)()
+        return self.prices_df[name]
+
+    @property
+    def close(self) -> pd.Series:
+        return self.prices_df['close']
+
+    @property
+    def high(self) -> pd.Series:
+        return self.prices_df['high']
+
+    @property
+    def low(self) -> pd.Series:
+        return self.prices_df['low']
+
+    @property
+    def volume(self) -> pd.Series:
+        return self.prices_df['volume']
+
+    # 基础序列
+
+    def returns(self) -> pd.Series:
+        """收盘价日收益率"""
+        return self._memo(('returns',), lambda: self.close.pct_change())
+
+    def close_diff(self) -> pd.Series:
+        """收盘价日变动"""
+        return self._memo(('close_diff',), lambda: self.close.diff())
+
+    def gain(self) -> pd.Series:
+        """收盘价上涨幅度，下跌或无数据时为0"""
+        def compute():
+            delta = self.close_diff()
+            return (delta.where(delta > 0, 0)).fillna(0)
+        return self._memo(('gain',), compute)
+
+    def loss(self) -> pd.Series:
+        """收盘价下跌幅度，上涨或无数据时为0"""
+        def compute():
+            delta = self.close_diff()
+            return (-delta.where(delta < 0, 0)).fillna(0)
+        return self._memo(('loss',), compute)
+
+    def true_range(self) -> pd.Series:
+        """真实波动幅度"""
+        def compute():
+            prev_close = self.close.shift()
+            high_low = self.high - self.low
+            high_close = abs(self.high - prev_close)
+            low_close = abs(self.low - prev_close)
+            return pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
+        return self._memo(('true_range',), compute)
+
+    # 滚动统计量
+
+    def rolling_stat(self, name: str, stat: str, window: int,
+                     min_periods: Optional[int] = None) -> pd.Series:
+        """按窗口计算序列的滚动统计量
+
+        Args:
+            name: 行情列名或派生序列名（如 'close'、'returns'、'true_range'）
+            stat: 统计量，如 'mean'、'std'、'sum'、'max'、'min'、'skew'、'kurt'
+            window: 窗口长度
+            min_periods: 最少数据点数，默认等于窗口长度
+        """
+        return self._memo(
+            ('rolling', name, stat, window, min_periods),
+            lambda: getattr(self.series(name).rolling(window, min_periods=min_periods), stat)())
+
+    def rolling_mean(self, name: str, window: int, min_periods: Optional[int] = None) -> pd.Series:
+        return self.rolling_stat(name, 'mean', window, min_periods)
+
+    def rolling_std(self, name: str, window: int, min_periods: Optional[int] = None) -> pd.Series:
+        return self.rolling_stat(name, 'std', window, min_periods)
+
+    # 技术指标
+
+    def ema(self, span: int) -> pd.Series:
+        """收盘价指数移动平均"""
+        return self._memo(('ema', span),
+                          lambda: self.close.ewm(span=span, adjust=False).mean())
+
+    def macd(self) -> Tuple[pd.Series, pd.Series]:
+        """MACD 线与信号线"""
+        def compute():
+            macd_line = self.ema(12) - self.ema(26)
+            signal_line = macd_line.ewm(span=9, adjust=False).mean()
+            return macd_line, signal_line
+        return self._memo(('macd',), compute)
+
+    def rsi(self, period: int = 14) -> pd.Series:
+        """相对强弱指标"""
+        def compute():
+            avg_gain = self.rolling_mean('gain', period)
+            avg_loss = self.rolling_mean('loss', period)
+            rs = avg_gain / avg_loss
+            return 100 - (100 / (1 + rs))
+        return self._memo(('rsi', period), compute)
+
+    def bollinger_bands(self, window: int = 20) -> Tuple[pd.Series, pd.Series]:
+        """布林带上轨与下轨"""
+        def compute():
+            sma = self.rolling_mean('close', window)
+            std_dev = self.rolling_std('close', window)
+            return sma + (std_dev * 2), sma - (std_dev * 2)
+        return self._memo(('bollinger_bands', window), compute)
+
+    def adx(self, period: int = 14) -> pd.DataFrame:
+        """平均趋向指标，包含 adx、+di、-di 三列"""
+        def compute():
+            up_move = self.high - self.high.shift()
+            down_move = self.low.shift() - self.low
+            plus_dm = pd.Series(np.where((up_move > down_move) & (up_move > 0), up_move, 0),
+                                index=self.prices_df.index)
+            minus_dm = pd.Series(np.where((down_move > up_move) & (down_move > 0), down_move, 0),
+                                 index=self.prices_df.index)
+
+            tr_ewm = self.true_range().ewm(span=period).mean()
+            plus_di = 100 * (plus_dm.ewm(span=period).mean() / tr_ewm)
+            minus_di = 100 * (minus_dm.ewm(span=period).mean() / tr_ewm)
+            dx = 100 * abs(plus_di - minus_di) / (plus_di + minus_di)
+            return pd.DataFrame({
+                'adx': dx.ewm(span=period).mean(),
+                '+di': plus_di,
+                '-di': minus_di,
+            })
+        return self._memo(('adx', period), compute)
+
+    def atr(self, period: int = 14, min_periods: Optional[int] = 7) -> pd.Series:
+        """平均真实波动幅度"""
+        return self.rolling_mean('true_range', period, min_periods)
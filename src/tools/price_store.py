@@ -0,0 +1,256 @@
+import os
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from src.utils.lazy_import import lazy_import
+from src.utils.tracing import record_cache, traced_module
+from src.utils.logging_config import setup_logger
+from src.tools.concurrency import KeyedLocks, source_slot
+from src.utils.storage import get_data_path, read_frame, write_frame, read_json, write_json
+
+# 设置日志记录
+logger = setup_logger('price_store')
+
+# akshare 导入较慢，首次调用时才导入；每次调用记录为追踪 span
+ak = traced_module(lazy_import("akshare"), "akshare")
+
+# akshare 日线行情列名到英文列名的映射
+PRICE_COLUMN_MAPPING = {
+    "日期": "date",
+    "开盘": "open",
+    "最高": "high",
+    "最低": "low",
+    "收盘": "close",
+    "成交量": "volume",
+    "成交额": "amount",
+    "振幅": "amplitude",
+    "涨跌幅": "pct_change",
+    "涨跌额": "change_amount",
+    "换手率": "turnover"
+}
+
+# 判断前/后复权数据是否发生重算时允许的收盘价误差
+_ADJUST_TOLERANCE = 1e-6
+
+
+def fetch_price_bars(symbol: str, start_date: datetime, end_date: datetime, adjust: str = "qfq") -> pd.DataFrame:
+    """从 akshare 获取日线行情，并重命名列以匹配技术分析代理的需求
+
+    Args:
+        symbol: 股票代码
+        start_date: 开始日期
+        end_date: 结束日期
+        adjust: 复权类型，""、"qfq" 或 "hfq"
+
+    Returns:
+        按日期升序排列的 DataFrame，无数据时返回空 DataFrame
+    """
+    with source_slot("eastmoney"):
+        df = ak.stock_zh_a_hist(
+            symbol=symbol,
+            period="daily",
+            start_date=start_date.strftime("%Y%m%d"),
+            end_date=end_date.strftime("%Y%m%d"),
+            adjust=adjust
+        )
+
+    if df is None or df.empty:
+        return pd.DataFrame()
+
+    df = df.rename(columns=PRICE_COLUMN_MAPPING)
+
+    # 确保日期列为datetime类型
+    df["date"] = pd.to_datetime(df["date"])
+    return df.sort_values("date").reset_index(drop=True)
+
+
+class PriceStore:
+    """本地列式日线行情存储
+
+    按 股票代码 + 复权方式 分区保存到 src/data/price_store/{adjust}/{symbol}，
+    同时记录已向 akshare 请求过的日期区间（覆盖区间）。读取时只拉取覆盖区间之外的部分，
+    再与本地数据合并；已加载的分区会保留在内存中，重复请求无需访问磁盘。
+
+    前复权/后复权价格会因除权除息整体重算，因此增量拉取时会多取一根与本地重叠的K线，
+    若重叠K线的收盘价不一致，则重新拉取整个区间。
+    """
+
+    def __init__(self, root: Optional[str] = None,
+                 fetcher: Callable[[str, datetime, datetime, str], pd.DataFrame] = fetch_price_bars):
+        """
+        Args:
+            root: 存储根目录，默认为 src/data/price_store
+            fetcher: 实际获取行情的函数，签名同 fetch_price_bars
+        """
+        self.root = root or get_data_path("price_store")
+        self._fetcher = fetcher
+        self._frames: Dict[Tuple[str, str], pd.DataFrame] = {}
+        self._coverage: Dict[Tuple[str, str], Tuple[pd.Timestamp, pd.Timestamp]] = {}
+        # 每个分区一把锁：不同股票可以并发拉取，同一分区只拉取一次
+        self._locks = KeyedLocks()
+
+    def _partition_path(self, symbol: str, adjust: str) -> str:
+        return os.path.join(self.root, adjust or "none", symbol)
+
+    def _load(self, key: Tuple[str, str]) -> Tuple[Optional[pd.DataFrame], Optional[Tuple[pd.Timestamp, pd.Timestamp]]]:
+        """从内存或磁盘加载分区数据及其覆盖区间"""
+        if key in self._frames:
+            return self._frames[key], self._coverage[key]
+
+        path = self._partition_path(*key)
+        meta = read_json(path + ".json")
+        frame = read_frame(path)
+        if meta is None or frame is None:
+            return None, None
+
+        coverage = (pd.Timestamp(meta["start"]), pd.Timestamp(meta["end"]))
+        self._frames[key] = frame
+        self._coverage[key] = coverage
+        return frame, coverage
+
+    def _save(self, key: Tuple[str, str], frame: pd.DataFrame, coverage: Tuple[pd.Timestamp, pd.Timestamp]) -> None:
+        """将分区数据写入内存和磁盘"""
+        self._frames[key] = frame
+        self._coverage[key] = coverage
+        path = self._partition_path(*key)
+        try:
+            write_frame(frame, path)
+            write_json({
+                "symbol": key[0],
+                "adjust": key[1],
+                "start": coverage[0].strftime("%Y-%m-%d"),
+                "end": coverage[1].strftime("%Y-%m-%d"),
+                "rows": len(frame),
+                "updated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            }, path + ".json")
+        except Exception as e:
+            # 写盘失败不影响本次返回的数据
+            logger.warning(f"Failed to persist price store partition {key}: {e}")
+
+    def _fetch(self, symbol: str, start: pd.Timestamp, end: pd.Timestamp, adjust: str) -> pd.DataFrame:
+        logger.info(
+            f"Fetching {symbol} ({adjust or 'none'}) bars from akshare: {start.strftime('%Y-%m-%d')} ~ {end.strftime('%Y-%m-%d')}")
+        df = self._fetcher(symbol, start.to_pydatetime(),
+                           end.to_pydatetime(), adjust)
+        return df if df is not None else pd.DataFrame()
+
+    @staticmethod
+    def _same_close(stored: pd.DataFrame, fetched: pd.DataFrame, date: pd.Timestamp) -> bool:
+        """检查本地与新拉取数据在重叠日期上的收盘价是否一致"""
+        old = stored.loc[stored["date"] == date, "close"]
+        new = fetched.loc[fetched["date"] == date, "close"]
+        if old.empty or new.empty:
+            return True
+        old_close, new_close = float(old.iloc[0]), float(new.iloc[0])
+        return abs(old_close - new_close) <= _ADJUST_TOLERANCE * max(1.0, abs(old_close))
+
+    def _update(self, symbol: str, adjust: str, frame: Optional[pd.DataFrame],
+                coverage: Optional[Tuple[pd.Timestamp, pd.Timestamp]],
+                start: pd.Timestamp, end: pd.Timestamp) -> Tuple[pd.DataFrame, Tuple[pd.Timestamp, pd.Timestamp]]:
+        """拉取覆盖区间之外的数据并合并，返回新的分区数据和覆盖区间"""
+        if coverage is None:
+            return self._fetch(symbol, start, end, adjust), (start, end)
+
+        new_coverage = (min(start, coverage[0]), max(end, coverage[1]))
+        has_bars = frame is not None and not frame.empty
+        # (新拉取的数据, 与本地重叠的日期)
+        fetched: List[Tuple[pd.DataFrame, Optional[pd.Timestamp]]] = []
+
+        if start < coverage[0]:
+            # 复权数据多取一根本地已有的K线，用于校验复权基准是否变化
+            overlap = frame["date"].iloc[0] if adjust and has_bars else None
+            head_end = overlap if overlap is not None else coverage[0] - timedelta(days=1)
+            fetched.append((self._fetch(symbol, start, head_end, adjust), overlap))
+
+        if end > coverage[1]:
+            overlap = frame["date"].iloc[-1] if adjust and has_bars else None
+            tail_start = overlap if overlap is not None else coverage[1] + timedelta(days=1)
+            fetched.append((self._fetch(symbol, tail_start, end, adjust), overlap))
+
+        for piece, overlap in fetched:
+            if overlap is not None and not self._same_close(frame, piece, overlap):
+                logger.info(
+                    f"Adjusted prices of {symbol} changed since last fetch, refetching full range")
+                return self._fetch(symbol, new_coverage[0], new_coverage[1], adjust), new_coverage
+
+        pieces = ([frame] if has_bars else []) + \
+            [piece for piece, _ in fetched if not piece.empty]
+        if not pieces:
+            return pd.DataFrame(), new_coverage
+
+        merged = pd.concat(pieces, ignore_index=True)
+        merged = merged.drop_duplicates(subset="date", keep="last")
+        merged = merged.sort_values("date").reset_index(drop=True)
+        return merged, new_coverage
+
+    def get_bars(self, symbol: str, start_date: datetime, end_date: datetime, adjust: str = "qfq") -> pd.DataFrame:
+        """获取 [start_date, end_date] 区间内的日线行情
+
+        结束日期最晚截止到昨天，避免把盘中未完成的K线写入本地存储。
+
+        Args:
+            symbol: 股票代码
+            start_date: 开始日期
+            end_date: 结束日期
+            adjust: 复权类型，""、"qfq" 或 "hfq"
+
+        Returns:
+            按日期升序排列的 DataFrame（副本，调用方可以自由修改），无数据时返回空 DataFrame
+        """
+        yesterday = pd.Timestamp(datetime.now().date() - timedelta(days=1))
+        start = pd.Timestamp(start_date).normalize()
+        end = min(pd.Timestamp(end_date).normalize(), yesterday)
+        if start > end:
+            return pd.DataFrame()
+
+        key = (symbol, adjust)
+        with self._locks.get(key):
+            frame, coverage = self._load(key)
+            hit = coverage is not None and coverage[0] <= start and end <= coverage[1]
+            record_cache(hit)
+            if not hit:
+                frame, coverage = self._update(
+                    symbol, adjust, frame, coverage, start, end)
+                self._save(key, frame, coverage)
+            else:
+                logger.info(f"Price store hit for {symbol} ({adjust or 'none'})")
+
+        if frame is None or frame.empty:
+            return pd.DataFrame()
+
+        # 数据按日期有序，使用二分查找截取区间
+        dates = frame["date"]
+        lo = dates.searchsorted(start, side="left")
+        hi = dates.searchsorted(end, side="right")
+        return frame.iloc[lo:hi].reset_index(drop=True)
+
+
+def asof_price_lookup(bars: pd.DataFrame, dates, column: str = "open",
+                      tolerance_days: int = 30) -> Dict[pd.Timestamp, float]:
+    """为一组日期建立 as-of 价格查找表
+
+    每个日期取当日或之前最近一个交易日的价格（停牌、节假日沿用之前的价格），
+    最近的交易日距今超过 tolerance_days 天时视为无价格。
+
+    Args:
+        bars: get_bars 返回的日线行情
+        dates: 需要查询价格的日期序列
+        column: 价格列，默认为开盘价
+        tolerance_days: 最多向前沿用多少天的价格
+
+    Returns:
+        日期到价格的字典，没有可用价格的日期不包含在内
+    """
+    if bars is None or bars.empty:
+        return {}
+    prices = bars.set_index("date")[column]
+    prices = prices[~prices.index.duplicated(keep="last")]
+    aligned = prices.reindex(pd.DatetimeIndex(dates), method="ffill",
+                             tolerance=pd.Timedelta(days=tolerance_days))
+    return {date: float(price) for date, price in aligned.dropna().items()}
+
+
+# 进程内共享的默认行情存储
+price_store = PriceStore()
@@ -0,0 +1,132 @@
+import math
+import time
+import asyncio
+import threading
+from typing import Callable, Optional
+
+from src.utils.env import getenv
+from src.utils.logging_config import setup_logger
+
+# 设置日志记录
+logger = setup_logger('rate_limiter')
+
+# Gemini 每分钟请求数与 token 数配额，可通过环境变量 GEMINI_RPM / GEMINI_TPM 配置，0 表示不限制
+DEFAULT_RPM = 15
+DEFAULT_TPM = 1000000
+
+# 触发服务端限流后所有调用方暂停的时间（秒）
+RATE_LIMIT_COOLDOWN = 5.0
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估计文本的 token 数（中英文混合约 3 个字符一个 token）"""
+    return max(1, math.ceil(len(text or "") / 3))
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """判断异常是否为服务端限流"""
+    message = str(error)
+    return any(marker in message for marker in ("AFC is enabled", "429", "RESOURCE_EXHAUSTED"))
+
+
+class _Bucket:
+    """单个令牌桶，余量可以为负，表示已被预约的未来额度"""
+
+    def __init__(self, per_minute: float, capacity: float, now: float):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity
+        self.level = capacity
+        self.updated_at = now
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def reserve(self, cost: float) -> float:
+        """预约 cost 个令牌，返回需要等待的秒数"""
+        wait = max(0.0, (cost - self.level) / self.rate)
+        self.level -= cost
+        return wait
+
+
+class TokenBucketLimiter:
+    """按每分钟请求数与 token 数限速的令牌桶，线程与 asyncio 安全
+
+    每次调用先预约额度再等待：预约在锁内完成、按到达顺序排队，等待在锁外进行，
+    因此并发调用方既不会超出配额，也不会互相阻塞在锁上。桶的容量为 burst_seconds
+    内可用的额度，默认是一个请求的间隔，即按配额均匀放行，任意一分钟内不超过配额。
+    """
+
+    def __init__(self, requests_per_minute: Optional[float] = None,
+                 tokens_per_minute: Optional[float] = None,
+                 burst_seconds: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            requests_per_minute: 每分钟请求数，为 None 时读取环境变量 GEMINI_RPM
+            tokens_per_minute: 每分钟 token 数，为 None 时读取环境变量 GEMINI_TPM
+            burst_seconds: 允许突发的额度（按秒计），默认为一个请求的间隔
+            clock: 单调时钟，便于测试
+        """
+        if requests_per_minute is None:
+            requests_per_minute = float(getenv("GEMINI_RPM", DEFAULT_RPM))
+        if tokens_per_minute is None:
+            tokens_per_minute = float(getenv("GEMINI_TPM", DEFAULT_TPM))
+        if burst_seconds is None:
+            burst_seconds = 60.0 / requests_per_minute if requests_per_minute > 0 else 1.0
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._blocked_until = 0.0
+
+        now = clock()
+        self._requests = _Bucket(requests_per_minute, max(1.0, requests_per_minute * burst_seconds / 60.0),
+                                 now) if requests_per_minute > 0 else None
+        self._tokens = _Bucket(tokens_per_minute, tokens_per_minute * burst_seconds / 60.0,
+                               now) if tokens_per_minute > 0 else None
+
+    def reserve(self, tokens: int = 1) -> float:
+        """预约一次请求及其 token 额度，返回调用方需要等待的秒数"""
+        with self._lock:
+            now = self._clock()
+            wait = max(0.0, self._blocked_until - now)
+            for bucket, cost in ((self._requests, 1), (self._tokens, tokens)):
+                if bucket is not None:
+                    bucket.refill(now)
+                    wait = max(wait, bucket.reserve(cost))
+            return wait
+
+    def acquire(self, tokens: int = 1) -> float:
+        """阻塞直到额度可用，返回实际等待的秒数"""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            logger.debug(f"Rate limit: waiting {wait:.2f}s")
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, tokens: int = 1) -> float:
+        """acquire 的协程版本，等待期间不阻塞事件循环"""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            logger.debug(f"Rate limit: waiting {wait:.2f}s")
+            await asyncio.sleep(wait)
+        return wait
+
+    def adjust(self, tokens: int) -> None:
+        """按实际用量修正预约的 token 数（正数追加扣减，负数退还）"""
+        if self._tokens is None or not tokens:
+            return
+        with self._lock:
+            self._tokens.refill(self._clock())
+            self._tokens.level = min(self._tokens.capacity, self._tokens.level - tokens)
+
+    def penalize(self, seconds: float = RATE_LIMIT_COOLDOWN) -> None:
+        """服务端返回限流时，让所有调用方暂停 seconds 秒"""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, self._clock() + seconds)
+        logger.warning(f"Rate limited by server, pausing all LLM calls for {seconds:.0f}s")
+
+
+# 进程内所有 Gemini 调用共享的限速器
+rate_limiter = TokenBucketLimiter()
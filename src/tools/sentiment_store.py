@@ -0,0 +1,179 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from typing import Any, Dict, Optional
+
+from src.utils.env import getenv
+from src.utils.logging_config import setup_logger
+from src.utils.storage import connect_sqlite, get_data_path
+from src.utils.tracing import record_cache
+
+# 设置日志记录
+logger = setup_logger('sentiment_store')
+
+# 情感得分的保留天数，可通过环境变量 SENTIMENT_CACHE_MAX_AGE_DAYS 配置，0 表示永不过期
+DEFAULT_MAX_AGE_DAYS = 90.0
+
+# 两次按时间淘汰之间的最短间隔（秒），淘汰随写入顺带进行
+EVICT_INTERVAL = 3600.0
+
+# 旧版情感分析缓存文件，首次打开数据库时导入
+LEGACY_CACHE_FILE = get_data_path("sentiment_cache.json")
+
+
+def make_sentiment_key(news_key: str) -> str:
+    """将新闻内容标识（标题、内容前缀与发布时间的拼接）压缩为定长的 sha256 键"""
+    return hashlib.sha256(news_key.encode("utf-8")).hexdigest()
+
+
+class SentimentStore:
+    """新闻情感得分的持久化存储
+
+    以新闻内容标识的哈希为主键存放在 src/data/sentiment.sqlite（WAL 模式）中：
+    查询走主键索引，单条写入是一次原子的 INSERT OR REPLACE，多个线程与进程可以
+    并发读写而不会互相覆盖。写入时间早于保留期限的条目随写入顺带淘汰。
+    首次打开时导入旧版 sentiment_cache.json 中的得分。
+    """
+
+    def __init__(self, path: Optional[str] = None, max_age_days: Optional[float] = None,
+                 legacy_path: Optional[str] = LEGACY_CACHE_FILE, enabled: bool = True):
+        """
+        Args:
+            path: 数据库文件路径，默认为 src/data/sentiment.sqlite
+            max_age_days: 保留天数，为 None 时读取环境变量 SENTIMENT_CACHE_MAX_AGE_DAYS，0 表示永不过期
+            legacy_path: 需要导入的旧版 JSON 缓存文件，为 None 时不导入
+            enabled: 是否启用，关闭时不读不写（如使用桩模型时）
+        """
+        if max_age_days is None:
+            max_age_days = float(getenv("SENTIMENT_CACHE_MAX_AGE_DAYS", DEFAULT_MAX_AGE_DAYS))
+        self.path = path or get_data_path("sentiment.sqlite")
+        self.max_age = max_age_days * 86400
+        self.legacy_path = legacy_path
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._conn = None
+        self._lock = threading.Lock()
+        self._last_evicted = 0.0
+
+    def _connection(self):
+        # 首次使用时才创建数据库文件
+        if self._conn is None:
+            conn = connect_sqlite(self.path)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS sentiment (
+                    key TEXT PRIMARY KEY,
+                    score REAL NOT NULL,
+                    created_at REAL NOT NULL
+                )""")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_sentiment_created ON sentiment (created_at)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+            conn.commit()
+            self._conn = conn
+            self._migrate_legacy()
+            self._evict(time.time())
+        return self._conn
+
+    def _migrate_legacy(self) -> None:
+        """导入旧版 JSON 缓存，导入完成后在 meta 表中记录，之后不再读取该文件"""
+        if not self.legacy_path or not os.path.exists(self.legacy_path):
+            return
+        conn = self._conn
+        if conn.execute("SELECT 1 FROM meta WHERE name = 'legacy_migrated'").fetchone():
+            return
+        try:
+            with open(self.legacy_path, "r", encoding="utf-8") as f:
+                legacy = json.load(f)
+        except Exception as e:
+            logger.warning(f"Failed to read legacy sentiment cache {self.legacy_path}: {e}")
+            return
+
+        # 旧文件没有逐条的写入时间，统一按文件修改时间计算保留期限
+        created_at = os.path.getmtime(self.legacy_path)
+        rows = [(make_sentiment_key(news_key), float(score), created_at)
+                for news_key, score in legacy.items()
+                if isinstance(score, (int, float))]
+        # 与其他进程的导入或新写入冲突时保留已有的得分
+        conn.executemany(
+            "INSERT OR IGNORE INTO sentiment (key, score, created_at) VALUES (?, ?, ?)", rows)
+        conn.execute(
+            "INSERT OR REPLACE INTO meta (name, value) VALUES ('legacy_migrated', ?)",
+            (self.legacy_path,))
+        conn.commit()
+        logger.info(f"Migrated {len(rows)} sentiment scores from {self.legacy_path}")
+
+    def _evict(self, now: float) -> None:
+        """删除超过保留期限的条目（调用方持有锁）"""
+        self._last_evicted = now
+        if self.max_age <= 0:
+            return
+        deleted = self._conn.execute(
+            "DELETE FROM sentiment WHERE created_at < ?", (now - self.max_age,)).rowcount
+        self._conn.commit()
+        if deleted:
+            logger.info(f"Evicted {deleted} sentiment scores older than {self.max_age / 86400:g} days")
+
+    def get(self, news_key: str) -> Optional[float]:
+        """读取新闻内容对应的情感得分，不存在或已过期时返回 None"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            try:
+                row = self._connection().execute(
+                    "SELECT score, created_at FROM sentiment WHERE key = ?",
+                    (make_sentiment_key(news_key),)).fetchone()
+            except Exception as e:
+                logger.warning(f"Failed to read sentiment store: {e}")
+                row = None
+            if row is not None and self.max_age > 0 and time.time() - row[1] >= self.max_age:
+                row = None
+            if row is None:
+                self.misses += 1
+                record_cache(False)
+                return None
+            self.hits += 1
+            record_cache(True)
+            return row[0]
+
+    def put(self, news_key: str, score: float) -> None:
+        """写入一条情感得分，并按间隔淘汰过期条目"""
+        if not self.enabled:
+            return
+        now = time.time()
+        with self._lock:
+            try:
+                conn = self._connection()
+                conn.execute(
+                    "INSERT OR REPLACE INTO sentiment (key, score, created_at) VALUES (?, ?, ?)",
+                    (make_sentiment_key(news_key), float(score), now))
+                conn.commit()
+                if now - self._last_evicted >= EVICT_INTERVAL:
+                    self._evict(now)
+            except Exception as e:
+                logger.warning(f"Failed to write sentiment store: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """命中统计与当前条目数"""
+        entries = 0
+        if self.enabled:
+            with self._lock:
+                try:
+                    entries = self._connection().execute(
+                        "SELECT COUNT(*) FROM sentiment").fetchone()[0]
+                except Exception as e:
+                    logger.warning(f"Failed to read sentiment store: {e}")
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": entries,
+        }
+
+
+# 进程内共享的情感得分存储
+sentiment_store = SentimentStore()
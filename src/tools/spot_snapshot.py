@@ -0,0 +1,131 @@
+import time
+import threading
+from typing import Any, Callable, Dict, Optional
+
+import pandas as pd
+
+from src.utils.env import getenv
+from src.utils.lazy_import import lazy_import
+from src.utils.tracing import record_cache, traced_module
+from src.utils.logging_config import setup_logger
+from src.tools.concurrency import source_slot
+
+# 设置日志记录
+logger = setup_logger('spot_snapshot')
+
+# akshare 导入较慢，首次调用时才导入；每次调用记录为追踪 span
+ak = traced_module(lazy_import("akshare"), "akshare")
+
+# 全市场实时行情快照的默认有效期（秒），可通过环境变量 SPOT_SNAPSHOT_TTL 配置
+DEFAULT_SPOT_SNAPSHOT_TTL = 60.0
+
+# 下载失败时最多继续使用多久之前的快照（秒），超过后查询返回 None，
+# 可通过环境变量 SPOT_SNAPSHOT_MAX_STALE 配置
+DEFAULT_SPOT_SNAPSHOT_MAX_STALE = 900.0
+
+# 下载失败后的冷却时间（秒），冷却期内的查询不再重试下载
+DEFAULT_SPOT_SNAPSHOT_RETRY_COOLDOWN = 10.0
+
+
+class SpotSnapshotCache:
+    """进程内共享的全市场实时行情快照缓存
+
+    ak.stock_zh_a_spot_em() 每次都会下载约 5000 行的全市场行情表，这里在有效期内
+    复用同一份快照，并按 代码 建立索引，单只股票的查询是 O(1) 的字典读取。
+    多个线程同时发现快照过期时，只有一个线程发起下载，其余线程等待并复用结果。
+    下载失败时在 max_stale 内继续使用上一份快照，并在 retry_cooldown 内不再重试。
+    """
+
+    def __init__(self, ttl: Optional[float] = None,
+                 fetcher: Optional[Callable[[], pd.DataFrame]] = None,
+                 max_stale: Optional[float] = None,
+                 retry_cooldown: float = DEFAULT_SPOT_SNAPSHOT_RETRY_COOLDOWN):
+        """
+        Args:
+            ttl: 快照有效期（秒），为 None 时读取环境变量 SPOT_SNAPSHOT_TTL
+            fetcher: 获取全市场行情的函数，默认为 ak.stock_zh_a_spot_em
+            max_stale: 快照自下载起最多可以使用多久（秒），为 None 时读取环境变量 SPOT_SNAPSHOT_MAX_STALE
+            retry_cooldown: 下载失败后的冷却时间（秒）
+        """
+        if ttl is None:
+            ttl = float(getenv("SPOT_SNAPSHOT_TTL",
+                        DEFAULT_SPOT_SNAPSHOT_TTL))
+        if max_stale is None:
+            max_stale = float(getenv("SPOT_SNAPSHOT_MAX_STALE", DEFAULT_SPOT_SNAPSHOT_MAX_STALE))
+        self.ttl = ttl
+        self.max_stale = max(ttl, max_stale)
+        self.retry_cooldown = retry_cooldown
+        self._fetcher = fetcher
+        self._index: Dict[str, Dict[str, Any]] = {}
+        self._fetched_at: Optional[float] = None
+        self._failed_at: Optional[float] = None
+        self._fetch_lock = threading.Lock()
+
+    def _age(self) -> float:
+        if self._fetched_at is None:
+            return float("inf")
+        return time.monotonic() - self._fetched_at
+
+    def _is_fresh(self) -> bool:
+        return self._age() < self.ttl
+
+    def _cooling_down(self) -> bool:
+        return self._failed_at is not None and time.monotonic() - self._failed_at < self.retry_cooldown
+
+    def _refresh(self) -> None:
+        """下载新的快照并重建索引"""
+        logger.info("Fetching real-time quotes snapshot...")
+        fetcher = self._fetcher or ak.stock_zh_a_spot_em
+        try:
+            with source_slot("eastmoney"):
+                df = fetcher()
+        except Exception as e:
+            self._failed_at = time.monotonic()
+            if not self._index:
+                raise
+            # 下载失败时在 max_stale 内继续使用上一份（已过期的）快照，冷却期后再重试
+            logger.warning(f"Failed to fetch real-time quotes, using stale snapshot: {e}")
+            return
+        if df is None or df.empty:
+            # 空快照不缓存，保留上一份快照，冷却期后再重试
+            self._failed_at = time.monotonic()
+            logger.warning("No real-time quotes data available")
+            return
+
+        records = df.to_dict('records')
+        self._index = {str(record['代码']): record for record in records}
+        self._fetched_at = time.monotonic()
+        self._failed_at = None
+        logger.info(f"✓ Real-time quotes snapshot fetched ({len(records)} records)")
+
+    def get_quote(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """获取单只股票的实时行情
+
+        Args:
+            symbol: 股票代码
+
+        Returns:
+            该股票的行情字典（键为 akshare 中文列名），快照中没有该股票、
+            或下载失败且上一份快照已超过 max_stale 时返回 None
+        """
+        fresh = self._is_fresh()
+        record_cache(fresh)
+        if not fresh:
+            with self._fetch_lock:
+                # 等待锁期间其他线程可能已经完成了下载
+                if not self._is_fresh() and not self._cooling_down():
+                    self._refresh()
+            if self._age() >= self.max_stale:
+                logger.warning(f"Real-time quotes snapshot is older than {self.max_stale:.0f}s, "
+                               f"not serving {symbol}")
+                return None
+        return self._index.get(symbol)
+
+    def invalidate(self) -> None:
+        """使当前快照失效，下次查询时重新下载"""
+        self._fetched_at = None
+        self._failed_at = None
+
+
+# 进程内共享的默认快照缓存
+spot_snapshot = SpotSnapshotCache()
@@ -0,0 +1,200 @@
+import os
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional, Tuple
+
+import pandas as pd
+
+from src.utils.env import getenv
+from src.utils.lazy_import import lazy_import
+from src.utils.tracing import record_cache, traced_module
+from src.utils.logging_config import setup_logger
+from src.tools.concurrency import KeyedLocks, source_slot
+from src.utils.storage import get_data_path, read_frame, write_frame, read_json, write_json
+
+# 设置日志记录
+logger = setup_logger('statement_cache')
+
+# akshare 导入较慢，首次调用时才导入；每次调用记录为追踪 span
+ak = traced_module(lazy_import("akshare"), "akshare")
+
+# 新浪三大报表名称到存储文件名的映射
+STATEMENT_FILES = {
+    "资产负债表": "balance_sheet",
+    "利润表": "income_statement",
+    "现金流量表": "cash_flow",
+}
+
+# 各报告期（季度末月份）对应的法定披露截止日 (年份偏移, 月, 日)
+# 一季报 4/30，半年报 8/31，三季报 10/31，年报次年 4/30
+DISCLOSURE_DEADLINES = {
+    3: (0, 4, 30),
+    6: (0, 8, 31),
+    9: (0, 10, 31),
+    12: (1, 4, 30),
+}
+
+# 披露窗口内重新检查新报告的间隔（小时），可通过环境变量 STATEMENT_RECHECK_HOURS 配置；
+# 窗口之外（已过截止日仍未披露，如延期披露）按 7 倍间隔检查
+DEFAULT_RECHECK_HOURS = 24.0
+
+
+def fetch_statement(symbol: str, statement: str) -> pd.DataFrame:
+    """从新浪获取财务报表"""
+    with source_slot("sina"):
+        return ak.stock_financial_report_sina(stock=f"sh{symbol}", symbol=statement)
+
+
+def latest_report_date(df: pd.DataFrame) -> Optional[pd.Timestamp]:
+    """获取报表中最新的报告期"""
+    if df is None or df.empty or "报告日" not in df.columns:
+        return None
+    dates = pd.to_datetime(df["报告日"].astype(str),
+                           format="%Y%m%d", errors="coerce")
+    return None if dates.isna().all() else dates.max()
+
+
+def next_report_period(report_date: pd.Timestamp) -> pd.Timestamp:
+    """获取指定报告期之后的下一个报告期（季度末）"""
+    return (report_date + pd.offsets.QuarterEnd(1)).normalize()
+
+
+def disclosure_deadline(period_end: pd.Timestamp) -> pd.Timestamp:
+    """获取报告期的法定披露截止日"""
+    year_offset, month, day = DISCLOSURE_DEADLINES[period_end.month]
+    return pd.Timestamp(year=period_end.year + year_offset, month=month, day=day)
+
+
+def needs_refresh(report_date: Optional[pd.Timestamp], fetched_at: datetime,
+                  now: datetime, recheck_hours: float = DEFAULT_RECHECK_HOURS) -> bool:
+    """判断缓存的报表是否需要重新下载
+
+    只有当下一个报告期已经结束（新报告可能已经披露）时才需要刷新：
+    披露截止日前（含 7 天宽限）按 recheck_hours 检查，之后按 7 倍间隔检查。
+
+    Args:
+        report_date: 缓存中最新的报告期，未知时为 None
+        fetched_at: 上次下载时间
+        now: 当前时间
+        recheck_hours: 披露窗口内的检查间隔（小时）
+
+    Returns:
+        是否需要刷新
+    """
+    age = now - fetched_at
+    recheck = timedelta(hours=recheck_hours)
+    if report_date is None:
+        return age >= recheck
+
+    period_end = next_report_period(report_date)
+    if now < period_end + timedelta(days=1):
+        # 下一个报告期尚未结束，不可能有新报告
+        return False
+
+    if now <= disclosure_deadline(period_end) + timedelta(days=7):
+        return age >= recheck
+    return age >= recheck * 7
+
+
+class StatementCache:
+    """按报告期缓存的新浪财务报表
+
+    缓存条目由 (股票代码, 报表类型, 最新报告期) 确定，持久化到
+    src/data/financial_statements/{symbol}/ 下，跨进程复用。只有在新的报告期可能已经
+    披露时才会重新下载；下载失败时退回使用已缓存的旧数据。
+    """
+
+    def __init__(self, root: Optional[str] = None,
+                 fetcher: Callable[[str, str], pd.DataFrame] = fetch_statement,
+                 recheck_hours: Optional[float] = None):
+        """
+        Args:
+            root: 缓存根目录，默认为 src/data/financial_statements
+            fetcher: 获取报表的函数，签名同 fetch_statement
+            recheck_hours: 披露窗口内的检查间隔，为 None 时读取环境变量 STATEMENT_RECHECK_HOURS
+        """
+        if recheck_hours is None:
+            recheck_hours = float(getenv("STATEMENT_RECHECK_HOURS",
+                                            DEFAULT_RECHECK_HOURS))
+        self.root = root or get_data_path("financial_statements")
+        self.recheck_hours = recheck_hours
+        self._fetcher = fetcher
+        # (symbol, statement) -> (报表数据, 最新报告期, 下载时间)
+        self._entries: Dict[Tuple[str, str], Tuple[pd.DataFrame, Optional[pd.Timestamp], datetime]] = {}
+        # 同一张报表并发请求时只下载一次
+        self._locks = KeyedLocks()
+
+    def _path(self, symbol: str, statement: str) -> str:
+        return os.path.join(self.root, symbol, STATEMENT_FILES.get(statement, statement))
+
+    def _load(self, symbol: str, statement: str):
+        key = (symbol, statement)
+        if key in self._entries:
+            return self._entries[key]
+
+        path = self._path(symbol, statement)
+        meta = read_json(path + ".json")
+        df = read_frame(path)
+        if meta is None or df is None:
+            return None
+
+        report_date = pd.Timestamp(meta["report_date"]) if meta.get(
+            "report_date") else None
+        entry = (df, report_date,
+                 datetime.strptime(meta["fetched_at"], "%Y-%m-%d %H:%M:%S"))
+        self._entries[key] = entry
+        return entry
+
+    def _save(self, symbol: str, statement: str, df: pd.DataFrame,
+              report_date: Optional[pd.Timestamp], fetched_at: datetime) -> None:
+        self._entries[(symbol, statement)] = (df, report_date, fetched_at)
+        path = self._path(symbol, statement)
+        try:
+            # 报表列类型混杂，使用 pickle 保存
+            write_frame(df, path, columnar=False)
+            write_json({
+                "symbol": symbol,
+                "statement": statement,
+                "report_date": report_date.strftime("%Y-%m-%d") if report_date is not None else None,
+                "fetched_at": fetched_at.strftime("%Y-%m-%d %H:%M:%S"),
+            }, path + ".json")
+        except Exception as e:
+            logger.warning(f"Failed to persist {statement} of {symbol}: {e}")
+
+    def get(self, symbol: str, statement: str) -> pd.DataFrame:
+        """获取财务报表，优先使用缓存
+
+        Args:
+            symbol: 股票代码
+            statement: 报表类型，"资产负债表"、"利润表" 或 "现金流量表"
+
+        Returns:
+            报表 DataFrame（最新报告期在前），无数据时返回空 DataFrame
+        """
+        with self._locks.get((symbol, statement)):
+            now = datetime.now()
+            entry = self._load(symbol, statement)
+
+            hit = entry is not None and not needs_refresh(entry[1], entry[2], now, self.recheck_hours)
+            record_cache(hit)
+            if hit:
+                logger.info(f"Statement cache hit: {symbol} {statement}")
+                return entry[0]
+
+            try:
+                df = self._fetcher(symbol, statement)
+            except Exception as e:
+                if entry is None:
+                    raise
+                logger.warning(
+                    f"Failed to refresh {statement} of {symbol}, using cached data: {e}")
+                return entry[0]
+
+            if df is None or df.empty:
+                return entry[0] if entry is not None else pd.DataFrame()
+
+            self._save(symbol, statement, df, latest_report_date(df), now)
+            return df
+
+
+# 进程内共享的默认报表缓存
+statement_cache = StatementCache()
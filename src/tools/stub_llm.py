@@ -0,0 +1,61 @@
+import re
+import json
+from types import SimpleNamespace
+
+from src.utils.logging_config import setup_logger
+
+# 设置日志记录
+logger = setup_logger('stub_llm')
+
+# 桩模型的固定决策：持有不动
+STUB_DECISION = {
+    "action": "hold",
+    "quantity": 0,
+    "confidence": 0.5,
+    "agent_signals": [],
+    "reasoning": "Stub LLM: no model was called.",
+}
+
+
+def stub_response_text(contents: str) -> str:
+    """根据提示词返回确定性的响应：情感分析返回中性分数（批量打分按编号返回数组），其余返回持有决策"""
+    if "情感倾向" in contents:
+        ids = re.findall(r"\[编号 (\d+)\]", contents)
+        if ids:
+            return json.dumps([{"id": int(i), "score": 0.0} for i in ids])
+        return "0.0"
+    return json.dumps(STUB_DECISION, ensure_ascii=False)
+
+
+class _StubModels:
+    def generate_content(self, model, contents, config=None):
+        return SimpleNamespace(text=stub_response_text(contents), usage_metadata=None)
+
+
+class _StubAsyncModels:
+    async def generate_content(self, model, contents, config=None):
+        return SimpleNamespace(text=stub_response_text(contents), usage_metadata=None)
+
+
+class StubGeminiClient:
+    """与 genai.Client 接口一致的本地桩客户端，用于离线测试和本地服务调试"""
+
+    def __init__(self):
+        self.models = _StubModels()
+        self.aio = SimpleNamespace(models=_StubAsyncModels())
+
+
+def install_stub_llm() -> None:
+    """让 openrouter_config 的所有调用改走桩客户端
+
+    同时关闭限速与响应缓存，避免桩响应写入持久化的 LLM 缓存和情感得分存储。
+    """
+    from src.tools import openrouter_config
+    from src.tools.rate_limiter import TokenBucketLimiter
+    from src.tools.sentiment_store import sentiment_store
+
+    openrouter_config.client = StubGeminiClient()
+    openrouter_config.rate_limiter = TokenBucketLimiter(requests_per_minute=0, tokens_per_minute=0)
+    openrouter_config.llm_cache.enabled = False
+    sentiment_store.enabled = False
+    logger.info("Stub LLM installed, Gemini will not be called")
@@ -0,0 +1,38 @@
+from langchain_core.messages import HumanMessage
+from langgraph.graph import END, StateGraph
+
+from src.agents.state import AgentState, MessageLog, get_agent_message
+
+
+def make_agent(name):
+    def agent(state):
+        return {"messages": [HumanMessage(content=f"{name} done", name=name)], "data": {}}
+    return agent
+
+
+def test_agents_append_only_their_own_messages():
+    workflow = StateGraph(AgentState)
+    for name in ("first_agent", "second_agent", "third_agent"):
+        workflow.add_node(name, make_agent(name))
+    workflow.set_entry_point("first_agent")
+    workflow.add_edge("first_agent", "second_agent")
+    workflow.add_edge("second_agent", "third_agent")
+    workflow.add_edge("third_agent", END)
+
+    final_state = workflow.compile().invoke({
+        "messages": [HumanMessage(content="start")],
+        "data": {},
+        "metadata": {},
+    })
+
+    messages = final_state["messages"]
+    assert isinstance(messages, MessageLog)
+    assert [msg.content for msg in messages] == [
+        "start", "first_agent done", "second_agent done", "third_agent done"]
+    assert get_agent_message(final_state, "second_agent").content == "second_agent done"
+    assert get_agent_message(final_state, "missing_agent") is None
+
+
+def test_lookup_falls_back_to_scanning_plain_lists():
+    state = {"messages": [HumanMessage(content="a", name="x_agent")]}
+    assert get_agent_message(state, "x_agent").content == "a"
@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+
+from src.tools.api import get_price_column, prices_to_columns, prices_to_df
+
+
+def make_prices_df():
+    return pd.DataFrame({
+        "date": pd.bdate_range("2024-01-02", periods=5),
+        "open": [10.0, 10.2, 10.1, 10.4, 10.3],
+        "high": [10.3, 10.4, 10.5, 10.6, 10.5],
+        "low": [9.9, 10.0, 10.0, 10.2, 10.1],
+        "close": [10.2, 10.1, 10.4, 10.3, 10.5],
+        "volume": [1000.0, 1200.0, 900.0, 1500.0, 1100.0],
+    })
+
+
+def test_columnar_prices_round_trip_without_copy():
+    prices_df = make_prices_df()
+    columns = prices_to_columns(prices_df)
+    assert all(isinstance(values, np.ndarray) for values in columns.values())
+
+    df = prices_to_df(columns)
+    pd.testing.assert_frame_equal(df[prices_df.columns], prices_df)
+    assert np.shares_memory(df["close"].to_numpy(), columns["close"])
+    assert get_price_column(columns, "close") is columns["close"]
+
+
+def test_legacy_records_are_still_supported():
+    prices_df = make_prices_df()
+    records = prices_df.rename(columns={"close": "收盘"}).to_dict("records")
+    np.testing.assert_array_equal(get_price_column(records, "close"), prices_df["close"].to_numpy())
@@ -0,0 +1,124 @@
+import os
+import threading
+import time
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+os.environ.setdefault("GEMINI_API_KEY", "test")
+
+from src.tools import openrouter_config  # noqa: E402
+from src.tools.llm_cache import LLMCache  # noqa: E402
+from src.tools.rate_limiter import TokenBucketLimiter  # noqa: E402
+
+
+class FakeModels:
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+
+    async def generate_content(self, model, contents, config=None):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        return SimpleNamespace(text=f"echo {contents}", usage_metadata=None)
+
+
+@pytest.fixture
+def fake_client(monkeypatch):
+    models = FakeModels()
+    monkeypatch.setattr(openrouter_config, "client", SimpleNamespace(aio=SimpleNamespace(models=models)))
+    monkeypatch.setattr(openrouter_config, "llm_cache", LLMCache(enabled=False))
+    monkeypatch.setattr(openrouter_config, "rate_limiter",
+                        TokenBucketLimiter(requests_per_minute=0, tokens_per_minute=0))
+    monkeypatch.setenv("GEMINI_MAX_CONCURRENCY", "2")
+    return models
+
+
+def test_concurrent_calls_are_bounded(fake_client):
+    async def run():
+        return await asyncio.gather(*(
+            openrouter_config.aget_chat_completion([{"role": "user", "content": str(i)}])
+            for i in range(6)))
+
+    results = asyncio.run(run())
+    assert results == [f"echo User: {i}" for i in range(6)]
+    assert fake_client.max_active == 2
+
+
+def test_cancellation_propagates(fake_client):
+    fake_client.delay = 10
+
+    async def run():
+        task = asyncio.create_task(
+            openrouter_config.aget_chat_completion([{"role": "user", "content": "hi"}]))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        await task
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(run())
+    assert fake_client.active == 0
+
+
+def test_non_rate_limit_errors_are_not_retried(fake_client, monkeypatch):
+    calls = []
+
+    def generate_content(model, contents, config=None):
+        calls.append(contents)
+        raise RuntimeError("bad request")
+
+    async def agenerate_content(model, contents, config=None):
+        return generate_content(model, contents, config)
+
+    monkeypatch.setattr(openrouter_config, "client", SimpleNamespace(
+        models=SimpleNamespace(generate_content=generate_content),
+        aio=SimpleNamespace(models=SimpleNamespace(generate_content=agenerate_content))))
+    messages = [{"role": "user", "content": "hi"}]
+
+    assert openrouter_config.get_chat_completion(messages) is None
+    assert asyncio.run(openrouter_config.aget_chat_completion(messages)) is None
+    assert len(calls) == 2
+
+
+def test_missing_api_key_fails_fast(fake_client, monkeypatch):
+    monkeypatch.setattr(openrouter_config, "client", None)
+    monkeypatch.delenv("GEMINI_API_KEY")
+    messages = [{"role": "user", "content": "hi"}]
+
+    with pytest.raises(openrouter_config.GeminiConfigError):
+        openrouter_config.get_chat_completion(messages)
+    with pytest.raises(openrouter_config.GeminiConfigError):
+        asyncio.run(openrouter_config.aget_chat_completion(messages))
+
+
+def test_cache_access_does_not_block_the_event_loop(fake_client, monkeypatch, tmp_path):
+    cache = LLMCache(path=str(tmp_path / "llm.sqlite"), max_entries=10, ttl=0, enabled=True)
+    monkeypatch.setattr(openrouter_config, "llm_cache", cache)
+    ticks = []
+
+    async def heartbeat():
+        for _ in range(5):
+            ticks.append(time.perf_counter())
+            await asyncio.sleep(0.01)
+
+    async def run():
+        return await asyncio.gather(
+            openrouter_config.aget_chat_completion([{"role": "user", "content": "hi"}]),
+            heartbeat())
+
+    # 同步调用方持有缓存锁期间，事件循环上的其他协程照常运行
+    cache._lock.acquire()
+    released = []
+    timer = threading.Timer(0.3, lambda: (released.append(time.perf_counter()), cache._lock.release()))
+    timer.start()
+    result, _ = asyncio.run(run())
+    timer.join()
+
+    assert result == "echo User: hi"
+    assert len(ticks) == 5 and ticks[-1] < released[0]
@@ -0,0 +1,101 @@
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def main_module(monkeypatch):
+    # main.py 以脚本方式运行，依赖 src 目录在 sys.path 中，导入时会替换 sys.stdout
+    monkeypatch.syspath_prepend(SRC_DIR)
+    monkeypatch.setattr(sys, "stdout", sys.stdout)
+    from src import main
+    return main
+
+
+def test_load_tickers_merges_list_and_file(main_module, tmp_path):
+    path = tmp_path / "watchlist.txt"
+    path.write_text("# 自选股\n600519\n\n000001, 300750  # 创业板\n600519\n", encoding="utf-8")
+
+    load_tickers = main_module.load_tickers
+    assert load_tickers("000001, 601318", str(path)) == ["000001", "601318", "600519", "300750"]
+    assert load_tickers("600519,,") == ["600519"]
+    assert load_tickers() == []
+
+
+def test_run_batch_writes_each_result_and_records_errors(main_module, tmp_path):
+    output = str(tmp_path / "results.jsonl")
+
+    def runner(ticker, **params):
+        if ticker == "000002":
+            raise RuntimeError("no data")
+        if ticker == "000003":
+            # 其他股票的结果在批量结束前已经写入文件
+            deadline = time.monotonic() + 5
+            while time.monotonic() < deadline:
+                with open(output, encoding="utf-8") as f:
+                    if len(f.readlines()) == 2:
+                        break
+                time.sleep(0.01)
+            else:
+                raise AssertionError("results were not written as they completed")
+        return '```json\n{"action": "buy", "quantity": 100}\n```'
+
+    records = main_module.run_batch(["000001", "000002", "000003"], "2024-01-01", "2024-03-01",
+                                    {"cash": 100000.0, "stock": 0}, output, workers=3,
+                                    runner=runner)
+
+    with open(output, encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f]
+    assert lines == records
+    assert records[-1]["ticker"] == "000003"
+    by_ticker = {record["ticker"]: record for record in records}
+    assert by_ticker["000001"]["decision"] == {"action": "buy", "quantity": 100}
+    assert by_ticker["000002"]["error"] == "no data"
+    assert "decision" in by_ticker["000003"]
+
+
+def test_run_batch_bounds_concurrency(main_module, tmp_path):
+    lock = threading.Lock()
+    active = [0, 0]
+
+    def runner(**params):
+        with lock:
+            active[0] += 1
+            active[1] = max(active[1], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        return "hold"
+
+    tickers = [f"{i:06d}" for i in range(1, 7)]
+    records = main_module.run_batch(tickers, "2024-01-01", "2024-03-01", {"cash": 0.0, "stock": 0},
+                                    str(tmp_path / "results.jsonl"), workers=2, runner=runner)
+
+    assert sorted(record["ticker"] for record in records) == tickers
+    assert active[1] == 2
+
+
+def test_prefetch_sentiment_scores_recent_news_of_all_tickers(main_module, monkeypatch):
+    from src.tools import news_crawler
+
+    now = datetime.now()
+    recent = {"title": "新", "publish_time": (now - timedelta(days=1)).strftime("%Y-%m-%d %H:%M:%S")}
+    old = {"title": "旧", "publish_time": (now - timedelta(days=30)).strftime("%Y-%m-%d %H:%M:%S")}
+    batches = []
+    monkeypatch.setattr(news_crawler, "get_stock_news", lambda ticker, max_news: [recent, old])
+    monkeypatch.setattr(news_crawler, "get_news_sentiment_batch",
+                        lambda news_by_ticker, num_of_news: batches.append(news_by_ticker))
+
+    main_module.prefetch_sentiment(["600519", "000001"], num_of_news=5, workers=2)
+    assert batches == [{"600519": [recent], "000001": [recent]}]
+
+    # 预取失败不影响批量分析，由各代理自行打分
+    monkeypatch.setattr(news_crawler, "get_stock_news", lambda ticker, max_news: 1 / 0)
+    main_module.prefetch_sentiment(["600519"], num_of_news=5)
@@ -0,0 +1,63 @@
+import pandas as pd
+
+from src.agents.risk_manager import calculate_risk_metrics
+from src.benchmarks.bench_suite import (CASES, compare, load_baseline, make_ohlcv, recorded_fixtures,
+                                        run_suite)
+from src.tools.api import add_price_indicators
+
+
+def test_suite_runs_every_case_on_each_fixture(monkeypatch):
+    monkeypatch.setattr("src.benchmarks.bench_suite.MIN_SAMPLE_SECONDS", 0.001)
+    fixtures = {"300": make_ohlcv(300), "500": make_ohlcv(500, seed=1)}
+    results = run_suite(fixtures, name_filter="calculate_macd", repeat=1)
+
+    assert set(results) == {"technicals.calculate_macd@300", "technicals.calculate_macd@500"}
+    for result in results.values():
+        assert result["ops_per_sec"] > 0
+        assert result["peak_kb"] > 0
+        assert result["machine_speed"] > 0
+
+
+def test_compare_scales_baseline_by_machine_speed():
+    baseline = {
+        "fast@1000": {"ops_per_sec": 100.0, "peak_kb": 100.0, "machine_speed": 10.0},
+        "slow@1000": {"ops_per_sec": 100.0, "peak_kb": 100.0, "machine_speed": 10.0},
+        "memory@1000": {"ops_per_sec": 100.0, "peak_kb": 100.0, "machine_speed": 10.0},
+    }
+    results = {
+        # 机器整体慢了一半，吞吐量同比下降不算退化
+        "fast@1000": {"ops_per_sec": 50.0, "peak_kb": 100.0, "machine_speed": 5.0},
+        "slow@1000": {"ops_per_sec": 20.0, "peak_kb": 100.0, "machine_speed": 10.0},
+        "memory@1000": {"ops_per_sec": 100.0, "peak_kb": 1000.0, "machine_speed": 10.0},
+        "new@1000": {"ops_per_sec": 1.0, "peak_kb": 1.0, "machine_speed": 10.0},
+    }
+
+    regressions = compare(results, baseline, tolerance=0.5)
+
+    assert len(regressions) == 2
+    assert regressions[0].startswith("slow@1000")
+    assert regressions[1].startswith("memory@1000")
+
+
+def test_extracted_metrics_match_agent_columns():
+    prices = make_ohlcv(400)
+    df = add_price_indicators(prices.copy())
+    for column in ("momentum_6m", "volatility_regime", "atr_ratio", "hurst_exponent", "kurtosis"):
+        assert column in df.columns
+    assert df["hurst_exponent"].notna().any()
+
+    metrics = calculate_risk_metrics(pd.Series(prices["close"]))
+    assert set(metrics) == {"volatility", "volatility_percentile", "var_95", "max_drawdown"}
+    assert metrics["max_drawdown"] <= 0
+
+
+def test_recorded_fixtures_are_in_the_baseline():
+    fixtures = recorded_fixtures()
+    assert fixtures
+    baseline = load_baseline()
+    for label, frame in fixtures.items():
+        assert list(frame.columns[:6]) == ["date", "open", "high", "low", "close", "volume"]
+        assert frame["date"].is_monotonic_increasing
+        for case in CASES:
+            if case.per_bars:
+                assert f"{case.name}@{label}" in baseline
@@ -0,0 +1,53 @@
+import contextvars
+import threading
+import time
+
+import pytest
+
+from src.tools.concurrency import KeyedLocks, run_concurrently, source_slot
+
+
+def test_source_slot_enforces_per_source_limit(monkeypatch):
+    monkeypatch.setenv("FETCH_LIMIT_TEST_LIMITED", "2")
+    active = {"test_limited": 0, "test_other": 0}
+    peak = dict(active)
+    lock = threading.Lock()
+
+    def fetch(source):
+        with source_slot(source):
+            with lock:
+                active[source] += 1
+                peak[source] = max(peak[source], active[source])
+            time.sleep(0.05)
+            with lock:
+                active[source] -= 1
+
+    tasks = {f"limited{i}": (lambda: fetch("test_limited")) for i in range(6)}
+    tasks.update({f"other{i}": (lambda: fetch("test_other")) for i in range(2)})
+    run_concurrently(tasks)
+
+    assert peak["test_limited"] == 2
+    # 不同数据源的名额互不占用
+    assert peak["test_other"] == 2
+
+
+def test_run_concurrently_returns_results_and_propagates_errors():
+    assert run_concurrently({"a": lambda: 1, "b": lambda: 2}) == {"a": 1, "b": 2}
+
+    def failing():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError, match="boom"):
+        run_concurrently({"ok": lambda: 1, "bad": failing})
+
+
+def test_run_concurrently_copies_caller_context():
+    var = contextvars.ContextVar("test_var", default=None)
+    var.set("caller")
+    assert run_concurrently({"a": var.get, "b": var.get}) == {"a": "caller", "b": "caller"}
+
+
+def test_keyed_locks_one_lock_per_key():
+    locks = KeyedLocks()
+    assert locks.get("600519") is locks.get("600519")
+    assert locks.get("600519") is not locks.get("000001")
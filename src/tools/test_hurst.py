@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+from src.benchmarks.bench_hurst import legacy_rolling_hurst, make_price_series
+from src.tools.api import calculate_rolling_hurst
+
+
+def log_returns_of(close: pd.Series) -> pd.Series:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.log(close / close.shift(1))
+
+
+def assert_matches_legacy(log_returns: pd.Series):
+    expected = legacy_rolling_hurst(log_returns)
+    actual = calculate_rolling_hurst(log_returns)
+    assert actual.index.equals(log_returns.index)
+    np.testing.assert_allclose(actual.to_numpy(), expected.to_numpy(),
+                               rtol=1e-9, atol=1e-12, equal_nan=True)
+
+
+def test_matches_legacy_on_random_walk():
+    assert_matches_legacy(log_returns_of(make_price_series(400, seed=1)))
+
+
+def test_matches_legacy_with_suspended_days():
+    # 连续停牌会产生零收益率，对数比值出现 ±inf / NaN
+    close = make_price_series(300, seed=7)
+    close.iloc[100:115] = close.iloc[99]
+    close.iloc[200] = close.iloc[199]
+    assert_matches_legacy(log_returns_of(close))
+
+
+def test_short_series_is_all_nan():
+    result = calculate_rolling_hurst(log_returns_of(make_price_series(50)))
+    assert result.isna().all()
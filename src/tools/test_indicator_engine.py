@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+
+from src.agents.technicals import (
+    calculate_hurst_exponent,
+    calculate_macd,
+    calculate_mean_reversion_signals,
+    calculate_momentum_signals,
+    calculate_obv,
+    calculate_stat_arb_signals,
+    calculate_trend_signals,
+    calculate_volatility_signals,
+    mean_reversion_signal_from_metrics,
+    momentum_signal_from_metrics,
+    stat_arb_signal_from_metrics,
+    trend_signal_from_metrics,
+    volatility_signal_from_metrics,
+)
+from src.tools.indicator_engine import IndicatorEngine, IndicatorEngineStore
+
+
+def make_prices(n_bars: int, seed: int = 3) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 20 * np.exp(np.cumsum(rng.normal(0, 0.02, n_bars)))
+    close[20:23] = close[19]  # 停牌
+    spread = np.abs(rng.normal(0, 0.01, n_bars)) * close
+    return pd.DataFrame({
+        "date": pd.bdate_range("2022-01-03", periods=n_bars),
+        "open": close,
+        "high": close + spread,
+        "low": close - spread,
+        "close": close,
+        "volume": rng.integers(1_000, 100_000, n_bars).astype(float),
+    })
+
+
+def engine_signals(snapshot, recent_closes):
+    return {
+        "trend": trend_signal_from_metrics(
+            snapshot["ema_8"], snapshot["ema_21"], snapshot["ema_55"], snapshot["adx"]),
+        "mean_reversion": mean_reversion_signal_from_metrics(
+            snapshot["close"], snapshot["z_score"], snapshot["bb_upper"],
+            snapshot["bb_lower"], snapshot["rsi_14"], snapshot["rsi_28"]),
+        "momentum": momentum_signal_from_metrics(
+            snapshot["momentum_1m"], snapshot["momentum_3m"], snapshot["momentum_6m"],
+            snapshot["volume_momentum"]),
+        "volatility": volatility_signal_from_metrics(
+            snapshot["historical_volatility"], snapshot["volatility_regime"],
+            snapshot["volatility_z_score"], snapshot["atr_ratio"]),
+        "stat_arb": stat_arb_signal_from_metrics(
+            calculate_hurst_exponent(recent_closes, max_lag=10),
+            snapshot["skewness"], snapshot["kurtosis"]),
+    }
+
+
+def assert_signals_equal(actual, expected):
+    assert actual["signal"] == expected["signal"]
+    np.testing.assert_allclose(actual["confidence"], expected["confidence"], rtol=1e-9)
+    for key, value in expected["metrics"].items():
+        np.testing.assert_allclose(actual["metrics"][key], value, rtol=1e-9, atol=1e-12)
+
+
+def test_engine_matches_batch_indicators():
+    for n_bars in (30, 80, 300):
+        df = make_prices(n_bars)
+        engine = IndicatorEngine()
+        engine.sync(df)
+        snapshot = engine.snapshot()
+
+        expected = {
+            "trend": calculate_trend_signals(df.copy()),
+            "mean_reversion": calculate_mean_reversion_signals(df),
+            "momentum": calculate_momentum_signals(df),
+            "volatility": calculate_volatility_signals(df),
+            "stat_arb": calculate_stat_arb_signals(df),
+        }
+        actual = engine_signals(snapshot, engine.recent_closes())
+        for name in expected:
+            assert_signals_equal(actual[name], expected[name])
+
+        macd_line, signal_line = calculate_macd(df)
+        np.testing.assert_allclose(
+            [snapshot["prev_macd"], snapshot["prev_macd_signal"], snapshot["macd"], snapshot["macd_signal"]],
+            [macd_line.iloc[-2], signal_line.iloc[-2], macd_line.iloc[-1], signal_line.iloc[-1]])
+        obv_slope = calculate_obv(df.copy()).diff().iloc[-5:].mean()
+        np.testing.assert_allclose(snapshot["obv_slope"], obv_slope)
+
+
+def test_incremental_updates_match_full_replay():
+    df = make_prices(260)
+    engine = IndicatorEngine()
+    engine.sync(df.iloc[:200])
+    for end in range(201, 261):
+        assert engine.sync(df.iloc[:end]) == 1
+
+    replayed = IndicatorEngine()
+    replayed.sync(df)
+    assert engine.snapshot() == replayed.snapshot()
+
+
+def test_checkpoint_and_rebuild(tmp_path):
+    df = make_prices(200)
+    store = IndicatorEngineStore(root=str(tmp_path))
+    first = store.snapshot("600519", df.iloc[:199])
+
+    # 新进程从检查点恢复，只处理新增的一根K线
+    restored = IndicatorEngineStore(root=str(tmp_path))
+    engine = restored._load("600519")
+    assert engine.bars == 199
+    assert engine.sync(df) == 1
+    assert engine.sync(df) == 0
+
+    # 前复权价格整体变化时重新计算
+    adjusted = df.copy()
+    adjusted[["open", "high", "low", "close"]] *= 0.9
+    assert engine.sync(adjusted) == len(adjusted)
+    assert first["close"] == df["close"].iloc[198]
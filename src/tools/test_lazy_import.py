@@ -0,0 +1,34 @@
+import os
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(
+    os.path.dirname(os.path.abspath(__file__))))
+
+
+def run_python(code: str) -> subprocess.CompletedProcess:
+    env = {k: v for k, v in os.environ.items() if k != "GEMINI_API_KEY"}
+    env["PYTHONPATH"] = PROJECT_ROOT
+    return subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, env=env,
+                          capture_output=True, text=True)
+
+
+def test_lazy_module_imports_on_first_attribute_access():
+    proc = run_python(
+        "import sys\n"
+        "from src.utils.lazy_import import lazy_import\n"
+        "colorsys = lazy_import('colorsys')\n"
+        "assert 'colorsys' not in sys.modules\n"
+        "assert colorsys.rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)\n"
+        "assert 'colorsys' in sys.modules\n")
+    assert proc.returncode == 0, proc.stderr
+
+
+def test_tools_import_without_akshare_or_gemini_client():
+    proc = run_python(
+        "import sys\n"
+        "import src.tools.api, src.tools.news_crawler, src.tools.openrouter_config as oc\n"
+        "assert 'akshare' not in sys.modules\n"
+        "assert 'google.genai' not in sys.modules\n"
+        "assert oc.client is None\n")
+    assert proc.returncode == 0, proc.stderr
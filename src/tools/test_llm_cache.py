@@ -0,0 +1,54 @@
+import os
+
+from src.tools.llm_cache import LLMCache, make_cache_key
+
+
+def test_key_covers_model_system_prompt_and_config():
+    key = make_cache_key("gemini-1.5-flash", "sys", "User: hi", {"system_instruction": "sys"})
+    assert key == make_cache_key("gemini-1.5-flash", "sys", "User: hi", {"system_instruction": "sys"})
+    assert key != make_cache_key("gemini-2.0-flash", "sys", "User: hi", {"system_instruction": "sys"})
+    assert key != make_cache_key("gemini-1.5-flash", "other", "User: hi", {"system_instruction": "sys"})
+    assert key != make_cache_key("gemini-1.5-flash", "sys", "User: hello", {"system_instruction": "sys"})
+
+
+def test_cache_persists_and_counts_hits(tmp_path):
+    path = os.path.join(tmp_path, "llm.sqlite")
+    cache = LLMCache(path=path, max_entries=10, ttl=0, enabled=True)
+    assert cache.get("a") is None
+    cache.put("a", "response", "model")
+    assert cache.get("a") == "response"
+
+    # 新进程（新实例）复用同一个数据库文件
+    reopened = LLMCache(path=path, max_entries=10, ttl=0, enabled=True)
+    assert reopened.get("a") == "response"
+    assert cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5, "entries": 1}
+
+
+def test_lru_eviction_and_ttl(tmp_path):
+    cache = LLMCache(path=os.path.join(tmp_path, "llm.sqlite"), max_entries=2, ttl=0, enabled=True)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    assert cache.get("a") == "1"  # a 变为最近访问
+    cache.put("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1" and cache.get("c") == "3"
+
+    expiring = LLMCache(path=os.path.join(tmp_path, "ttl.sqlite"), max_entries=10, ttl=1e-9, enabled=True)
+    expiring.put("a", "1")
+    assert expiring.get("a") is None
+    assert expiring.stats()["entries"] == 0
+
+
+def test_hits_do_not_write_until_next_put(tmp_path):
+    path = os.path.join(tmp_path, "llm.sqlite")
+    cache = LLMCache(path=path, max_entries=10, ttl=0, enabled=True)
+    cache.put("a", "1")
+    before = cache._connection().total_changes
+    assert cache.get("a") == "1"
+    assert cache._connection().total_changes == before
+
+    cache.put("b", "2")
+    # 下一次写入时把命中记录的访问时间一并写入
+    created_at, accessed_at = cache._connection().execute(
+        "SELECT created_at, accessed_at FROM llm_cache WHERE key = 'a'").fetchone()
+    assert accessed_at > created_at
@@ -0,0 +1,116 @@
+import threading
+import time
+
+from src.tools.news_prefetch import NewsPrefetcher
+from src.tools.news_store import NewsStore
+from src.tools.test_news_store import make_news
+
+
+class SlowFetcher:
+    """记录同时进行的拉取数，指定股票拉取失败"""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, symbol):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(0.05)
+            if symbol in self.failing:
+                raise ConnectionError("offline")
+            return [make_news(int(symbol), "2024-12-10 09:00:00")]
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+def test_run_once_is_bounded_and_isolates_failures(tmp_path):
+    fetcher = SlowFetcher(failing={"000003"})
+    store = NewsStore(root=str(tmp_path), fetcher=fetcher, refresh_seconds=3600, legacy_dir=None)
+    tickers = [f"{i:06d}" for i in range(1, 7)]
+    prefetcher = NewsPrefetcher(tickers, store=store, workers=2, jitter=0)
+
+    results = prefetcher.run_once()
+
+    assert fetcher.max_active == 2
+    assert results["000003"] is None
+    assert all(results[t] == 1 for t in tickers if t != "000003")
+
+
+def test_agent_process_reloads_prefetched_news(tmp_path):
+    def offline(symbol):
+        raise ConnectionError("offline")
+
+    # 决策进程先读取一次（此时本地没有新闻，拉取失败）
+    agent_store = NewsStore(root=str(tmp_path), fetcher=offline, refresh_seconds=3600, legacy_dir=None)
+    assert agent_store.get_news("600519", 5) == []
+
+    # 预取进程拉取并写入同一目录后，决策进程不访问网络直接读到新闻
+    daemon_store = NewsStore(root=str(tmp_path),
+                             fetcher=lambda symbol: [make_news(1, "2024-12-10 09:00:00")],
+                             refresh_seconds=3600, legacy_dir=None)
+    NewsPrefetcher(["600519"], store=daemon_store, jitter=0).run_once()
+    assert [n["title"] for n in agent_store.get_news("600519", 5)] == ["新闻1"]
+
+
+def test_resident_process_sees_news_appended_while_its_copy_is_fresh(tmp_path):
+    pages = [[make_news(1, "2024-12-10 09:00:00")],
+             [make_news(1, "2024-12-10 09:00:00"), make_news(2, "2024-12-10 10:00:00")]]
+    daemon_store = NewsStore(root=str(tmp_path), fetcher=lambda symbol: pages.pop(0),
+                             refresh_seconds=3600, legacy_dir=None)
+    agent_calls = []
+    agent_store = NewsStore(root=str(tmp_path), fetcher=lambda symbol: agent_calls.append(symbol) or [],
+                            refresh_seconds=3600, legacy_dir=None)
+    prefetcher = NewsPrefetcher(["600519"], store=daemon_store, jitter=0)
+
+    prefetcher.run_once()
+    assert [n["title"] for n in agent_store.get_news("600519", 5)] == ["新闻1"]
+
+    # 决策进程的本地历史仍在刷新间隔内，但预取进程又追加了新闻
+    time.sleep(0.01)
+    prefetcher.run_once()
+    assert [n["title"] for n in agent_store.get_news("600519", 5)] == ["新闻2", "新闻1"]
+    assert agent_calls == []
+
+
+class RecordingStore:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.started = []
+
+    def refresh(self, symbol, force=False):
+        self.started.append(time.perf_counter())
+        time.sleep(self.delay)
+        return 0
+
+
+def test_jitter_spreads_start_times_without_holding_workers():
+    store = RecordingStore()
+    tickers = [f"{i:06d}" for i in range(40)]
+    started = time.perf_counter()
+    NewsPrefetcher(tickers, store=store, workers=4, jitter=0.3).run_once()
+
+    # 开始时间分布在 [0, jitter] 内，一轮的耗时不随股票数量与线程数之比增长
+    assert len(store.started) == 40
+    assert max(store.started) - started < 0.3 + 0.2
+    assert max(store.started) - min(store.started) > 0.1
+
+
+def test_interval_is_measured_from_round_start():
+    store = RecordingStore(delay=0.3)
+    prefetcher = NewsPrefetcher(["600519"], store=store, interval=0.4, jitter=0)
+    prefetcher.start()
+    deadline = time.monotonic() + 5
+    while len(store.started) < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    prefetcher.stop()
+
+    # 每轮耗时 0.3 秒，相邻两轮的开始时间仍相隔 0.4 秒而不是 0.7 秒
+    gaps = [b - a for a, b in zip(store.started, store.started[1:])]
+    assert len(gaps) >= 2
+    assert all(gap < 0.6 for gap in gaps)
@@ -0,0 +1,130 @@
+import asyncio
+import json
+import os
+import re
+
+import pytest
+
+from src.tools import news_crawler
+from src.tools.sentiment_store import SentimentStore
+
+
+def make_news(index: int, day: int) -> dict:
+    return {
+        "title": f"新闻{index}",
+        "content": f"第{index}条新闻的内容，足够长",
+        "publish_time": f"2024-12-{day:02d} 09:30:00",
+        "source": "测试",
+        "url": f"http://example.com/{index}",
+    }
+
+
+@pytest.fixture
+def scorer(tmp_path, monkeypatch):
+    """记录每次模型调用中的新闻标题，按标题返回固定得分（批量请求返回 JSON 数组）"""
+    calls = []
+    scores = {"新闻1": 0.8, "新闻2": -0.4, "新闻3": 0.2}
+
+    def fake_completion(messages):
+        content = messages[1]["content"]
+        numbered = re.findall(r"\[编号 (\d+)\]\n标题：(\S+)\n", content)
+        if numbered:
+            calls.append([title for _, title in numbered])
+            return json.dumps([{"id": int(i), "score": scores[title]} for i, title in numbered])
+        title = next(title for title in scores if f"标题：{title}\n" in content)
+        calls.append([title])
+        return str(scores[title])
+
+    async def fake_acompletion(messages):
+        return fake_completion(messages)
+
+    monkeypatch.setattr(news_crawler, "sentiment_store",
+                        SentimentStore(path=os.path.join(tmp_path, "s.sqlite"), max_age_days=0,
+                                       legacy_path=None))
+    monkeypatch.setattr(news_crawler, "get_chat_completion", fake_completion)
+    monkeypatch.setattr(news_crawler, "aget_chat_completion", fake_acompletion)
+    return calls
+
+
+def test_only_new_articles_are_scored(scorer):
+    yesterday = [make_news(1, 10), make_news(2, 10)]
+    # 冷缓存时所有新闻在一个请求中打分
+    news_crawler.get_news_sentiment(yesterday, num_of_news=2)
+    assert scorer == [["新闻1", "新闻2"]]
+
+    # 新增一条新闻后整组缓存失效，但已打分的新闻直接复用
+    today = [make_news(3, 11)] + yesterday
+    news_crawler.get_news_sentiment(today, num_of_news=3)
+    assert scorer[1:] == [["新闻3"]]
+
+    # 整组相同时使用缓存的汇总结果
+    assert asyncio.run(news_crawler.aget_news_sentiment(today, num_of_news=3)) == \
+        news_crawler.get_news_sentiment(today, num_of_news=3)
+    assert len(scorer) == 2
+
+
+def test_async_scores_uncached_articles_in_one_request(scorer):
+    news_list = [make_news(3, 11), make_news(1, 10), make_news(2, 10)]
+    score = asyncio.run(news_crawler.aget_news_sentiment(news_list, num_of_news=3))
+    assert scorer == [["新闻3", "新闻1", "新闻2"]]
+    assert score == pytest.approx(news_crawler.aggregate_article_scores(
+        list(zip(news_list, [0.2, 0.8, -0.4]))))
+
+
+def test_scores_are_recency_weighted():
+    scored = [(make_news(1, 11), 1.0), (make_news(2, 8), -1.0)]
+    # 三天前的新闻权重减半：(1 - 0.5) / 1.5
+    assert news_crawler.aggregate_article_scores(scored, half_life_days=3) == pytest.approx(1 / 3)
+    assert news_crawler.aggregate_article_scores([]) == 0.0
+
+
+def test_batch_scores_many_tickers_in_few_requests(tmp_path, monkeypatch):
+    prompts = []
+
+    def fake_completion(messages):
+        content = messages[1]["content"]
+        prompts.append(content)
+        ids = [int(i) for i in re.findall(r"\[编号 (\d+)\]", content)]
+        if not ids:
+            return "0.5"  # 单条重试
+        # 第一条新闻返回格式不正确的得分，需要单独重试
+        items = [{"id": i, "score": "bad" if i == 1 else -0.2} for i in ids]
+        return "```json\n" + json.dumps(items) + "\n```"
+
+    monkeypatch.setattr(news_crawler, "sentiment_store",
+                        SentimentStore(path=os.path.join(tmp_path, "s.sqlite"), max_age_days=0,
+                                       legacy_path=None))
+    monkeypatch.setattr(news_crawler, "get_chat_completion", fake_completion)
+
+    news_by_ticker = {
+        "000001": [make_news(1, 10), make_news(2, 10)],
+        "000002": [make_news(3, 10), make_news(2, 10)],  # 与 000001 共享一条新闻
+        "000003": [],
+    }
+    results = news_crawler.get_news_sentiment_batch(news_by_ticker, num_of_news=2)
+
+    # 三条不同的新闻装入一个批量请求，外加一次单条重试
+    assert len(prompts) == 2
+    assert results["000001"] == pytest.approx((0.5 - 0.2) / 2)
+    assert results["000002"] == pytest.approx(-0.2)
+    assert results["000003"] == 0.0
+
+    # 之后逐只股票分析时直接命中缓存
+    assert news_crawler.get_news_sentiment(news_by_ticker["000002"], num_of_news=2) == pytest.approx(-0.2)
+    assert len(prompts) == 2
+
+
+def test_batches_respect_token_budget():
+    articles = [make_news(i, 10) for i in range(6)]
+    batches = news_crawler._pack_batches(articles, token_budget=20)
+    assert sum(len(batch) for batch in batches) == 6
+    assert 1 < len(batches) < 6
+
+
+def test_single_and_batch_prompts_have_matching_contracts():
+    single_system, _ = news_crawler._sentiment_messages([make_news(1, 10)], 1)
+    batch_system, _ = news_crawler._batch_sentiment_messages([make_news(1, 10), make_news(2, 10)])
+    for system in (single_system, batch_system):
+        assert news_crawler.SENTIMENT_SCALE in system["content"]
+    assert "JSON" in batch_system["content"] and "JSON" not in single_system["content"]
+    assert "一个数字" in single_system["content"]
@@ -0,0 +1,95 @@
+import json
+import os
+
+import pandas as pd
+
+from src.tools import news_store as news_store_module
+from src.tools.news_store import NewsStore, fetch_stock_news
+
+
+def make_news(index: int, publish_time: str) -> dict:
+    return {
+        "title": f"新闻{index}",
+        "content": f"第{index}条新闻的内容，足够长",
+        "publish_time": publish_time,
+        "source": "测试",
+        "url": f"http://example.com/{index}",
+        "keyword": "",
+    }
+
+
+class FakeFetcher:
+    def __init__(self, pages):
+        self.pages = pages
+        self.calls = 0
+
+    def __call__(self, symbol):
+        page = self.pages[min(self.calls, len(self.pages) - 1)]
+        self.calls += 1
+        return list(page)
+
+
+def test_appends_only_news_after_watermark(tmp_path):
+    day1 = [make_news(1, "2024-12-10 09:00:00"), make_news(2, "2024-12-10 10:00:00")]
+    # 第二次拉取包含旧新闻、与水位线同一时刻的新新闻和更晚的新闻
+    day2 = day1 + [make_news(3, "2024-12-10 10:00:00"), make_news(4, "2024-12-11 09:00:00")]
+    fetcher = FakeFetcher([day1, day2])
+    store = NewsStore(root=str(tmp_path), fetcher=fetcher, refresh_seconds=3600, legacy_dir=None)
+
+    assert [n["title"] for n in store.get_news("600519", 5)] == ["新闻2", "新闻1"]
+    # 刷新间隔内任意条数都从本地历史中截取
+    assert [n["title"] for n in store.get_news("600519", 1)] == ["新闻2"]
+    assert fetcher.calls == 1
+
+    assert store.refresh("600519", force=True) == 2
+    assert [n["title"] for n in store.get_news("600519", 10)] == ["新闻4", "新闻3", "新闻2", "新闻1"]
+
+    with open(os.path.join(tmp_path, "600519.jsonl"), encoding="utf-8") as f:
+        assert len(f.readlines()) == 4
+    with open(os.path.join(tmp_path, "600519.json"), encoding="utf-8") as f:
+        assert json.load(f)["watermark"]["publish_time"] == "2024-12-11 09:00:00"
+
+    # 新实例（新进程）从磁盘加载，不需要重新拉取
+    reopened = NewsStore(root=str(tmp_path), fetcher=fetcher, refresh_seconds=3600, legacy_dir=None)
+    assert len(reopened.get_news("600519", 10)) == 4
+    assert fetcher.calls == 2
+
+
+def test_imports_legacy_cache(tmp_path):
+    legacy_dir = os.path.join(tmp_path, "stock_news")
+    os.makedirs(legacy_dir)
+    with open(os.path.join(legacy_dir, "000001_news.json"), "w", encoding="utf-8") as f:
+        json.dump({"date": "2024-12-10", "news": [make_news(2, "2024-12-10 10:00:00"),
+                                                   make_news(1, "2024-12-10 09:00:00")]}, f)
+
+    def failing_fetcher(symbol):
+        raise ConnectionError("offline")
+
+    store = NewsStore(root=os.path.join(tmp_path, "store"), fetcher=failing_fetcher,
+                      refresh_seconds=3600, legacy_dir=legacy_dir)
+    # 拉取失败时使用导入的历史
+    assert [n["title"] for n in store.get_news("000001", 5)] == ["新闻2", "新闻1"]
+
+
+def test_fetch_converts_akshare_frame(monkeypatch):
+    frame = pd.DataFrame({
+        "关键词": ["600519", None],
+        "新闻标题": [" 茅台发布年度业绩预告 ", "短"],
+        "新闻内容": [None, "短"],
+        "发布时间": ["2024-12-10 09:00:00", "2024-12-10 10:00:00"],
+        "文章来源": ["证券时报", "来源"],
+        "新闻链接": ["http://example.com/a", "http://example.com/b"],
+    })
+    monkeypatch.setattr(news_store_module, "ak",
+                        type("FakeAk", (), {"stock_news_em": staticmethod(lambda symbol: frame)}))
+
+    news = fetch_stock_news("600519")
+    # 没有正文时用标题代替，内容过短的新闻被跳过
+    assert news == [{
+        "title": "茅台发布年度业绩预告",
+        "content": "茅台发布年度业绩预告",
+        "publish_time": "2024-12-10 09:00:00",
+        "source": "证券时报",
+        "url": "http://example.com/a",
+        "keyword": "600519",
+    }]
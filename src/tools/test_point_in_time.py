@@ -0,0 +1,89 @@
+import pandas as pd
+
+from src.tools import api
+from src.tools.point_in_time import PointInTimeProvider, current_time, get_active_provider, use_point_in_time
+
+
+class FakePrices:
+    def get_bars(self, symbol, start_date, end_date, adjust="qfq"):
+        dates = pd.bdate_range("2024-01-01", "2024-03-29")
+        close = [10.0 + i * 0.1 for i in range(len(dates))]
+        return pd.DataFrame({
+            "date": dates, "open": close, "high": [c + 0.2 for c in close],
+            "low": [c - 0.2 for c in close], "close": close,
+            "volume": [1000.0 + i for i in range(len(dates))],
+        })
+
+
+class FakeStatements:
+    def get(self, symbol, statement):
+        return pd.DataFrame({
+            "报告日": ["20231231", "20230930"],
+            "公告日期": ["2024-03-20", None],
+            "营业收入": [400.0, 300.0],
+        })
+
+
+class FakeQuotes:
+    def get_quote(self, symbol):
+        return {"代码": symbol, "最新价": 20.0, "总市值": 2.0e10, "流通市值": 1.0e10,
+                "市盈率-动态": 20.0, "市净率": 4.0, "成交量": 1.0, "52周最高": 30.0, "52周最低": 5.0}
+
+
+def fake_indicators(symbol, start_year):
+    return pd.DataFrame({"日期": ["2023-09-30", "2023-12-31"], "净资产收益率(%)": [10.0, 12.0]})
+
+
+def fake_news(symbol, max_news):
+    return [{"title": "b", "publish_time": "2024-02-15 09:00:00"},
+            {"title": "a", "publish_time": "2024-01-10 15:30:00"}]
+
+
+def make_provider():
+    return PointInTimeProvider("600519", "2024-01-15", "2024-03-29",
+                               prices=FakePrices(), statements=FakeStatements(), quotes=FakeQuotes(),
+                               indicator_fetcher=fake_indicators, news_fetcher=fake_news).load()
+
+
+def test_views_only_expose_data_available_at_as_of():
+    provider = make_provider()
+    provider.set_as_of("2024-01-10")
+
+    bars = provider.get_bars("2024-01-01", "2024-03-29")
+    assert bars["date"].max() == pd.Timestamp("2024-01-10")
+
+    # 三季报按披露截止日 10/31 可见，年报按公告日期 3/20 可见
+    assert provider.get_statement("利润表")["报告日"].tolist() == ["20230930"]
+    assert len(provider.get_financial_indicators()) == 1
+    assert [n["title"] for n in provider.get_news(10)] == ["a"]
+
+    provider.set_as_of("2024-03-20")
+    assert provider.get_statement("利润表")["报告日"].tolist() == ["20231231", "20230930"]
+    assert len(provider.get_news(10)) == 2
+
+
+def test_quote_is_scaled_to_as_of_close():
+    provider = make_provider()
+    provider.set_as_of("2024-01-10")
+    close = float(provider.get_bars("2024-01-01", "2024-01-10")["close"].iloc[-1])
+
+    quote = provider.get_quote()
+    ratio = close / 20.0
+    assert quote["最新价"] == close
+    assert quote["总市值"] == 2.0e10 * ratio
+    assert quote["市盈率-动态"] == 20.0 * ratio
+    assert quote["52周最高"] == close + 0.2
+
+
+def test_api_uses_active_provider():
+    provider = make_provider()
+    provider.set_as_of("2024-01-10")
+    assert get_active_provider("600519") is None
+
+    with use_point_in_time(provider):
+        assert get_active_provider("000001") is None
+        assert current_time("600519").date() == pd.Timestamp("2024-01-10").date()
+        market_data = api.get_market_data("600519")
+        assert market_data["market_cap"] == provider.get_quote()["总市值"]
+
+    assert get_active_provider("600519") is None
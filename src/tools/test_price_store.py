@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from src.tools.price_store import PriceStore, asof_price_lookup
+
+
+class FakeFetcher:
+    """模拟 akshare 行情接口，记录每次请求的区间"""
+
+    def __init__(self, bias=0.0):
+        self.calls = []
+        self.bias = bias
+
+    def __call__(self, symbol, start_date, end_date, adjust):
+        self.calls.append((start_date.date(), end_date.date()))
+        dates = pd.bdate_range(start_date, end_date)
+        close = [10.0 + self.bias + (d - pd.Timestamp("2020-01-01")).days * 0.01
+                 for d in dates]
+        return pd.DataFrame({
+            "date": dates,
+            "open": close,
+            "high": close,
+            "low": close,
+            "close": close,
+            "volume": [1000.0] * len(dates),
+        })
+
+
+def test_second_read_is_served_locally(tmp_path):
+    fetcher = FakeFetcher()
+    store = PriceStore(root=str(tmp_path), fetcher=fetcher)
+    start, end = datetime(2023, 1, 2), datetime(2023, 6, 30)
+
+    first = store.get_bars("600519", start, end)
+    second = store.get_bars("600519", start + timedelta(days=7), end)
+
+    assert len(fetcher.calls) == 1
+    assert second["date"].iloc[0] == pd.Timestamp("2023-01-09")
+    assert second["date"].iloc[-1] == first["date"].iloc[-1]
+
+    # 新实例从磁盘加载，不再访问网络
+    reloaded = PriceStore(root=str(tmp_path), fetcher=fetcher)
+    pd.testing.assert_frame_equal(reloaded.get_bars("600519", start, end), first)
+    assert len(fetcher.calls) == 1
+
+
+def test_only_missing_ranges_are_fetched(tmp_path):
+    fetcher = FakeFetcher()
+    store = PriceStore(root=str(tmp_path), fetcher=fetcher)
+    store.get_bars("600519", datetime(2023, 3, 1), datetime(2023, 3, 31), adjust="")
+
+    df = store.get_bars("600519", datetime(2023, 2, 1), datetime(2023, 4, 30), adjust="")
+
+    assert fetcher.calls[1:] == [
+        (datetime(2023, 2, 1).date(), datetime(2023, 2, 28).date()),
+        (datetime(2023, 4, 1).date(), datetime(2023, 4, 30).date()),
+    ]
+    assert df["date"].is_monotonic_increasing
+    assert not df["date"].duplicated().any()
+    assert len(df) == len(pd.bdate_range("2023-02-01", "2023-04-30"))
+
+
+def test_readjusted_prices_trigger_full_refetch(tmp_path):
+    fetcher = FakeFetcher()
+    store = PriceStore(root=str(tmp_path), fetcher=fetcher)
+    store.get_bars("600519", datetime(2023, 3, 1), datetime(2023, 3, 31), adjust="qfq")
+
+    # 模拟除权后前复权价格整体变化
+    fetcher.bias = -1.0
+    df = store.get_bars("600519", datetime(2023, 3, 1), datetime(2023, 4, 30), adjust="qfq")
+
+    assert fetcher.calls[-1] == (datetime(2023, 3, 1).date(), datetime(2023, 4, 30).date())
+    assert df["close"].iloc[0] == FakeFetcher(bias=-1.0)(
+        "600519", datetime(2023, 3, 1), datetime(2023, 3, 1), "qfq")["close"].iloc[0]
+
+
+def test_asof_price_lookup_forward_fills_within_tolerance():
+    bars = pd.DataFrame({
+        "date": pd.to_datetime(["2024-01-02", "2024-01-03", "2024-01-05"]),
+        "open": [10.0, 11.0, 12.0],
+    })
+    dates = pd.to_datetime(["2024-01-02", "2024-01-04", "2024-01-05", "2024-01-08", "2024-03-01"])
+    prices = asof_price_lookup(bars, dates, tolerance_days=30)
+    assert prices == {
+        pd.Timestamp("2024-01-02"): 10.0,
+        pd.Timestamp("2024-01-04"): 11.0,
+        pd.Timestamp("2024-01-05"): 12.0,
+        pd.Timestamp("2024-01-08"): 12.0,
+    }
@@ -0,0 +1,48 @@
+import asyncio
+
+from src.tools.rate_limiter import TokenBucketLimiter, is_rate_limit_error
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_requests_are_paced_to_the_quota():
+    clock = FakeClock()
+    limiter = TokenBucketLimiter(requests_per_minute=60, tokens_per_minute=0, clock=clock)
+    # 一个请求的突发额度，之后按每秒一个预约
+    assert [limiter.reserve() for _ in range(4)] == [0.0, 1.0, 2.0, 3.0]
+    clock.now = 10.0
+    assert limiter.reserve() == 0.0
+
+
+def test_token_budget_and_adjustment():
+    clock = FakeClock()
+    limiter = TokenBucketLimiter(requests_per_minute=0, tokens_per_minute=600, burst_seconds=10, clock=clock)
+    assert limiter.reserve(100) == 0.0
+    assert limiter.reserve(100) == 10.0  # 每秒补充 10 个 token
+    limiter.adjust(-100)  # 实际用量少于预估，退还额度
+    assert limiter.reserve(100) == 10.0
+
+
+def test_penalize_blocks_all_callers():
+    clock = FakeClock()
+    limiter = TokenBucketLimiter(requests_per_minute=600, tokens_per_minute=0, burst_seconds=60, clock=clock)
+    limiter.penalize(5)
+    assert limiter.reserve() == 5.0
+    assert is_rate_limit_error(Exception("429 RESOURCE_EXHAUSTED"))
+    assert not is_rate_limit_error(Exception("invalid argument"))
+
+
+def test_async_acquire_does_not_block_event_loop():
+    limiter = TokenBucketLimiter(requests_per_minute=1200, tokens_per_minute=0)
+
+    async def run():
+        return await asyncio.gather(*(limiter.acquire_async() for _ in range(3)))
+
+    waits = asyncio.run(run())
+    assert sorted(round(w, 2) for w in waits) == [0.0, 0.05, 0.1]
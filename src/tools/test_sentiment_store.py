@@ -0,0 +1,63 @@
+import json
+import os
+import threading
+import time
+
+from src.tools.sentiment_store import SentimentStore, make_sentiment_key
+
+
+def test_scores_persist_across_instances(tmp_path):
+    path = os.path.join(tmp_path, "sentiment.sqlite")
+    store = SentimentStore(path=path, max_age_days=0, legacy_path=None)
+    news_key = "标题|内容" * 200
+    assert store.get(news_key) is None
+    store.put(news_key, 0.6)
+    assert store.get(news_key) == 0.6
+    assert len(make_sentiment_key(news_key)) == 64
+
+    reopened = SentimentStore(path=path, max_age_days=0, legacy_path=None)
+    assert reopened.get(news_key) == 0.6
+    assert store.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5, "entries": 1}
+
+
+def test_concurrent_writers_do_not_lose_updates(tmp_path):
+    path = os.path.join(tmp_path, "sentiment.sqlite")
+    # 每个线程使用独立的实例（连接），模拟多个进程同时写入
+    stores = [SentimentStore(path=path, max_age_days=0, legacy_path=None) for _ in range(4)]
+
+    def write(index, store):
+        for i in range(25):
+            store.put(f"news-{index}-{i}", i / 100)
+
+    threads = [threading.Thread(target=write, args=(index, store)) for index, store in enumerate(stores)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert SentimentStore(path=path, max_age_days=0, legacy_path=None).stats()["entries"] == 100
+
+
+def test_migrates_legacy_json_once_and_evicts_by_age(tmp_path):
+    legacy_path = os.path.join(tmp_path, "sentiment_cache.json")
+    with open(legacy_path, "w", encoding="utf-8") as f:
+        json.dump({"old news": -0.4, "recent news": 0.3}, f)
+    path = os.path.join(tmp_path, "sentiment.sqlite")
+    store = SentimentStore(path=path, max_age_days=0, legacy_path=legacy_path)
+    assert store.get("old news") == -0.4
+    assert store.get("recent news") == 0.3
+
+    # 已导入过的旧文件不再重复读取
+    with open(legacy_path, "w", encoding="utf-8") as f:
+        json.dump({"added later": 1.0}, f)
+    assert SentimentStore(path=path, max_age_days=0, legacy_path=legacy_path).get("added later") is None
+
+    expiring = SentimentStore(path=os.path.join(tmp_path, "ttl.sqlite"), max_age_days=1, legacy_path=None)
+    expiring.put("stale", 0.1)
+    expiring._conn.execute("UPDATE sentiment SET created_at = ?", (time.time() - 2 * 86400,))
+    expiring._conn.commit()
+    assert expiring.get("stale") is None
+    expiring.put("fresh", 0.2)
+    expiring._last_evicted = 0.0
+    expiring.put("fresh", 0.2)
+    assert expiring.stats()["entries"] == 1
@@ -0,0 +1,66 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from src.server import DecisionServer, parse_run_request
+from src.tools.stub_llm import stub_response_text
+
+
+@pytest.fixture
+def server():
+    calls = []
+
+    def runner(**params):
+        calls.append(params)
+        return stub_response_text("portfolio decision")
+
+    server = DecisionServer(("127.0.0.1", 0), runner=runner)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.calls = calls
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def request(server, path, body=None):
+    url = f"http://127.0.0.1:{server.server_address[1]}{path}"
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, data=data), timeout=5) as resp:
+            return resp.status, json.loads(resp.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_run_health_and_stats(server):
+    assert request(server, "/health") == (200, {"status": "ok"})
+
+    status, payload = request(server, "/run", {
+        "ticker": "600519", "start_date": "2024-01-02", "end_date": "2024-06-28",
+        "portfolio": {"cash": 50000, "stock": 100}})
+    assert status == 200
+    assert payload["decision"]["action"] == "hold"
+    assert server.calls[0]["portfolio"] == {"cash": 50000.0, "stock": 100}
+    assert server.calls[0]["num_of_news"] == 5
+
+    status, payload = request(server, "/run", {"ticker": "abc"})
+    assert status == 400
+
+    status, stats = request(server, "/stats")
+    assert status == 200
+    assert stats["requests"] == 2 and stats["errors"] == 1
+    assert "hits" in stats["llm_cache"]
+
+
+def test_parse_run_request_defaults_and_validation():
+    params = parse_run_request({"ticker": "000001"})
+    assert params["show_reasoning"] is False
+    assert params["start_date"] < params["end_date"]
+    with pytest.raises(ValueError):
+        parse_run_request({"ticker": "000001", "start_date": "2025-01-02", "end_date": "2024-01-02"})
+    with pytest.raises(ValueError):
+        parse_run_request({"ticker": "000001", "num_of_news": 0})
@@ -0,0 +1,88 @@
+import threading
+import time
+
+import pandas as pd
+
+from src.tools.spot_snapshot import SpotSnapshotCache
+
+
+def make_fetcher(calls):
+    def fetcher():
+        calls.append(time.monotonic())
+        time.sleep(0.05)  # 模拟网络延迟，让并发请求重叠
+        return pd.DataFrame({
+            "代码": ["600519", "000001"],
+            "总市值": [2.0e12, 2.5e11],
+        })
+    return fetcher
+
+
+def test_concurrent_callers_share_one_fetch():
+    calls = []
+    cache = SpotSnapshotCache(ttl=60, fetcher=make_fetcher(calls))
+    results = []
+
+    threads = [threading.Thread(target=lambda: results.append(cache.get_quote("600519")))
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert all(r["总市值"] == 2.0e12 for r in results)
+    assert cache.get_quote("000001")["总市值"] == 2.5e11
+    assert cache.get_quote("300750") is None
+    assert len(calls) == 1
+
+
+def test_snapshot_expires_after_ttl():
+    calls = []
+    cache = SpotSnapshotCache(ttl=0, fetcher=make_fetcher(calls))
+    cache.get_quote("600519")
+    cache.get_quote("600519")
+    assert len(calls) == 2
+
+
+def test_failed_refresh_keeps_stale_snapshot():
+    calls = []
+    good = make_fetcher(calls)
+
+    def offline():
+        calls.append(None)
+        raise ConnectionError("offline")
+
+    fetchers = iter([good, lambda: pd.DataFrame(), offline, good])
+    cache = SpotSnapshotCache(ttl=0, fetcher=lambda: next(fetchers)(), max_stale=60, retry_cooldown=0)
+
+    assert cache.get_quote("600519")["总市值"] == 2.0e12
+    # 空快照和下载失败都保留上一份快照
+    assert cache.get_quote("600519")["总市值"] == 2.0e12
+    assert cache.get_quote("000001")["总市值"] == 2.5e11
+    # 过期快照不会被当作新鲜的，下次查询继续重试
+    cache.get_quote("600519")
+    assert len(calls) == 3
+
+
+def test_failed_refresh_cools_down_and_stops_serving_old_snapshots():
+    calls = []
+    good = make_fetcher(calls)
+
+    def offline():
+        calls.append(None)
+        raise ConnectionError("offline")
+
+    fetchers = iter([good, offline, offline])
+    cache = SpotSnapshotCache(ttl=0, fetcher=lambda: next(fetchers)(), max_stale=0.5,
+                              retry_cooldown=0.3)
+
+    assert cache.get_quote("600519") is not None
+    assert cache.get_quote("600519") is not None
+    # 冷却期内不再重试下载
+    assert cache.get_quote("600519") is not None
+    assert len(calls) == 2
+
+    # 冷却期后重试，仍然失败且快照已超过 max_stale，不再返回旧数据
+    time.sleep(0.5)
+    assert cache.get_quote("600519") is None
+    assert len(calls) == 3
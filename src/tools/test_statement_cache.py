@@ -0,0 +1,37 @@
+from datetime import datetime
+
+import pandas as pd
+
+from src.tools.statement_cache import StatementCache, needs_refresh
+
+
+def test_no_refresh_before_next_period_ends():
+    report_date = pd.Timestamp("2024-09-30")
+    fetched_at = datetime(2024, 11, 1)
+    assert not needs_refresh(report_date, fetched_at, datetime(2024, 12, 31))
+    # 年报披露窗口内每天检查一次
+    assert not needs_refresh(report_date, datetime(2025, 3, 1, 8), datetime(2025, 3, 1, 20))
+    assert needs_refresh(report_date, datetime(2025, 3, 1, 8), datetime(2025, 3, 2, 9))
+    # 截止日之后放宽为每周检查
+    assert not needs_refresh(report_date, datetime(2025, 6, 1), datetime(2025, 6, 5))
+    assert needs_refresh(report_date, datetime(2025, 6, 1), datetime(2025, 6, 9))
+
+
+def test_statements_are_shared_across_instances(tmp_path):
+    calls = []
+
+    def fetcher(symbol, statement):
+        calls.append((symbol, statement))
+        return pd.DataFrame({
+            "报告日": [datetime.now().strftime("%Y%m%d"), "20200331"],
+            "净利润": [1.0, 2.0],
+        })
+
+    cache = StatementCache(root=str(tmp_path), fetcher=fetcher)
+    first = cache.get("600519", "利润表")
+    cache.get("600519", "利润表")
+    assert calls == [("600519", "利润表")]
+
+    other_process = StatementCache(root=str(tmp_path), fetcher=fetcher)
+    pd.testing.assert_frame_equal(other_process.get("600519", "利润表"), first)
+    assert calls == [("600519", "利润表")]
@@ -0,0 +1,60 @@
+import pandas as pd
+
+from src.agents.technicals import (
+    calculate_mean_reversion_signals,
+    calculate_momentum_signals,
+    calculate_obv,
+    calculate_stat_arb_signals,
+    calculate_trend_signals,
+    calculate_volatility_signals,
+)
+from src.benchmarks.bench_obv import legacy_calculate_obv, make_prices
+from src.tools.price_features import PriceFeatures
+
+STRATEGIES = [
+    calculate_trend_signals,
+    calculate_mean_reversion_signals,
+    calculate_momentum_signals,
+    calculate_volatility_signals,
+    calculate_stat_arb_signals,
+]
+
+
+def test_obv_matches_loop_implementation():
+    prices_df = make_prices(500)
+    expected = legacy_calculate_obv(prices_df.copy())
+    pd.testing.assert_series_equal(calculate_obv(prices_df), expected, check_dtype=False)
+
+
+def test_obv_does_not_mutate_input():
+    prices_df = make_prices(50)
+    columns = list(prices_df.columns)
+    calculate_obv(prices_df)
+    assert list(prices_df.columns) == columns
+
+
+class CountingFeatures(PriceFeatures):
+    def __init__(self, prices_df):
+        super().__init__(prices_df)
+        self.computed = []
+
+    def _memo(self, key, compute):
+        def counted():
+            self.computed.append(key)
+            return compute()
+        return super()._memo(key, counted)
+
+
+def test_strategies_share_intermediates_without_mutating_prices():
+    prices_df = make_prices(300)
+    prices_df["high"] = prices_df["close"] * 1.01
+    prices_df["low"] = prices_df["close"] * 0.99
+    original = prices_df.copy()
+
+    features = CountingFeatures(prices_df)
+    shared = [strategy(features) for strategy in STRATEGIES]
+    assert len(features.computed) == len(set(features.computed))
+    assert ("returns",) in features.computed and ("true_range",) in features.computed
+
+    pd.testing.assert_frame_equal(prices_df, original)
+    assert shared == [strategy(prices_df) for strategy in STRATEGIES]
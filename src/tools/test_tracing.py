@@ -0,0 +1,63 @@
+import json
+import os
+from types import SimpleNamespace
+
+import pandas as pd
+
+from src.tools.concurrency import run_concurrently
+from src.utils.tracing import record_cache, span, trace_run, traced, traced_module
+
+
+def test_nested_spans_record_parent_cache_and_bytes(tmp_path):
+    fake_ak = SimpleNamespace(stock_zh_a_hist=lambda **kwargs: pd.DataFrame({"close": [1.0] * 100}))
+    ak = traced_module(fake_ak, "akshare")
+
+    @traced("agent", kind="agent")
+    def agent():
+        record_cache(True)
+        record_cache(False)
+        return ak.stock_zh_a_hist(symbol="600519")
+
+    path = os.path.join(tmp_path, "trace.jsonl")
+    with trace_run(path, show_summary=False) as trace:
+        with span("run", kind="run", ticker="600519"):
+            agent()
+            agent()
+
+    spans = {s.name: s for s in trace.spans}
+    assert len(trace.spans) == 5
+    assert spans["agent"].parent_id == spans["run"].span_id
+    assert spans["akshare.stock_zh_a_hist"].parent_id == spans["agent"].span_id
+    assert spans["akshare.stock_zh_a_hist"].bytes >= 800
+    assert (spans["agent"].cache_hits, spans["agent"].cache_misses) == (1, 1)
+    assert spans["run"].attrs == {"ticker": "600519"}
+
+    lines = [json.loads(line) for line in open(path, encoding="utf-8")]
+    assert [line["name"] for line in lines][0] == "run"
+
+    summary = trace.summary().splitlines()
+    assert summary[1].startswith("run")
+    assert summary[2].startswith("  agent") and " 2 " in summary[2]
+    assert summary[3].startswith("    akshare.stock_zh_a_hist")
+
+
+def test_spans_are_free_when_tracing_is_off():
+    with span("ignored") as current:
+        assert current is None
+    assert traced_module(SimpleNamespace(f=lambda: 1), "m").f() == 1
+
+
+def test_spans_nest_across_run_concurrently():
+    ak = traced_module(SimpleNamespace(stock_zh_a_hist=lambda: None, stock_news_em=lambda: None), "akshare")
+
+    @traced("market_data_agent", kind="agent")
+    def agent():
+        run_concurrently({"prices": ak.stock_zh_a_hist, "news": ak.stock_news_em})
+
+    with trace_run(show_summary=False) as trace:
+        agent()
+
+    spans = {s.name: s for s in trace.spans}
+    agent_id = spans["market_data_agent"].span_id
+    assert spans["akshare.stock_zh_a_hist"].parent_id == agent_id
+    assert spans["akshare.stock_news_em"].parent_id == agent_id
@@ -0,0 +1,13 @@
+import json
+from typing import Any
+
+
+def parse_decision(result: Any) -> Any:
+    """Parse the portfolio manager's JSON decision, falling back to the raw text."""
+    if not isinstance(result, str):
+        return result
+    text = result.replace("```json", "").replace("```", "").strip()
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return text
@@ -0,0 +1,39 @@
+import os
+import threading
+from typing import Optional
+
+from src.utils.logging_config import setup_logger, SUCCESS_ICON, ERROR_ICON
+
+# 设置日志记录
+logger = setup_logger('env')
+
+# 项目根目录下的 .env 文件
+PROJECT_ROOT = os.path.dirname(os.path.dirname(
+    os.path.dirname(os.path.abspath(__file__))))
+ENV_PATH = os.path.join(PROJECT_ROOT, '.env')
+
+_loaded = False
+_lock = threading.Lock()
+
+
+def load_env() -> None:
+    """加载项目根目录下的 .env 文件（只在首次调用时加载）"""
+    global _loaded
+    if _loaded:
+        return
+    with _lock:
+        if _loaded:
+            return
+        if os.path.exists(ENV_PATH):
+            from dotenv import load_dotenv
+            load_dotenv(ENV_PATH, override=True)
+            logger.info(f"{SUCCESS_ICON} 已加载环境变量: {ENV_PATH}")
+        else:
+            logger.warning(f"{ERROR_ICON} 未找到环境变量文件: {ENV_PATH}")
+        _loaded = True
+
+
+def getenv(name: str, default: Optional[str] = None) -> Optional[str]:
+    """读取环境变量，首次读取前先加载 .env 文件"""
+    load_env()
+    return os.getenv(name, default)
@@ -0,0 +1,133 @@
+import os
+import json
+import pickle
+import sqlite3
+import threading
+import importlib.util
+from typing import Any, Optional
+
+import pandas as pd
+
+
+# 项目根目录与本地数据目录
+PROJECT_ROOT = os.path.dirname(os.path.dirname(
+    os.path.dirname(os.path.abspath(__file__))))
+DATA_DIR = os.path.join(PROJECT_ROOT, 'src', 'data')
+
+# 优先使用 Parquet 列式存储，未安装 pyarrow/fastparquet 时退回 pickle
+PARQUET_AVAILABLE = any(
+    importlib.util.find_spec(engine) is not None
+    for engine in ("pyarrow", "fastparquet")
+)
+FRAME_SUFFIX = ".parquet" if PARQUET_AVAILABLE else ".pkl"
+
+
+def get_data_path(*parts: str) -> str:
+    """获取本地数据目录下的路径（不创建目录）
+
+    Args:
+        parts: 相对于 src/data 的路径片段
+
+    Returns:
+        绝对路径
+    """
+    return os.path.join(DATA_DIR, *parts)
+
+
+def _tmp_path(target: str) -> str:
+    """为原子写入生成进程、线程唯一的临时文件名"""
+    return f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def write_frame(df: pd.DataFrame, path: str, columnar: bool = True) -> None:
+    """原子地将 DataFrame 写入磁盘
+
+    Args:
+        df: 要保存的数据
+        path: 目标文件路径（不含后缀）
+        columnar: 是否优先使用 Parquet，列类型混杂的数据可传 False 直接使用 pickle
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    use_parquet = columnar and PARQUET_AVAILABLE
+    target = path + (".parquet" if use_parquet else ".pkl")
+    tmp_path = _tmp_path(target)
+    if use_parquet:
+        df.to_parquet(tmp_path, index=False)
+    else:
+        df.to_pickle(tmp_path)
+    # 先写临时文件再替换，避免并发读取到写了一半的文件
+    os.replace(tmp_path, target)
+
+
+def read_frame(path: str) -> Optional[pd.DataFrame]:
+    """读取 write_frame 保存的 DataFrame
+
+    Args:
+        path: 文件路径（不含后缀）
+
+    Returns:
+        DataFrame，文件不存在时返回 None
+    """
+    if PARQUET_AVAILABLE and os.path.exists(path + ".parquet"):
+        return pd.read_parquet(path + ".parquet")
+    if os.path.exists(path + ".pkl"):
+        return pd.read_pickle(path + ".pkl")
+    return None
+
+
+def write_json(data: Any, path: str) -> None:
+    """原子地写入 JSON 文件"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = _tmp_path(path)
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def read_json(path: str) -> Optional[Any]:
+    """读取 JSON 文件，不存在或损坏时返回 None"""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def write_pickle(obj: Any, path: str) -> None:
+    """原子地将任意对象以 pickle 格式写入磁盘"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = _tmp_path(path)
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def read_pickle(path: str) -> Optional[Any]:
+    """读取 pickle 文件，不存在或损坏时返回 None"""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+
+
+def connect_sqlite(path: str) -> sqlite3.Connection:
+    """打开本地 SQLite 数据库（WAL 模式），允许多个线程共享同一连接
+
+    调用方需要自行用锁串行化对连接的访问；WAL 模式下其他进程的读操作不会被写操作阻塞。
+
+    Args:
+        path: 数据库文件路径
+
+    Returns:
+        数据库连接
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
@@ -0,0 +1,16 @@
+def load_tickers(tickers: str = None, tickers_file: str = None) -> list:
+    """Collect tickers from a comma-separated list and/or a file.
+
+    The file holds one or more comma-separated tickers per line; blank lines
+    and lines starting with '#' are ignored. Duplicates are dropped, keeping
+    the first occurrence.
+    """
+    raw = []
+    if tickers:
+        raw.extend(tickers.split(","))
+    if tickers_file:
+        with open(tickers_file, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.split("#", 1)[0]
+                raw.extend(line.split(","))
+    return list(dict.fromkeys(t.strip() for t in raw if t.strip()))
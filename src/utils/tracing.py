@@ -0,0 +1,272 @@
+import os
+import json
+import time
+import functools
+import itertools
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+
+class Span:
+    """一次被追踪的调用：墙钟时间、当前线程的 CPU 时间、获取的字节数与缓存命中情况"""
+
+    __slots__ = ("span_id", "parent_id", "name", "kind", "attrs", "start", "wall_ms",
+                 "cpu_ms", "bytes", "cache_hits", "cache_misses", "thread", "error")
+
+    def __init__(self, span_id: int, parent_id: Optional[int], name: str, kind: str,
+                 attrs: Dict[str, Any]):
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.attrs = attrs
+        self.start = time.time()
+        self.wall_ms = 0.0
+        self.cpu_ms = 0.0
+        self.bytes = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.thread = threading.current_thread().name
+        self.error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+
+class Trace:
+    """一次运行中收集到的所有 span（线程安全）"""
+
+    def __init__(self):
+        self.spans: List[Span] = []
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def next_id(self) -> int:
+        with self._lock:
+            return next(self._ids)
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def export_jsonl(self, path: str) -> None:
+        """按开始时间顺序，每个 span 写一行 JSON"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            for span in sorted(self.spans, key=lambda s: s.start):
+                f.write(json.dumps(span.to_dict(), ensure_ascii=False, default=str) + "\n")
+
+    def summary(self, bar_width: int = 24) -> str:
+        """火焰图式的文本摘要：按调用路径合并同名 span，子节点按总耗时降序缩进显示"""
+        by_id = {span.span_id: span for span in self.spans}
+        children: Dict[tuple, Dict[str, Any]] = {}
+        totals: Dict[tuple, Dict[str, float]] = {}
+
+        def path_of(span: Span) -> tuple:
+            names = []
+            while span is not None:
+                names.append(span.name)
+                span = by_id.get(span.parent_id)
+            return tuple(reversed(names))
+
+        for span in self.spans:
+            path = path_of(span)
+            node = totals.setdefault(path, {"wall_ms": 0.0, "cpu_ms": 0.0, "calls": 0,
+                                            "bytes": 0, "hits": 0, "misses": 0})
+            node["wall_ms"] += span.wall_ms
+            node["cpu_ms"] += span.cpu_ms
+            node["calls"] += 1
+            node["bytes"] += span.bytes
+            node["hits"] += span.cache_hits
+            node["misses"] += span.cache_misses
+            children.setdefault(path[:-1], {})[path[-1]] = path
+
+        if not totals:
+            return "No spans recorded"
+        longest = max(node["wall_ms"] for path, node in totals.items() if len(path) == 1)
+        lines = [f"{'span':<48} {'wall ms':>10} {'cpu ms':>9} {'calls':>6} "
+                 f"{'KB':>9} {'cache h/m':>10}"]
+
+        def render(parent: tuple, depth: int) -> None:
+            for path in sorted(children.get(parent, {}).values(),
+                               key=lambda p: totals[p]["wall_ms"], reverse=True):
+                node = totals[path]
+                label = ("  " * depth + path[-1])[:48]
+                bar = "█" * max(1, round(bar_width * node["wall_ms"] / longest)) if longest else ""
+                cache = f"{node['hits']}/{node['misses']}" if node["hits"] or node["misses"] else ""
+                kilobytes = f"{node['bytes'] / 1024:.1f}" if node["bytes"] else ""
+                lines.append(f"{label:<48} {node['wall_ms']:>10.1f} {node['cpu_ms']:>9.1f} "
+                             f"{node['calls']:>6} {kilobytes:>9} {cache:>10} {bar}")
+                render(path, depth + 1)
+
+        render((), 0)
+        return "\n".join(lines)
+
+
+# 当前上下文中正在进行的 span，asyncio 任务与复制了上下文的线程会继承它
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+# 正在收集的 trace，未开启追踪时为 None（此时 span 几乎没有开销）
+_active_trace: Optional[Trace] = None
+
+
+def get_active_trace() -> Optional[Trace]:
+    return _active_trace
+
+
+def start_trace() -> Trace:
+    """开始收集 span，返回新的 trace"""
+    global _active_trace
+    _active_trace = Trace()
+    return _active_trace
+
+
+def stop_trace() -> Optional[Trace]:
+    """停止收集 span，返回收集到的 trace"""
+    global _active_trace
+    trace, _active_trace = _active_trace, None
+    return trace
+
+
+@contextmanager
+def trace_run(path: Optional[str] = None, show_summary: bool = True) -> Iterator[Trace]:
+    """在 with 块内收集 span，结束时导出到 JSONL 文件并打印摘要
+
+    Args:
+        path: JSONL 文件路径，为 None 时不导出
+        show_summary: 是否打印火焰图式摘要
+    """
+    trace = start_trace()
+    try:
+        yield trace
+    finally:
+        stop_trace()
+        if path:
+            trace.export_jsonl(path)
+            print(f"\nTrace written to {path} ({len(trace.spans)} spans)")
+        if show_summary:
+            print("\n" + trace.summary())
+
+
+@contextmanager
+def span(name: str, kind: str = "internal", **attrs: Any) -> Iterator[Optional[Span]]:
+    """追踪一段代码，嵌套的 span 记录为子节点；未开启追踪时返回 None"""
+    trace = _active_trace
+    if trace is None:
+        yield None
+        return
+
+    parent = _current_span.get()
+    current = Span(trace.next_id(), parent.span_id if parent is not None else None,
+                   name, kind, attrs)
+    token = _current_span.set(current)
+    wall_start = time.perf_counter()
+    cpu_start = time.thread_time()
+    try:
+        yield current
+    except BaseException as e:
+        current.error = type(e).__name__
+        raise
+    finally:
+        current.wall_ms = (time.perf_counter() - wall_start) * 1000
+        current.cpu_ms = (time.thread_time() - cpu_start) * 1000
+        _current_span.reset(token)
+        trace.add(current)
+
+
+def traced(name: Optional[str] = None, kind: str = "internal") -> Callable:
+    """将函数的每次调用记录为一个 span 的装饰器"""
+    def decorator(func: Callable) -> Callable:
+        # inspect 导入较慢，只在装饰时才需要
+        import inspect
+
+        span_name = name or func.__qualname__
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if _active_trace is None:
+                    return await func(*args, **kwargs)
+                with span(span_name, kind):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _active_trace is None:
+                return func(*args, **kwargs)
+            with span(span_name, kind):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def payload_bytes(obj: Any) -> int:
+    """估计返回数据的字节数：DataFrame 按内存占用，字符串按 UTF-8 编码长度"""
+    if obj is None:
+        return 0
+    if isinstance(obj, (bytes, bytearray)):
+        return len(obj)
+    if isinstance(obj, str):
+        return len(obj.encode("utf-8"))
+    memory_usage = getattr(obj, "memory_usage", None)
+    if callable(memory_usage):
+        try:
+            usage = memory_usage(deep=True)
+            return int(usage.sum()) if hasattr(usage, "sum") else int(usage)
+        except Exception:
+            return 0
+    return 0
+
+
+def record_bytes(n: int) -> None:
+    """为当前 span 累加获取的字节数"""
+    current = _current_span.get()
+    if current is not None and n:
+        current.bytes += n
+
+
+def record_cache(hit: bool) -> None:
+    """为当前 span 记录一次缓存命中或未命中"""
+    current = _current_span.get()
+    if current is None:
+        return
+    if hit:
+        current.cache_hits += 1
+    else:
+        current.cache_misses += 1
+
+
+class TracedModule:
+    """为模块中的每个函数调用记录 span 的代理，如 ak = traced_module(ak, "akshare")"""
+
+    def __init__(self, module: Any, prefix: str, kind: str):
+        self._module = module
+        self._prefix = prefix
+        self._kind = kind
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._module, name)
+        if not callable(attr) or isinstance(attr, type):
+            return attr
+
+        span_name = f"{self._prefix}.{name}"
+        kind = self._kind
+
+        @functools.wraps(attr)
+        def wrapper(*args, **kwargs):
+            if _active_trace is None:
+                return attr(*args, **kwargs)
+            with span(span_name, kind):
+                result = attr(*args, **kwargs)
+                record_bytes(payload_bytes(result))
+                return result
+        return wrapper
+
+
+def traced_module(module: Any, prefix: str, kind: str = "io") -> TracedModule:
+    return TracedModule(module, prefix, kind)